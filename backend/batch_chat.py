@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+대량 질의 실행 (오프라인 품질 평가 / 일괄 추천 생성)
+
+입력: requests.jsonl 형태의 JSONL ({"request_id": ..., "title": ..., "body": ...})
+      - 질의 텍스트는 user_query → body → title 순서로 사용
+      - member_id가 있으면 회원 맞춤 재정렬 적용
+      - 추천 이력(TB_MEMBER_RECOM_RESULT_T)은 기록하지 않음 (오프라인 평가가 회원 이력을 오염시키지 않도록).
+        실제로 보여줄 일괄 추천이면 레코드에 "record_recom": true
+출력: 완료되는 순서대로 JSONL 한 줄씩
+      {"request_id", "user_query", "answer", "items", "error", "elapsed_sec"}
+
+- 호출자가 만든 그래프(main.py 의 workflow, CLI는 build_graph())를 동시 실행 수 제한 하에 병렬 실행
+- 동시에 실행 중인 질의들의 임베딩은 EmbeddingBatcher가 한 번의 API 호출로 묶음
+
+사용법:
+    python batch_chat.py queries.jsonl -o results.jsonl --concurrency 8
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator
+
+from llm_client import embedding_batcher
+from main_v3 import build_graph
+from recom_writer import recom_writer
+from run_control import RunCancelled, RunContext
+
+DEFAULT_CONCURRENCY = 8
+STOP_POLL_SEC = 0.5  # 중단 요청(stop) 확인 주기
+BATCH_EMBEDDING_WINDOW_SEC = 0.02  # 배치 모드에서는 임베딩 요청을 잠시 모아서 호출
+
+
+def parse_jsonl(lines: Iterable[str]) -> Iterator[dict]:
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"request_id": f"line-{line_no}", "error": f"JSON 파싱 실패: {e}"}
+            continue
+        record.setdefault("request_id", f"line-{line_no}")
+        yield record
+
+
+def _run_one(workflow, record: dict, run: RunContext) -> dict:
+    query = record.get("user_query") or record.get("body") or record.get("title")
+    result = {"request_id": record["request_id"], "user_query": query}
+    if record.get("error") or not query:
+        result["error"] = record.get("error") or "질의 텍스트가 없습니다."
+        return result
+
+    started = time.monotonic()
+    try:
+        with run.activate():
+            state = workflow.invoke({
+                "user_query": query,
+                "member_id": record.get("member_id"),
+                "record_recom": bool(record.get("record_recom", False)),
+            })
+        result["answer"] = state.get("final_response")
+        result["items"] = [item["id"] for item in state.get("research_items") or []]
+    except RunCancelled:
+        result["error"] = "중단됨"
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed_sec"] = round(time.monotonic() - started, 3)
+    return result
+
+
+def run_batch(
+    workflow,
+    records: Iterable[dict],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    stop: threading.Event | None = None,
+) -> Iterator[dict]:
+    """
+    질의를 병렬 실행하고 완료되는 순서대로 결과를 반환 (동시 실행 수 제한)
+    stop이 설정되면 새 질의를 더 제출하지 않고, 실행 중인 그래프는 RunContext.cancel()로 중단
+    """
+    stop = stop or threading.Event()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-chat") as pool:
+        pending: dict = {}  # future -> RunContext
+
+        def drain(limit: int) -> Iterator[dict]:
+            while len(pending) > limit and not stop.is_set():
+                done, _ = wait(pending, timeout=STOP_POLL_SEC, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    pending.pop(fut)
+                    yield fut.result()
+
+        try:
+            for record in records:
+                if stop.is_set():
+                    break
+                run = RunContext()
+                pending[pool.submit(_run_one, workflow, record, run)] = run
+                # 입력이 아무리 커도 대기 작업은 concurrency의 2배까지만 유지
+                yield from drain(concurrency * 2 - 1)
+            yield from drain(0)
+        finally:
+            # 중단(또는 소비자가 제너레이터를 닫음): 대기 작업 취소 + 실행 중인 그래프 중단
+            for fut, run in pending.items():
+                fut.cancel()
+                run.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL 질의 일괄 실행")
+    parser.add_argument("input", help="입력 JSONL 경로 ('-'이면 stdin)")
+    parser.add_argument("-o", "--output", help="결과 JSONL 경로 (기본: stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+
+    embedding_batcher.window_sec = BATCH_EMBEDDING_WINDOW_SEC
+    workflow = build_graph()
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    started = time.monotonic()
+    total = failed = 0
+    try:
+        for result in run_batch(workflow, parse_jsonl(src), args.concurrency):
+            total += 1
+            failed += bool(result.get("error"))
+            dst.write(json.dumps(result, ensure_ascii=False) + "\n")
+            dst.flush()
+    finally:
+        recom_writer.close()
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    elapsed = time.monotonic() - started
+    embed_stats = embedding_batcher.get_stats()
+    print(
+        f"[done] {total}건 (실패 {failed}건), {elapsed:.1f}s, {total / elapsed if elapsed else 0:.2f} req/s, "
+        f"임베딩 {embed_stats['requests']}건 → API {embed_stats['api_calls']}회",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
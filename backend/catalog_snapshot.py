@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+카탈로그 스냅샷 (버전별 바이너리 파일, 백엔드는 읽기 전용 memory-map)
+
+백엔드 프로세스가 시작할 때마다 perfume_db 에서 다시 만들던 카탈로그 상태를 ETL이 한 번 만들어 둡니다.
+(scripts/vectorDB/build_catalog_snapshot.py, run_vector_etl.py 마지막 단계)
+- 특징 행렬 (perfume_features.FeatureMatrix: 유사 향수 / 레이어링 / 개인화 재정렬)
+- 패싯 비트맵: 어코드/계절/상황/성별/노트 값별로 향수 행 비트 (np.packbits)
+  (검색에서 결과가 없을 조건 조합을 SQL 없이 걸러냄: main_v3.snapshot_has_match)
+- 노트/어코드 사전 (정규화 키 → ID), 노트 임베딩 (행 L2 정규화)
+배열은 .npy 로 저장하고 np.load(mmap_mode="r") 로 엽니다. 복사 없이 페이지 캐시를 그대로 쓰므로
+uvicorn 워커가 여러 개여도 물리 메모리에는 한 벌만 올라가고, 시작은 파일 몇 개를 여는 시간이면 됩니다.
+문자열 목록은 offsets(int64) + UTF-8 바이트(uint8) 배열 2개로 저장합니다 (StringTable).
+
+디렉터리 구조 (CATALOG_SNAPSHOT_DIR, 기본 backend/data/catalog):
+    CURRENT                  현재 버전 이름 (os.replace 로 교체 → 읽는 쪽은 항상 완성된 버전만 봄)
+    <version>/manifest.json  포맷 버전, 배열 목록(dtype/shape), 특징 블록, 원본 행 수
+    <version>/*.npy
+버전 = 생성 시각 + 내용 해시. 내용이 같으면 새 버전을 만들지 않고, 최근 KEEP_VERSIONS개만 남깁니다.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from perfume_features import FeatureMatrix, load_feature_matrix
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_DIR = os.getenv(
+    "CATALOG_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalog"),
+)
+KEEP_VERSIONS = 3          # 이전 버전은 아직 열어 둔 워커가 있을 수 있어 바로 지우지 않음
+CHECK_INTERVAL_SEC = 30    # get_snapshot() 이 CURRENT 변경을 확인하는 주기
+
+# 패싯 → (FROM 절, 값 컬럼). 값 목록은 이름순, 비트맵 행 순서 = 값 목록 순서
+FACETS = {
+    "accord": ("tb_perfume_accord_m JOIN tb_perfume_accord_vocab_m USING (accord_id)", "accord"),
+    "season": ("tb_perfume_season_m", "season"),
+    "occasion": ("tb_perfume_oca_m", "occasion"),
+    "audience": ("tb_perfume_aud_m", "audience"),
+    "note": ("tb_perfume_notes_m JOIN tb_perfume_note_vocab_m USING (note_id)", "note"),
+}
+
+# 노트/어코드 사전: 종류 → (테이블, ID 컬럼, 정규화 키 컬럼)
+VOCAB_TABLES = {
+    "note": ("tb_perfume_note_vocab_m", "note_id", "note_key"),
+    "accord": ("tb_perfume_accord_vocab_m", "accord_id", "accord_key"),
+}
+
+
+# ==========================================
+# 1. 문자열 테이블
+# ==========================================
+class StringTable:
+    """offsets[i]:offsets[i+1] 구간의 UTF-8 바이트 = i번째 문자열 (memory-map 된 배열 2개)"""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    @staticmethod
+    def encode(values) -> tuple:
+        encoded = [str(v).encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return offsets, data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def tolist(self) -> List[str]:
+        raw = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        return [raw[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(self))]
+
+
+# ==========================================
+# 2. 생성 (ETL)
+# ==========================================
+def collect_catalog(conn) -> dict:
+    """perfume_db → 스냅샷 배열/문자열 (이름 → ndarray 또는 문자열 목록), 블록, 행 수"""
+    features = load_feature_matrix(conn)
+    row_by_id = {int(pid): i for i, pid in enumerate(features.perfume_ids)}
+    n = len(features.perfume_ids)
+    arrays = {
+        "perfume_ids": features.perfume_ids,
+        "features": np.ascontiguousarray(features.matrix, dtype=np.float32),
+    }
+    strings = {"feature_columns": features.vocab}
+
+    cur = conn.cursor()
+    for facet, (source, col) in FACETS.items():
+        cur.execute(f"SELECT DISTINCT perfume_id, {col} FROM {source} WHERE {col} IS NOT NULL")
+        rows = cur.fetchall()
+        values = sorted({value for _, value in rows})
+        index = {value: j for j, value in enumerate(values)}
+        bits = np.zeros((len(values), n), dtype=bool)
+        for pid, value in rows:
+            i = row_by_id.get(pid)
+            if i is not None:
+                bits[index[value], i] = True
+        arrays[f"facet_{facet}_bits"] = np.packbits(bits, axis=1)
+        strings[f"facet_{facet}_values"] = values
+
+    for kind, (table, id_col, key_col) in VOCAB_TABLES.items():
+        cur.execute(f"SELECT {key_col}, {id_col} FROM {table} ORDER BY {id_col}")
+        rows = cur.fetchall()
+        strings[f"vocab_{kind}_keys"] = [key for key, _ in rows]
+        arrays[f"vocab_{kind}_ids"] = np.array([i for _, i in rows], dtype=np.int32)
+
+    # 노트 임베딩 (load_note_vectors.py 적재 전이면 생략)
+    cur.execute("SELECT to_regclass('tb_note_embedding_m')")
+    if cur.fetchone()[0] is not None:
+        cur.execute("SELECT note, embedding::text FROM tb_note_embedding_m WHERE embedding IS NOT NULL ORDER BY note")
+        rows = cur.fetchall()
+        if rows:
+            vectors = np.array([json.loads(v) for _, v in rows], dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            np.divide(vectors, norms, out=vectors, where=norms > 0)
+            arrays["note_vectors"] = vectors
+            strings["note_names"] = [note for note, _ in rows]
+    cur.close()
+
+    return {"arrays": arrays, "strings": strings, "blocks": features.blocks, "perfumes": n}
+
+
+def _content_hash(arrays: dict) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        digest.update(name.encode("utf-8"))
+        digest.update(str(arrays[name].dtype).encode("ascii") + str(arrays[name].shape).encode("ascii"))
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()
+
+
+def current_version(root: str = SNAPSHOT_DIR) -> Optional[str]:
+    try:
+        with open(os.path.join(root, "CURRENT"), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshot(catalog: dict, root: str = SNAPSHOT_DIR) -> tuple:
+    """
+    collect_catalog 결과를 새 버전 디렉터리로 쓰고 CURRENT 를 교체.
+    반환: (버전, 새로 만들었는지). 내용 해시가 현재 버전과 같으면 쓰지 않음
+    """
+    arrays = dict(catalog["arrays"])
+    for name, values in catalog["strings"].items():
+        arrays[f"{name}.offsets"], arrays[f"{name}.data"] = StringTable.encode(values)
+    content_hash = _content_hash(arrays)
+
+    current = current_version(root)
+    if current and current.endswith(content_hash[:12]):
+        return current, False
+
+    version = f"{datetime.now():%Y%m%d%H%M%S}-{content_hash[:12]}"
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = os.path.join(root, f".{version}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "content_hash": content_hash,
+        "perfumes": catalog["perfumes"],
+        "blocks": {name: list(span) for name, span in catalog["blocks"].items()},
+        "arrays": {},
+        "strings": sorted(catalog["strings"]),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+        manifest["arrays"][name] = {"dtype": str(array.dtype), "shape": list(array.shape)}
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    os.rename(tmp_dir, os.path.join(root, version))
+    pointer = os.path.join(root, "CURRENT.tmp")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, os.path.join(root, "CURRENT"))
+
+    versions = sorted(d for d in os.listdir(root) if d[:1].isdigit() and os.path.isdir(os.path.join(root, d)))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return version, True
+
+
+# ==========================================
+# 3. 읽기 (백엔드)
+# ==========================================
+class CatalogSnapshot:
+    """스냅샷 1개 버전. 배열은 모두 읽기 전용 memory-map"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"스냅샷 포맷 불일치: {self.manifest.get('format')} (필요: {SNAPSHOT_FORMAT})")
+        self.path = path
+        self.version = self.manifest["version"]
+        self.arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+            for name in self.manifest["arrays"]
+        }
+        self.strings = {
+            name: StringTable(self.arrays[f"{name}.offsets"], self.arrays[f"{name}.data"])
+            for name in self.manifest["strings"]
+        }
+        self._features = None
+        self._note_names = None
+
+    @property
+    def features(self) -> FeatureMatrix:
+        """특징 행렬 (행렬은 memory-map 그대로, ID → 행 사전만 프로세스별로 만듦)"""
+        if self._features is None:
+            self._features = FeatureMatrix(
+                perfume_ids=self.arrays["perfume_ids"],
+                matrix=self.arrays["features"],
+                blocks={name: tuple(span) for name, span in self.manifest["blocks"].items()},
+                vocab=self.strings["feature_columns"].tolist(),
+            )
+        return self._features
+
+    def facet_values(self, facet: str) -> List[str]:
+        return self.strings[f"facet_{facet}_values"].tolist()
+
+    def facet_mask(self, facet: str, values) -> np.ndarray:
+        """패싯 값 중 하나라도 가진 향수 행 (bool, perfume_ids 순서)"""
+        wanted = set(values if isinstance(values, list) else [values])
+        rows = [j for j, v in enumerate(self.facet_values(facet)) if v in wanted]
+        bits = self.arrays[f"facet_{facet}_bits"]
+        if not rows:
+            return np.zeros(len(self.arrays["perfume_ids"]), dtype=bool)
+        merged = np.bitwise_or.reduce(bits[rows], axis=0)
+        return np.unpackbits(merged, count=len(self.arrays["perfume_ids"])).astype(bool)
+
+    def vocab(self, kind: str) -> Dict[str, int]:
+        keys = self.strings[f"vocab_{kind}_keys"].tolist()
+        return dict(zip(keys, self.arrays[f"vocab_{kind}_ids"].tolist()))
+
+    @property
+    def has_note_vectors(self) -> bool:
+        return "note_vectors" in self.arrays
+
+    @property
+    def note_names(self) -> List[str]:
+        """노트 임베딩 행 순서의 노트 이름"""
+        if self._note_names is None:
+            self._note_names = self.strings["note_names"].tolist()
+        return self._note_names
+
+    def nearest_notes(self, query_vector, k: int, exclude=()) -> List[str]:
+        """질의 벡터와 코사인 유사도가 큰 노트 k개 (tb_note_embedding_m 의 embedding <=> 검색과 같은 순서)"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = self.arrays["note_vectors"] @ query
+        excluded = set(exclude)
+        picked = []
+        for i in np.argsort(-scores, kind="stable"):
+            name = self.note_names[i]
+            if name not in excluded:
+                picked.append(name)
+                if len(picked) == k:
+                    break
+        return picked
+
+
+def load_snapshot(root: str = SNAPSHOT_DIR) -> Optional[CatalogSnapshot]:
+    """CURRENT 가 가리키는 스냅샷 (없으면 None → 호출 측은 DB 조회로 대체)"""
+    version = current_version(root)
+    if version is None:
+        return None
+    return CatalogSnapshot(os.path.join(root, version))
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_checked_at = float("-inf")  # 첫 호출은 항상 CURRENT 확인 (monotonic 시계는 0 근처에서 시작할 수 있음)
+_lock = threading.Lock()
+
+
+def get_snapshot() -> Optional[CatalogSnapshot]:
+    """프로세스 공용 스냅샷. CHECK_INTERVAL_SEC마다 CURRENT 를 확인해 새 버전이면 바꿔 엶"""
+    global _snapshot, _checked_at
+    if time.monotonic() - _checked_at < CHECK_INTERVAL_SEC:
+        return _snapshot
+    with _lock:
+        if time.monotonic() - _checked_at >= CHECK_INTERVAL_SEC:
+            _checked_at = time.monotonic()
+            try:
+                version = current_version()
+                if version is None:
+                    _snapshot = None
+                elif _snapshot is None or _snapshot.version != version:
+                    started = time.perf_counter()
+                    _snapshot = load_snapshot()
+                    print(f"🗂️ [Catalog] 스냅샷 {version} 열기 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ [Catalog] 스냅샷 열기 실패 (DB 조회로 대체): {e}")
+    return _snapshot
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+OpenAI 호출 래퍼
+
+- 노드별 마감시간(deadline) 안에서만 호출
+- 관측된 p95 지연을 넘기면 동일 요청을 한 번 더 보내고(hedging) 먼저 끝난 응답 사용
+- 일시적 실패(타임아웃, 연결 오류, 429, 5xx)만 지터(jitter)가 들어간 지수 백오프로 재시도, 나머지(400/401/403/404 등)는 즉시 실패
+- 어느 시도(primary / hedge / retry)가 이겼는지 기록
+- run이 취소되면 대기를 멈추고, run 전용 클라이언트를 닫아 진행 중인 요청도 중단
+"""
+import queue
+import random
+import threading
+import time
+from collections import deque, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait, FIRST_COMPLETED
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError, OpenAI
+from dotenv import load_dotenv
+
+from run_control import check_cancelled, current_run
+
+load_dotenv()
+
+# ==========================================
+# 1. 설정
+# ==========================================
+# 노드별 전체 마감시간(초): 재시도/헤징을 모두 포함한 상한
+NODE_DEADLINES = {
+    "supervisor": 10.0,
+    "researcher": 20.0,
+    "writer": 45.0,
+    "embedding": 8.0,
+}
+DEFAULT_DEADLINE = 30.0
+
+MAX_RETRIES = 2            # 최초 시도 이후 재시도 횟수
+BACKOFF_BASE = 0.3         # 백오프 기본값(초)
+BACKOFF_CAP = 3.0          # 백오프 상한(초)
+
+LATENCY_WINDOW = 200       # 노드별로 보관하는 최근 지연 표본 수
+HEDGE_MIN_SAMPLES = 20     # p95를 믿을 수 있는 최소 표본 수 (그 전에는 헤징 안 함)
+HEDGE_MIN_DELAY = 0.5      # 너무 이른 헤징 방지(초)
+CANCEL_POLL = 0.25         # 취소 여부 확인 주기(초)
+
+# SDK 자체 재시도는 끄고 이 모듈에서 직접 제어
+client = OpenAI(max_retries=0)
+
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-call")
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """노드 마감시간 안에 어떤 시도도 성공하지 못함"""
+
+
+# ==========================================
+# 2. 지연 통계 & 승자 기록
+# ==========================================
+class LatencyTracker:
+    """노드별 최근 지연 표본을 보관하고 p95를 계산"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, node: str, elapsed: float) -> None:
+        with self._lock:
+            self._samples[node].append(elapsed)
+
+    def p95(self, node: str) -> float | None:
+        """성공/타임아웃으로 끝난 모든 시도(이긴 시도 + 진 시도)의 지연 p95"""
+        with self._lock:
+            samples = sorted(self._samples[node])
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+latency_tracker = LatencyTracker()
+
+# {node: {"primary": n, "hedge": n, "retry": n, "failed": n, "cancelled": n}}
+_winner_stats = defaultdict(lambda: defaultdict(int))
+_stats_lock = threading.Lock()
+
+
+def _record_winner(node: str, attempt: str) -> None:
+    with _stats_lock:
+        _winner_stats[node][attempt] += 1
+
+
+def get_llm_stats() -> dict:
+    """노드별 p95 및 승자 통계 (모니터링용)"""
+    with _stats_lock:
+        stats = {node: dict(counts) for node, counts in _winner_stats.items()}
+    for node in list(stats):
+        stats[node]["p95"] = latency_tracker.p95(node)
+    stats["embedding_batcher"] = embedding_batcher.get_stats()
+    return stats
+
+
+# ==========================================
+# 3. 헤징 호출
+# ==========================================
+def _get_client() -> OpenAI:
+    """run 안에서는 run 전용 클라이언트를 사용 (취소 시 close → 진행 중 요청 중단)"""
+    run = current_run()
+    if run is None:
+        return client
+    return run.resource("openai", lambda: OpenAI(max_retries=0), lambda c: c.close())
+
+
+def _check_cancelled(run, node: str) -> None:
+    if run is not None and run.cancelled:
+        _record_winner(node, "cancelled")
+        run.check()
+
+
+def _is_retryable(error: Exception) -> bool:
+    """재시도/헤징으로 나아질 수 있는 오류인지 (타임아웃, 연결 오류, 429, 5xx)"""
+    if isinstance(error, (APIConnectionError, TimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _timed_call(node: str, fn, timeout: float, kwargs: dict):
+    """
+    fn 호출 + 지연 기록. 이긴 시도만 기록하면 p95가 낮게 치우치므로
+    헤징에 진 시도(결과를 버리는 시도)와 타임아웃도 끝나는 대로 기록
+    """
+    started = time.monotonic()
+    try:
+        result = fn(timeout=timeout, **kwargs)
+    except APITimeoutError:
+        latency_tracker.record(node, time.monotonic() - started)
+        raise
+    elapsed = time.monotonic() - started
+    latency_tracker.record(node, elapsed)
+    return result, elapsed
+
+
+def _backoff(retry: int) -> float:
+    # Full jitter: 0 ~ min(cap, base * 2^n)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** retry)))
+
+
+def call_with_hedging(node: str, fn, **kwargs):
+    """
+    fn(timeout=..., **kwargs)를 노드 마감시간 안에서 실행합니다.
+    p95를 넘기면 헤지 요청을 한 번 더 보내고, 먼저 성공한 결과를 반환합니다.
+    재시도할 수 없는 오류(_is_retryable 이 False)는 남은 시도를 기다리지 않고 바로 올립니다.
+    """
+    deadline = time.monotonic() + NODE_DEADLINES.get(node, DEFAULT_DEADLINE)
+    run = current_run()
+    last_error = None
+
+    for retry in range(MAX_RETRIES + 1):
+        _check_cancelled(run, node)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        label = "primary" if retry == 0 else "retry"
+        pending = {_executor.submit(_timed_call, node, fn, remaining, kwargs): label}
+
+        hedge_after = latency_tracker.p95(node)
+        hedged = hedge_after is None  # 표본 부족 시 헤징 생략
+        if not hedged:
+            hedge_after = max(hedge_after, HEDGE_MIN_DELAY)
+
+        round_started = time.monotonic()
+        while pending:
+            _check_cancelled(run, node)
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                break
+
+            timeout = remaining if hedged else min(remaining, round_started + hedge_after - now)
+            done, _ = wait(pending, timeout=max(0.0, min(timeout, CANCEL_POLL)), return_when=FIRST_COMPLETED)
+
+            if not done:
+                if not hedged and time.monotonic() - round_started >= hedge_after:
+                    # p95 초과 → 같은 요청을 한 번 더 보냄
+                    hedged = True
+                    remaining = deadline - time.monotonic()
+                    pending[_executor.submit(_timed_call, node, fn, remaining, kwargs)] = "hedge"
+                continue
+
+            for fut in done:
+                attempt = pending.pop(fut)
+                try:
+                    result, elapsed = fut.result()
+                except Exception as e:
+                    if not _is_retryable(e):
+                        _record_winner(node, "failed")
+                        raise
+                    last_error = e
+                    continue
+                winner = attempt if attempt == "hedge" else label
+                _record_winner(node, winner)
+                if winner != "primary":
+                    print(f"   ⚡ [LLM] {node}: '{winner}' 시도가 응답 ({elapsed:.2f}s)")
+                return result
+
+        # 이번 라운드의 모든 시도 실패 → 지터 백오프 후 재시도
+        if retry < MAX_RETRIES:
+            sleep_for = min(_backoff(retry), max(0.0, deadline - time.monotonic()))
+            print(f"   ⚠️ [LLM] {node} 호출 실패, {sleep_for:.2f}s 후 재시도: {last_error}")
+            time.sleep(sleep_for)
+            _check_cancelled(run, node)
+
+    _record_winner(node, "failed")
+    if last_error:
+        raise last_error
+    raise LLMDeadlineExceeded(f"{node} 노드 LLM 호출이 마감시간을 초과했습니다.")
+
+
+def chat_completion(node: str, **kwargs):
+    """client.chat.completions.create의 헤징 버전"""
+    return call_with_hedging(node, _get_client().chat.completions.create, **kwargs)
+
+
+def create_embedding(node: str = "embedding", **kwargs):
+    """client.embeddings.create의 헤징 버전"""
+    return call_with_hedging(node, _get_client().embeddings.create, **kwargs)
+
+
+# ==========================================
+# 4. 임베딩 묶음 호출 (여러 질의의 임베딩을 한 번의 API 호출로)
+# ==========================================
+class EmbeddingBatcher:
+    """
+    동시에 들어온 임베딩 요청을 모아 embeddings.create 한 번으로 처리합니다.
+    - window_sec=0: 이미 대기 중인 요청만 모음 (단건 지연 증가 없음, 부하 시 자연스럽게 묶임)
+    - window_sec>0: 배치 작업용. 첫 요청 후 잠시 기다려 더 많이 모음
+    """
+
+    def __init__(self, model: str = "text-embedding-3-small", max_batch: int = 64,
+                 window_sec: float = 0.0, flushers: int = 4):
+        self.model = model
+        self.max_batch = max_batch
+        self.window_sec = window_sec
+        self._queue = queue.Queue()
+        self._flushers = flushers
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.stats = {"requests": 0, "api_calls": 0}
+        self._stats_lock = threading.Lock()  # 호출 스레드들과 flusher 스레드들이 함께 증가시킴
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._started:
+                return
+            for i in range(self._flushers):
+                threading.Thread(target=self._flush_loop, name=f"embed-batcher-{i}", daemon=True).start()
+            self._started = True
+
+    def embed(self, text: str) -> list[float]:
+        self._ensure_started()
+        fut = Future()
+        self._queue.put((text, fut))
+        self._count("requests")
+        while True:
+            try:
+                return fut.result(timeout=CANCEL_POLL)
+            except FutureTimeout:
+                check_cancelled()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_sec
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush_loop(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = list(dict.fromkeys(text for text, _ in batch))  # 중복 제거
+            try:
+                resp = create_embedding(input=texts, model=self.model)
+                self._count("api_calls")
+                vectors = {texts[d.index]: d.embedding for d in resp.data}
+                for text, fut in batch:
+                    fut.set_result(vectors[text])
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+
+
+embedding_batcher = EmbeddingBatcher()
@@ -1,17 +1,40 @@
+import hmac
 import json
+import os
+import threading
+import uuid
 import asyncio
-from typing import Any, Generator
+from typing import Any, Generator, Literal
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 # main_v3.py에서 그래프 가져오기
-from main_v3 import build_graph
+from main_v3 import build_graph, get_layering_partners, get_similar_perfumes
+from batch_chat import parse_jsonl, run_batch
+from llm_client import get_llm_stats
+from personalize import get_personalize_stats, invalidate_member
+from recom_writer import recom_writer
+from visit_ingest import MAX_PWD_ERR, visit_ingestor
+from run_control import RunCancelled, count_run, get_run_stats
+from stream_runs import EventGap, RunBuffer, RunRegistry, subscribe
+
+# /chat/batch 동시 실행 수 상한 (LLM rate limit 보호)
+MAX_BATCH_CONCURRENCY = 16
+
+# 회원 상태 엔드포인트(방문 기록/잠금 조회/등록 향수 변경 알림)는 인증 서비스만 호출 (.env 의 INTERNAL_API_TOKEN)
+# /chat 의 member_id 도 같은 토큰이 있을 때만 사용 (브라우저가 보낸 member_id 는 무시)
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
+class VisitEvent(BaseModel):
+    visit_cd: Literal["LOGIN", "LOGOUT", "PWD_ERR"]
 
 class ChatRequest(BaseModel):
     user_query: str = Field(..., min_length=1, description="사용자가 입력한 질의")
+    session_id: str | None = Field(None, max_length=64, description="후속 질문용 세션ID (없으면 새로 발급)")
+    member_id: int | None = Field(None, description="로그인 회원ID (등록 향수 기반 맞춤 추천, X-Internal-Token 필요)")
 
 app = FastAPI(title="Perfume Chat Workflow")
 
@@ -23,52 +46,244 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Run-Id"],
 )
 
 # 그래프 빌드
 workflow = build_graph()
 
+# run_id → 이벤트 버퍼 (재연결용)
+runs = RunRegistry()
+
+@app.on_event("shutdown")
+def flush_write_behind_queues() -> None:
+    # 큐에 남은 추천 결과 / 방문 이벤트를 모두 저장한 뒤 종료
+    recom_writer.close()
+    visit_ingestor.close()
+
 @app.get("/health")
 def health() -> dict[str, Any]:
     return {"status": "ok"}
 
-def stream_generator(user_query: str) -> Generator[str, None, None]:
-    """LangGraph 실행 결과를 실시간 SSE 포맷으로 전송"""
-    payload = {"user_query": user_query}
+@app.get("/metrics")
+def metrics() -> dict[str, Any]:
+    """노드별 LLM 지연(p95), 헤징/재시도 승자 통계, run 실행/취소 건수"""
+    return {
+        "llm": get_llm_stats(),
+        "runs": {**get_run_stats(), "buffered": len(runs)},
+        "personalize": get_personalize_stats(),
+        "recom_writer": recom_writer.get_stats(),
+        "visit_ingest": visit_ingestor.get_stats(),
+    }
+
+def graph_events(user_query: str, session_id: str, member_id: int | None = None) -> Generator[dict, None, None]:
+    """LangGraph 실행 결과를 SSE 이벤트(payload)로 변환 (워커 스레드에서 실행)"""
+    payload = {"user_query": user_query, "session_id": session_id, "member_id": member_id}
     
     try:
         # workflow.stream은 노드(단계)가 끝날 때마다 상태를 반환합니다.
         for event in workflow.stream(payload):
             for node_name, state_update in event.items():
                 
-                # 1. Researcher 단계: 조사 결과가 있으면 로그 전송
+                # 1. Researcher 단계: 구조화된 결과를 Writer 완료 전에 먼저 전송 (카드 렌더링용)
+                if node_name == "researcher" and state_update.get("research_items"):
+                    yield {
+                        "type": "results",
+                        "items": state_update["research_items"]
+                    }
+
+                # 조사 결과가 있으면 로그 전송
                 if node_name == "researcher" and "research_result" in state_update:
-                    log_data = json.dumps({
+                    yield {
                         "type": "log",
                         "content": f"🔎 조사 완료: {state_update['research_result'][:30]}..."
-                    }, ensure_ascii=False)
-                    yield f"data: {log_data}\n\n"
+                    }
 
                 # 2. Writer 단계: 최종 답변이 있으면 전송
                 # (LangGraph 특성상 Writer 노드가 완료되어야 텍스트가 나옵니다)
                 if node_name == "writer" and "final_response" in state_update:
-                    final_res = state_update["final_response"]
-                    
                     # 프론트엔드에서 '타자 치는 효과'를 위해 전체 텍스트를 보냄
-                    data = json.dumps({
+                    yield {
                         "type": "answer",
-                        "content": final_res
-                    }, ensure_ascii=False)
-                    yield f"data: {data}\n\n"
+                        "content": state_update["final_response"]
+                    }
+        count_run("completed")
 
     except Exception as e:
-        error_msg = json.dumps({"type": "error", "content": str(e)}, ensure_ascii=False)
-        yield f"data: {error_msg}\n\n"
+        count_run("failed")
+        yield {"type": "error", "content": str(e)}
+
+def start_run(user_query: str, session_id: str | None = None, member_id: int | None = None) -> RunBuffer:
+    """
+    그래프를 워커 스레드에서 실행하고 이벤트를 run 버퍼에 기록.
+    스트림 연결과 실행을 분리해서, 연결이 끊겨도 재연결로 이어받을 수 있습니다.
+    """
+    buffer = runs.create()
+    count_run("started")
+    session_id = session_id or uuid.uuid4().hex
+    buffer.publish({"type": "run", "run_id": buffer.run_id, "session_id": session_id})
+
+    def produce():
+        with buffer.run.activate():
+            try:
+                for payload in graph_events(user_query, session_id, member_id):
+                    buffer.publish(payload)
+            except RunCancelled:
+                print(f"🛑 [Run] {buffer.run_id}: 그래프 실행 중단")
+            finally:
+                buffer.finish()
+
+    asyncio.get_running_loop().run_in_executor(None, produce)
+    return buffer
 
 @app.post("/chat")
-async def chat_stream(request: ChatRequest):
-    """스트리밍 엔드포인트"""
+async def chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    internal_token: str | None = Header(None, alias="X-Internal-Token"),
+):
+    """
+    스트리밍 엔드포인트 (첫 이벤트로 run_id 전달).
+    member_id 는 인증 서비스가 X-Internal-Token 과 함께 넘긴 경우만 사용
+    (아니면 다른 회원의 등록 향수가 드러나고 추천 이력이 그 회원으로 기록되므로 비회원으로 처리)
+    """
+    member_id = request.member_id
+    if member_id is not None and not has_internal_token(internal_token):
+        print(f"⚠️ [Chat] 내부 토큰 없는 member_id({member_id}) 무시")
+        member_id = None
+    buffer = start_run(request.user_query, request.session_id, member_id)
+    return StreamingResponse(
+        subscribe(buffer, http_request),
+        media_type="text/event-stream",
+        headers={"X-Run-Id": buffer.run_id},
+    )
+
+@app.get("/chat/{run_id}/stream")
+async def resume_chat_stream(
+    run_id: str,
+    http_request: Request,
+    last_event_id: int | None = None,
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+):
+    """재연결 엔드포인트: Last-Event-ID 이후 이벤트만 재전송하고 실행 중이면 이어서 수신"""
+    buffer = runs.get(run_id)
+    if buffer is None:
+        raise HTTPException(status_code=404, detail="만료되었거나 존재하지 않는 run입니다.")
+
+    if last_event_id is None:
+        try:
+            last_event_id = int(last_event_id_header or 0)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID 형식이 올바르지 않습니다.")
+
+    try:
+        buffer.events_after(last_event_id)
+    except EventGap as e:
+        raise HTTPException(status_code=410, detail=str(e))
+
     return StreamingResponse(
-        stream_generator(request.user_query),
-        media_type="text/event-stream"
-    )
\ No newline at end of file
+        subscribe(buffer, http_request, last_event_id),
+        media_type="text/event-stream",
+        headers={"X-Run-Id": buffer.run_id},
+    )
+
+
+@app.get("/perfumes/{perfume_id}/similar")
+def similar_perfumes(perfume_id: int, limit: int = Query(10, ge=1, le=20)) -> dict[str, Any]:
+    """미리 계산된 유사 향수 목록 (scripts/recom/build_similar_perfumes.py)"""
+    items = get_similar_perfumes(perfume_id, limit)
+    if not items:
+        raise HTTPException(status_code=404, detail="유사 향수 정보가 없습니다.")
+    return {"perfume_id": perfume_id, "items": items}
+
+@app.get("/perfumes/{perfume_id}/layering")
+def layering_partners(perfume_id: int, limit: int = Query(10, ge=1, le=20)) -> dict[str, Any]:
+    """미리 계산된 레이어링 궁합 파트너 (scripts/recom/build_layering_pairs.py)"""
+    items = get_layering_partners(perfume_id, limit)
+    if not items:
+        raise HTTPException(status_code=404, detail="레이어링 정보가 없습니다.")
+    return {"perfume_id": perfume_id, "items": items}
+
+def has_internal_token(token: str | None) -> bool:
+    """X-Internal-Token 헤더가 INTERNAL_API_TOKEN 과 같은지 (토큰 미설정 환경에서는 항상 False)"""
+    if not INTERNAL_API_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), INTERNAL_API_TOKEN.encode())
+
+def require_internal_token(token: str | None = Header(None, alias="X-Internal-Token")) -> None:
+    """
+    내부 호출 확인: X-Internal-Token 헤더가 INTERNAL_API_TOKEN 과 같아야 함.
+    토큰이 설정되지 않은 환경에서는 엔드포인트 자체를 막음 (누구나 회원 잠금/조회 불가)
+    """
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=503, detail="내부 API 토큰이 설정되지 않았습니다.")
+    if not has_internal_token(token):
+        raise HTTPException(status_code=403, detail="내부 호출만 허용됩니다.")
+
+@app.post("/members/{member_id}/my-perfumes/changed", status_code=204, dependencies=[Depends(require_internal_token)])
+def my_perfumes_changed(member_id: int) -> None:
+    """등록 향수(TB_MEMBER_MY_PERFUME_T) 변경 알림: 캐시된 선호 벡터 무효화"""
+    invalidate_member(member_id)
+
+@app.post("/members/{member_id}/visits", dependencies=[Depends(require_internal_token)])
+def record_visit(member_id: int, event: VisitEvent) -> dict[str, Any]:
+    """방문 이벤트 기록 (TB_MEMBER_VISIT_T 버퍼 적재) + 현재 연속 비밀번호 오류 횟수"""
+    try:
+        count = visit_ingestor.record(member_id, event.visit_cd)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"member_id": member_id, "pwd_err_cnt": count, "locked": count >= MAX_PWD_ERR}
+
+@app.get("/members/{member_id}/lock", dependencies=[Depends(require_internal_token)])
+def member_lock(member_id: int) -> dict[str, Any]:
+    """로그인 잠금 여부 (TB_MEMBER_PWD_ERR_T PK 조회 1번, 방문 이력 테이블은 조회하지 않음)"""
+    count = visit_ingestor.pwd_err_count(member_id)
+    return {"member_id": member_id, "pwd_err_cnt": count, "locked": count >= MAX_PWD_ERR}
+
+@app.post("/chat/batch", dependencies=[Depends(require_internal_token)])
+async def chat_batch(
+    http_request: Request,
+    concurrency: int = Query(8, ge=1, le=MAX_BATCH_CONCURRENCY),
+):
+    """
+    일괄 실행 엔드포인트: JSONL 본문(requests.jsonl 형태)을 받아
+    완료되는 순서대로 JSONL 결과를 스트리밍합니다.
+    """
+    body = (await http_request.body()).decode("utf-8")
+    records = list(parse_jsonl(body.splitlines()))
+    if not records:
+        raise HTTPException(status_code=400, detail="질의가 없습니다.")
+
+    stop = threading.Event()
+    results = run_batch(workflow, records, concurrency, stop)
+
+    async def watch_disconnect():
+        # 결과가 오래 안 나오는 동안에도 클라이언트 이탈을 감지해서 남은 질의 중단
+        while not stop.is_set():
+            if await http_request.is_disconnected():
+                print("🛑 [Batch] 클라이언트 연결 끊김: 일괄 실행 중단")
+                stop.set()
+                return
+            await asyncio.sleep(1.0)
+
+    async def ndjson():
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            while True:
+                result = await asyncio.to_thread(next, results, None)
+                if result is None:
+                    break
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            stop.set()
+            watcher.cancel()
+            asyncio.get_running_loop().run_in_executor(None, close_results)
+
+    def close_results():
+        # 제너레이터가 yield에서 멈춘 상태면 close()로 run_batch 정리(실행 중인 run 취소) 실행
+        try:
+            results.close()
+        except ValueError:
+            pass  # 다른 스레드에서 실행 중: stop을 보고 스스로 정리함
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
@@ -2,13 +2,24 @@
 import os
 import json
 import re
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
 import psycopg2
 from psycopg2.extras import DictCursor
 from typing_extensions import TypedDict, Literal
 from langgraph.graph import StateGraph, START, END
-from openai import OpenAI
 from dotenv import load_dotenv
 
+from catalog_snapshot import VOCAB_TABLES, get_snapshot
+from llm_client import chat_completion, embedding_batcher
+from personalize import rerank
+from recom_writer import recom_writer
+from run_control import RunCancelled, check_cancelled, register_connection
+from session_store import load_session, save_session
+
 load_dotenv()
 
 # ==========================================
@@ -19,16 +30,17 @@ DB_CONFIG = {
     "user": "scentence",
     "password": "scentence",
     "host": os.getenv("DB_HOST", "localhost"),
-    "port": os.getenv("DB_PORT", "5433") 
+    "port": os.getenv("DB_PORT", "5433"),
+    # 느린 쿼리가 워커를 붙잡지 않도록 문장 단위 타임아웃
+    "options": f"-c statement_timeout={os.getenv('DB_STATEMENT_TIMEOUT_MS', '5000')}",
 }
 
-client = OpenAI()
-
 # ==========================================
 # 2. 유틸리티 & 메타데이터
 # ==========================================
 def get_db_connection():
-    return psycopg2.connect(**DB_CONFIG)
+    # 현재 run이 취소되면 실행 중인 쿼리도 함께 취소되도록 등록
+    return register_connection(psycopg2.connect(**DB_CONFIG))
 
 def safe_json_parse(text: str, default=None):
     if not text or not text.strip(): return default
@@ -41,7 +53,8 @@ def safe_json_parse(text: str, default=None):
         return default
 
 def get_embedding(text):
-    return client.embeddings.create(input=text.replace("\n", " "), model="text-embedding-3-small").data[0].embedding
+    # 동시에 실행 중인 다른 질의의 임베딩과 한 번의 API 호출로 묶임
+    return embedding_batcher.embed(text.replace("\n", " "))
 
 def load_metadata_from_db():
     print("🔄 [System] DB에서 메타데이터 로딩 중...")
@@ -52,7 +65,7 @@ def load_metadata_from_db():
             "SEASONS": ("tb_perfume_season_m", "season"),
             "GENDERS": ("tb_perfume_aud_m", "audience"),
             "OCCASIONS": ("tb_perfume_oca_m", "occasion"),
-            "ACCORDS": ("tb_perfume_accord_m", "accord")
+            "ACCORDS": ("tb_perfume_accord_vocab_m", "accord")
         }
         meta = {}
         for key, (tbl, col) in tables.items():
@@ -63,14 +76,90 @@ def load_metadata_from_db():
     except:
         return {"SEASONS": [], "GENDERS": [], "OCCASIONS": [], "ACCORDS": []}
 
-METADATA = load_metadata_from_db()
+def load_metadata_from_snapshot(snapshot):
+    return {
+        "SEASONS": snapshot.facet_values("season"),
+        "GENDERS": snapshot.facet_values("audience"),
+        "OCCASIONS": snapshot.facet_values("occasion"),
+        "ACCORDS": snapshot.facet_values("accord"),
+    }
+
+# 카탈로그 스냅샷(ETL이 만든 memory-map 파일)이 있으면 DB 조회 없이 시작 (catalog_snapshot.py)
+CATALOG = get_snapshot()
+METADATA = load_metadata_from_snapshot(CATALOG) if CATALOG else load_metadata_from_db()
+
+# 노트/어코드 사전: 정규화 키 → 정수 ID (필터는 ID로 비교, postgres/create/perfume_db/tb_perfume_vocab_m.sql)
+
+def vocab_key(value) -> str:
+    """DB FN_VOCAB_KEY 와 같은 규칙: 앞뒤 공백 제거, 연속 공백 1칸, 소문자"""
+    return " ".join(str(value).split()).lower()
+
+def load_vocab_from_db(keys_by_kind: dict | None = None) -> dict:
+    """{"note": {키: ID}, "accord": {...}} (keys_by_kind 를 주면 해당 키만 조회)"""
+    vocab = {kind: {} for kind in VOCAB_TABLES}
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        for kind, (tbl, id_col, key_col) in VOCAB_TABLES.items():
+            if keys_by_kind is None:
+                cur.execute(f"SELECT {key_col}, {id_col} FROM {tbl}")
+            elif keys_by_kind.get(kind):
+                cur.execute(f"SELECT {key_col}, {id_col} FROM {tbl} WHERE {key_col} = ANY(%s)",
+                            (list(keys_by_kind[kind]),))
+            else:
+                continue
+            vocab[kind] = dict(cur.fetchall())
+        conn.close()
+    except Exception as e:
+        print(f"⚠️ 사전 로딩 오류: {e}")
+    return vocab
+
+VOCAB = {kind: CATALOG.vocab(kind) for kind in VOCAB_TABLES} if CATALOG else load_vocab_from_db()
+
+def vocab_ids(kind: str, values) -> list[int]:
+    """노트/어코드 이름(표기 무관) → 사전 ID 목록. 시작 후 ETL로 추가된 키는 DB에서 찾아 캐시에 추가"""
+    values = values if isinstance(values, list) else [values]
+    keys = {vocab_key(v) for v in values if v}
+    cache = VOCAB[kind]
+    missing = keys - cache.keys()
+    if missing:
+        cache.update(load_vocab_from_db({kind: missing})[kind])
+    return sorted(cache[k] for k in keys if k in cache)
+
+# 벡터 검색 시 ANN으로 먼저 뽑는 후보 수 (이 안에서 패싯 필터 적용)
+# HNSW 인덱스 스캔은 hnsw.ef_search(기본 40)개까지만 반환하므로 검색 트랜잭션에서 ef_search 를 이 값 이상으로 올림
+VECTOR_CANDIDATES = 100
+
+# 최종 추천 수 / 로그인 회원은 더 넓은 후보를 가져와 선호 기반으로 재정렬
+RESULT_LIMIT = 5
+PERSONALIZE_POOL = 20
+
+# 리뷰 근거: 최종 향수별로 질문과 가장 가까운 리뷰 청크 (scripts/vectorDB/build_review_chunks.py)
+REVIEW_SNIPPETS_PER_PERFUME = 2
+REVIEW_SNIPPET_CHARS = 240
+
+# 질문 임베딩을 researcher의 LLM 호출과 동시에 미리 계산 (리뷰 스니펫 조회용)
+_prefetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="researcher-prefetch")
 
 # ==========================================
 # 3. 도구 (Tools)
 # ==========================================
 
+def search_notes_snapshot(snapshot, keyword: str) -> list[str]:
+    """search_notes_smart 와 같은 검색을 카탈로그 스냅샷의 노트 이름/임베딩으로 (DB 조회 없음)"""
+    clean_keyword = keyword.replace("향", "").strip().lower()
+    results = [note for note in snapshot.note_names if clean_keyword in note.lower()][:3]
+    if len(results) < 3:
+        results.extend(snapshot.nearest_notes(get_embedding(keyword), 3 - len(results), exclude=results))
+    print(f"   ✅ 노트 검색 결과: '{keyword}' -> {list(set(results))}")
+    return list(set(results))
+
 def search_notes_smart(keyword: str) -> list[str]:
     """하이브리드 노트 검색 (Text + Vector)"""
+    snapshot = get_snapshot()
+    if snapshot is not None and snapshot.has_note_vectors:
+        return search_notes_snapshot(snapshot, keyword)
+
     results = []
     try:
         conn = get_db_connection()
@@ -116,18 +205,206 @@ def search_exact_entity_name(keyword: str, entity_type: str = "brand") -> str |
     except:
         return keyword
 
-def execute_search_with_fallback(filters: list[dict]) -> str:
+def find_perfume_id(name: str) -> int | None:
+    """향수 이름 → perfume_id (정확 일치 우선, 없으면 부분 일치)"""
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT perfume_id FROM tb_perfume_basic_m
+            WHERE perfume_name ILIKE %s
+            ORDER BY (LOWER(perfume_name) = LOWER(%s)) DESC, LENGTH(perfume_name)
+            LIMIT 1
+            """,
+            (f"%{name}%", name),
+        )
+        row = cur.fetchone()
+        conn.close()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"⚠️ 향수 ID 조회 오류: {e}")
+        return None
+
+# 미리 계산된 향수 이웃 테이블 (scripts/recom/ 에서 생성)
+NEIGHBOR_TABLES = {
+    "similar": ("tb_perfume_similar_m", "similar_perfume_id"),     # build_similar_perfumes.py
+    "layering": ("tb_perfume_layering_m", "partner_perfume_id"),   # build_layering_pairs.py
+}
+
+NEIGHBOR_FIELDS = ("id", "brand", "name", "img_link", "score")
+NEIGHBOR_CACHE_TTL_SEC = 300  # 이웃 테이블 재생성이 API에 반영되는 최대 지연
+
+def get_perfume_neighbors(kind: str, perfume_id: int, limit: int = 10) -> list[dict]:
+    """
+    미리 계산된 이웃 목록 조회 (PK 조회 + 프로세스 내 캐시, NEIGHBOR_CACHE_TTL_SEC마다 다시 조회)
+    캐시는 불변 튜플로 보관하고 호출마다 새 dict 를 만들어 반환 (호출자가 바꿔도 캐시에 영향 없음)
+    """
+    ttl_bucket = int(time.monotonic() // NEIGHBOR_CACHE_TTL_SEC)
+    return [dict(zip(NEIGHBOR_FIELDS, row)) for row in _fetch_perfume_neighbors(kind, perfume_id, limit, ttl_bucket)]
+
+@lru_cache(maxsize=4096)
+def _fetch_perfume_neighbors(kind: str, perfume_id: int, limit: int, ttl_bucket: int) -> tuple[tuple, ...]:
+    """ttl_bucket 이 바뀌면 캐시 키가 달라져 DB를 다시 조회 (지난 구간 항목은 LRU로 밀려남)"""
+    table, partner_col = NEIGHBOR_TABLES[kind]
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor(cursor_factory=DictCursor)
+        cur.execute(
+            f"""
+            SELECT t.{partner_col} AS partner_id, t.score, b.perfume_brand, b.perfume_name, b.img_link
+            FROM {table} t
+            JOIN tb_perfume_basic_m b ON b.perfume_id = t.{partner_col}
+            WHERE t.perfume_id = %s
+            ORDER BY t.rank_no
+            LIMIT %s
+            """,
+            (perfume_id, limit),
+        )
+        return tuple(
+            (r["partner_id"], r["perfume_brand"], r["perfume_name"], r["img_link"], round(float(r["score"]), 4))
+            for r in cur.fetchall()
+        )
+    finally:
+        conn.close()
+
+def get_similar_perfumes(perfume_id: int, limit: int = 10) -> list[dict]:
+    return get_perfume_neighbors("similar", perfume_id, limit)
+
+def get_layering_partners(perfume_id: int, limit: int = 10) -> list[dict]:
+    return get_perfume_neighbors("layering", perfume_id, limit)
+
+def get_review_snippets(perfume_ids: list[int], query_vector: list[float],
+                        per_perfume: int = REVIEW_SNIPPETS_PER_PERFUME) -> dict[int, list[str]]:
+    """
+    향수별로 질문과 가장 가까운 리뷰 청크를 쿼리 1번으로 조회 (LATERAL + perfume_id 인덱스)
+    향수 1개의 청크는 많아야 수백 개라 정확 거리 정렬이 HNSW 전체 검색 + 필터보다 빠르고 누락이 없음
+    """
+    if not perfume_ids: return {}
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT p.perfume_id, s.snippet
+            FROM unnest(%s::bigint[]) AS p(perfume_id)
+            CROSS JOIN LATERAL (
+                SELECT left(c.content, %s) AS snippet
+                FROM tb_perfume_review_chunk_m c
+                WHERE c.perfume_id = p.perfume_id
+                -- "+ 0": HNSW 대신 perfume_id 인덱스로 좁힌 뒤 정렬하도록
+                ORDER BY (c.embedding <=> %s::vector) + 0
+                LIMIT %s
+            ) s
+            """,
+            (list(perfume_ids), REVIEW_SNIPPET_CHARS, str(query_vector), per_perfume),
+        )
+        snippets = {}
+        for perfume_id, snippet in cur.fetchall():
+            snippets.setdefault(perfume_id, []).append(snippet)
+        return snippets
+    finally:
+        conn.close()
+
+def search_review_snippets(perfume_ids: list[int], keywords: str,
+                           per_perfume: int = REVIEW_SNIPPETS_PER_PERFUME) -> dict[int, list[str]]:
+    """
+    리뷰 키워드 검색 (tsvector + GIN, postgres/create/perfume_db/tb_perfume_review_m_fts.sql)
+    후보 향수별 상위 리뷰의 일치 부분 스니펫을 쿼리 1번으로 조회
+    """
+    if not perfume_ids or not keywords: return {}
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT perfume_id, snippet FROM fn_search_review_snippets(%s, %s::bigint[], %s)",
+            (keywords, list(perfume_ids), per_perfume),
+        )
+        snippets = {}
+        for perfume_id, snippet in cur.fetchall():
+            snippets.setdefault(perfume_id, []).append(snippet)
+        return snippets
+    finally:
+        conn.close()
+
+def attach_review_snippets(items: list[dict], query_vector_future, keywords: str | None = None) -> None:
+    """
+    최종 결과에 리뷰 스니펫(item["reviews"])을 붙임. 실패해도 추천은 그대로 진행
+    keywords(지속력, projection 등)가 있으면 전문 검색, 없으면 질문 임베딩과 가까운 리뷰 청크
+    """
+    ids = [i["id"] for i in items]
+    try:
+        if keywords:
+            snippets = search_review_snippets(ids, keywords)
+        else:
+            snippets = get_review_snippets(ids, query_vector_future.result())
+    except Exception as e:
+        print(f"   ⚠️ 리뷰 스니펫 조회 생략: {e}")
+        return
+    for item in items:
+        item["reviews"] = snippets.get(item["id"], [])
+    if snippets:
+        print(f"   💬 리뷰 스니펫: 향수 {len(snippets)}개")
+
+# 검색 필터 컬럼 → 카탈로그 스냅샷 패싯 (노트/어코드는 사전 정규화 키로 비교 = SQL의 사전 ID 비교와 같음)
+FACET_FILTERS = {"season": "season", "gender": "audience", "occasion": "occasion", "note": "note", "accord": "accord"}
+
+def snapshot_has_match(snapshot, filters: list[dict], exclude_ids=None, candidate_ids=None) -> bool:
+    """
+    스냅샷 패싯 비트맵으로 패싯 필터를 모두 만족하는 향수가 있는지 확인 (DB 조회 없음).
+    브랜드/이름/벡터 후보 조건은 결과를 더 줄이기만 하므로, False면 SQL도 결과가 없습니다.
+    """
+    ids = snapshot.arrays["perfume_ids"]
+    mask = np.ones(len(ids), dtype=bool)
+    for f in filters:
+        facet = FACET_FILTERS.get(f['column'])
+        if facet is None:
+            continue
+        values = f['value'] if isinstance(f['value'], list) else [f['value']]
+        if f['column'] in ('note', 'accord'):
+            keys = {vocab_key(v) for v in values if v}
+            values = [v for v in snapshot.facet_values(facet) if vocab_key(v) in keys]
+        mask &= snapshot.facet_mask(facet, values)
+        if not mask.any():
+            return False
+    if candidate_ids:
+        mask &= np.isin(ids, list(candidate_ids))
+    if exclude_ids:
+        mask &= ~np.isin(ids, list(exclude_ids))
+    return bool(mask.any())
+
+def execute_search_with_fallback(
+    filters: list[dict],
+    exclude_ids: list[int] | None = None,
+    query_vector: list[float] | None = None,
+    candidate_ids: list[int] | None = None,
+    limit: int = RESULT_LIMIT,
+) -> list[dict]:
     """
     [핵심 수정] 필터 조건에 맞는 향수를 검색하되, 
-    STRING_AGG를 사용하여 노트, 어코드, 계절 정보를 모두 가져옵니다.
+    ARRAY_AGG를 사용하여 노트, 어코드, 계절 정보를 모두 가져옵니다.
+    결과는 구조화된 레코드(카드 렌더링용)로 반환하고, Writer용 텍스트는 format_research_result에서 만듭니다.
+    exclude_ids: 이미 보여준 향수 (조건 완화 대상 아님)
+    query_vector: 주어지면 향수 임베딩 ANN 후보 안에서 필터를 적용하고 유사도순 정렬
+    candidate_ids: 주어지면 이 향수들 안에서만 필터를 적용하고 주어진 순서대로 정렬 (유사 향수 등)
+    limit: 반환할 최대 개수 (회원 재정렬 시 후보 풀 크기)
     """
-    if not filters: return "검색 조건을 추출하지 못했습니다."
+    if not filters and query_vector is None and not candidate_ids: return []
     
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=DictCursor)
+    snapshot = get_snapshot()
     
     while True:
         print(f"\n🔄 [DB] 검색 시도: {[f['column'] + '=' + str(f['value']) for f in filters]}")
+
+        # 패싯 비트맵상 결과가 없는 조합이면 SQL 없이 바로 조건 완화
+        if snapshot is not None and not snapshot_has_match(snapshot, filters, exclude_ids, candidate_ids):
+            if not filters:
+                break
+            removed = filters.pop()
+            print(f"   ❌ 패싯 기준 결과 없음 (SQL 생략) -> 조건 완화: '{removed['column']}' 제거")
+            continue
         
         where_clauses = []
         params = []
@@ -139,67 +416,111 @@ def execute_search_with_fallback(filters: list[dict]) -> str:
             
             if col == 'brand': clause = "AND b.perfume_brand ILIKE %s"
             elif col == 'perfume_name': clause = "AND b.perfume_name ILIKE %s"
-            elif col == 'note': 
-                if isinstance(val, list) and val:
-                    # 노트 목록 중 '하나라도' 포함되면 검색 (OR 조건 느낌의 IN)
-                    # 주의: JOIN 후 필터링하면 해당 노트만 남을 수 있으므로, 
-                    # 정확한 스펙을 위해서는 Subquery가 좋지만 성능상 여기서는 JOIN 필터 사용
-                    clause = f"AND n.note IN ({','.join(['%s']*len(val))})"
-                    where_clauses.append(clause)
-                    params.extend(val)
-                    continue
-                else: clause = "AND n.note = %s"
+            elif col in ('note', 'accord'):
+                # 노트/어코드는 사전 ID(정수)로 비교. 목록이면 '하나라도' 포함 (사전에 없는 값 → 결과 없음 → 조건 완화)
+                # 주의: JOIN 후 필터링하면 해당 노트만 남을 수 있으므로,
+                # 정확한 스펙을 위해서는 Subquery가 좋지만 성능상 여기서는 JOIN 필터 사용
+                alias = "n.note_id" if col == 'note' else "ac.accord_id"
+                where_clauses.append(f"AND {alias} = ANY(%s)")
+                params.append(vocab_ids(col, val))
+                continue
             elif col == 'season': clause = "AND s.season = %s"
             elif col == 'gender': clause = "AND a.audience = %s"
             elif col == 'occasion': clause = "AND o.occasion = %s"
-            elif col == 'accord': clause = "AND ac.accord = %s"
             else: continue
             
             where_clauses.append(clause)
             params.append(val)
 
+        if exclude_ids:
+            where_clauses.append("AND b.perfume_id <> ALL(%s)")
+            params.append(list(exclude_ids))
+
+        order_params = []
+        if candidate_ids:
+            where_clauses.append("AND b.perfume_id = ANY(%s)")
+            params.append(list(candidate_ids))
+
+        # 벡터 검색: HNSW 인덱스로 후보를 한 번에 뽑고, 그 안에서 패싯 필터 적용
+        vector_cte, vector_join, order_by = "", "", ""
+        if query_vector is not None:
+            vector_cte = f"""
+            WITH cand AS (
+                SELECT perfume_id, embedding <=> %s::vector AS distance
+                FROM tb_perfume_embedding_m
+                ORDER BY embedding <=> %s::vector
+                LIMIT {VECTOR_CANDIDATES}
+            )"""
+            vector_join = "JOIN cand ON cand.perfume_id = b.perfume_id"
+            order_by = "ORDER BY MIN(cand.distance)"
+            params = [str(query_vector), str(query_vector)] + params
+        elif candidate_ids:
+            order_by = "ORDER BY array_position(%s::bigint[], b.perfume_id)"
+            order_params = [list(candidate_ids)]
+
         # 2. [Aggregation Query] 모든 정보 긁어오기
-        # STRING_AGG(DISTINCT col, ', ')로 중복 제거하며 합치기
-        sql = f"""
+        # ARRAY_AGG(DISTINCT col)로 중복 제거하며 목록으로 합치기
+        sql = f"""{vector_cte}
             SELECT 
                 b.perfume_id,
                 b.perfume_name, 
                 b.perfume_brand,
-                STRING_AGG(DISTINCT ac.accord, ', ') as accords,
-                STRING_AGG(DISTINCT s.season, ', ') as seasons,
-                STRING_AGG(DISTINCT a.audience, ', ') as genders,
-                STRING_AGG(DISTINCT o.occasion, ', ') as occasions,
+                b.img_link,
+                ARRAY_AGG(DISTINCT av.accord) FILTER (WHERE av.accord IS NOT NULL) as accords,
+                ARRAY_AGG(DISTINCT s.season) FILTER (WHERE s.season IS NOT NULL) as seasons,
+                ARRAY_AGG(DISTINCT a.audience) FILTER (WHERE a.audience IS NOT NULL) as genders,
+                ARRAY_AGG(DISTINCT o.occasion) FILTER (WHERE o.occasion IS NOT NULL) as occasions,
                 -- 검색된 노트 위주로 보일 수 있지만 정보 제공 차원
-                STRING_AGG(DISTINCT n.note, ', ') as notes 
+                ARRAY_AGG(DISTINCT nv.note) FILTER (WHERE nv.note IS NOT NULL) as notes 
             FROM tb_perfume_basic_m b
+            {vector_join}
             LEFT JOIN tb_perfume_notes_m n ON b.perfume_id = n.perfume_id
+            LEFT JOIN tb_perfume_note_vocab_m nv ON nv.note_id = n.note_id
             LEFT JOIN tb_perfume_season_m s ON b.perfume_id = s.perfume_id
             LEFT JOIN tb_perfume_aud_m a ON b.perfume_id = a.perfume_id
             LEFT JOIN tb_perfume_oca_m o ON b.perfume_id = o.perfume_id
             LEFT JOIN tb_perfume_accord_m ac ON b.perfume_id = ac.perfume_id
+            LEFT JOIN tb_perfume_accord_vocab_m av ON av.accord_id = ac.accord_id
             WHERE 1=1 {' '.join(where_clauses)}
-            GROUP BY b.perfume_id, b.perfume_name, b.perfume_brand
-            LIMIT 5;
+            GROUP BY b.perfume_id, b.perfume_name, b.perfume_brand, b.img_link
+            {order_by}
+            LIMIT {int(limit)};
         """
         
         try:
-            cur.execute(sql, tuple(params))
+            if query_vector is not None:
+                # SET LOCAL: 이 트랜잭션에만 적용 (rollback 되면 사라지므로 시도마다 설정)
+                cur.execute(f"SET LOCAL hnsw.ef_search = {max(VECTOR_CANDIDATES, 40)}")
+            cur.execute(sql, tuple(params + order_params))
             rows = cur.fetchall()
             
             if rows:
                 conn.close()
-                # 3. 결과 포맷팅 (풍부한 정보 제공)
-                result_txt = "🔍 [DB 검색 결과 - 상세 정보]:\n\n"
-                for i, r in enumerate(rows, 1):
-                    result_txt += f"{i}. [{r['perfume_brand']}] {r['perfume_name']}\n"
-                    result_txt += f"   - 특징(Accord): {r['accords']}\n"
-                    result_txt += f"   - 분위기: {r['seasons']} / {r['genders']} / {r['occasions']}\n"
-                    result_txt += f"   - 주요 노트: {r['notes']}\n\n"
-                return result_txt
+                # 3. 구조화된 결과 레코드
+                return [
+                    {
+                        "id": r["perfume_id"],
+                        "brand": r["perfume_brand"],
+                        "name": r["perfume_name"],
+                        "img_link": r["img_link"],
+                        "accords": r["accords"] or [],
+                        "seasons": r["seasons"] or [],
+                        "genders": r["genders"] or [],
+                        "occasions": r["occasions"] or [],
+                        "notes": r["notes"] or [],
+                    }
+                    for r in rows
+                ]
                 
         except Exception as e:
             conn.rollback()
             print(f"   ⚠️ SQL 에러: {e}")
+            # 취소로 인한 쿼리 중단이면 조건 완화 없이 바로 종료
+            try:
+                check_cancelled()
+            except RunCancelled:
+                conn.close()
+                raise
             
         if filters:
             removed = filters.pop()
@@ -208,7 +529,42 @@ def execute_search_with_fallback(filters: list[dict]) -> str:
             break
             
     conn.close()
-    return "검색 결과가 없습니다."
+    return []
+
+def format_research_result(items: list[dict], note: str | None = None) -> str:
+    """구조화된 검색 결과를 Writer 프롬프트용 텍스트로 변환 (풍부한 정보 제공)"""
+    if not items: return "검색 결과가 없습니다."
+
+    join = lambda values: ", ".join(values) if values else None
+    result_txt = "🔍 [DB 검색 결과 - 상세 정보]:\n\n"
+    if note: result_txt += f"※ {note}\n\n"
+    for i, r in enumerate(items, 1):
+        result_txt += f"{i}. [{r['brand']}] {r['name']}\n"
+        result_txt += f"   - 특징(Accord): {join(r['accords'])}\n"
+        result_txt += f"   - 분위기: {join(r['seasons'])} / {join(r['genders'])} / {join(r['occasions'])}\n"
+        result_txt += f"   - 주요 노트: {join(r['notes'])}\n"
+        if r.get("reviews"):
+            result_txt += f"   - 사용자 리뷰: {' / '.join(repr(t) for t in r['reviews'])}\n"
+        result_txt += "\n"
+    return result_txt
+
+# 필터 컬럼 → 결과 레코드 필드 (세션에 캐시된 결과를 좁힐 때 사용)
+ITEM_FIELD_BY_COLUMN = {
+    "brand": "brand", "perfume_name": "name", "note": "notes", "season": "seasons",
+    "gender": "genders", "occasion": "occasions", "accord": "accords",
+}
+
+def narrow_cached_items(items: list[dict], filters: list[dict]) -> list[dict]:
+    """직전 검색 결과 중 새 필터를 모두 만족하는 것만 남김 (DB 조회 없음)"""
+    def matches(item, f):
+        field = ITEM_FIELD_BY_COLUMN.get(f["column"])
+        if field is None: return False
+        have = item.get(field) or []
+        have = {vocab_key(h) for h in ([have] if isinstance(have, str) else have)}
+        wanted = f["value"] if isinstance(f["value"], list) else [f["value"]]
+        return any(vocab_key(w) in have for w in wanted)
+
+    return [item for item in items if all(matches(item, f) for f in filters)]
 
 # ==========================================
 # 4. State & Nodes
@@ -218,35 +574,101 @@ class State(TypedDict):
     route: Literal["interviewer", "researcher", "writer"]
     clarified_query: str | None
     research_result: str | None
+    research_items: list[dict] | None  # 카드 렌더링용 구조화 결과 (SSE results 이벤트)
+    recom_type: Literal["GENERAL", "LAYERING"] | None
+    member_id: int | None  # 로그인 회원이면 등록 향수 기반 재정렬
+    record_recom: bool | None  # False면 추천 이력 기록 생략 (batch_chat 오프라인 평가)
     final_response: str
+    # 세션 체크포인트 (session_store 참고)
+    session_id: str | None
+    applied_filters: list[dict] | None
+    shown_ids: list[int] | None
+    conversation_history: list[dict] | None
+
+def load_session_state(state: State) -> State:
+    """
+    세션이 있으면 직전 턴의 압축 상태를 복원.
+    clarified_query 는 턴마다 새로 정하므로 항상 비움 (이전 버전이 저장한 값이 남아 있어도 이번 질문을 가리지 않도록)
+    """
+    if not state.get("session_id"): return {"clarified_query": None}
+    restored = load_session(state["session_id"])
+    if restored:
+        print(f"\n💾 [Session] 복원: 필터 {len(restored.get('applied_filters', []))}개, 노출 {len(restored.get('shown_ids', []))}개")
+    return {**restored, "clarified_query": None}
+
+def save_session_state(state: State) -> State:
+    """이번 턴 결과를 세션에 압축 저장"""
+    if state.get("session_id"):
+        save_session(state["session_id"], state)
+    return {}
+
+def record_recommendations(state: State) -> State:
+    """회원에게 보여준 추천을 TB_MEMBER_RECOM_RESULT_T에 기록 (write-behind 큐, 응답 지연 없음)"""
+    if state.get("record_recom") is False:
+        return {}
+    if state.get("member_id") and state.get("research_items"):
+        recom_writer.enqueue(
+            state["member_id"],
+            state["research_items"],
+            recom_type=state.get("recom_type") or "GENERAL",
+            reason=state.get("clarified_query") or state["user_query"],
+        )
+    return {}
 
 def supervisor(state: State) -> State:
     return {"route": "researcher"} # 편의상 고정 (테스트용)
 
 def researcher(state: State) -> State:
+    check_cancelled()
     query = state.get("clarified_query") or state["user_query"]
     print(f"\n🕵️ [Researcher] 검색 설계 시작: '{query}'")
     
+    prior_filters = state.get("applied_filters") or []
+    prior_items = state.get("research_items") or []
+    shown_ids = state.get("shown_ids") or []
+    member_id = state.get("member_id")
+    history = (state.get("conversation_history") or [])[-3:]
+    query_vector_future = None  # 리뷰 스니펫용 질문 임베딩 (임베딩 경로를 쓸 때만 요청)
+    
     prompt = f"""
     당신은 SQL 검색 조건을 설계하는 전문가입니다.
     사용자 질문: "{query}"
     DB 메타데이터: {json.dumps(METADATA, indent=2, ensure_ascii=False)}
+    이전 대화: {json.dumps(history, ensure_ascii=False)}
+    이전에 적용한 필터: {json.dumps(prior_filters, ensure_ascii=False)}
     
     [규칙]
     1. 'filters'에 SQL 조건을 담되, **중요한 조건 순서대로** 배치하세요.
     2. **[필수] 노트(향) 키워드는 반드시 영어(English)로 번역해서 'note_keywords'에 담으세요.** (예: 레몬->Lemon, 흙->Earth, 장미->Rose)
     3. 브랜드/향수 이름은 'entity_keyword'에 담으세요.
+    4. 이전 대화에 이어지는 질문이면 'follow_up'을 true로 하고, 'filters'에는 **새로 추가된 조건만** 담으세요.
+    5. 이전 결과와 다른 향수를 더 원하면("하나 더", "다른 거") 'need_new_items'를 true로 하세요.
+    6. "비 온 뒤 숲 냄새"처럼 분위기·장면을 묘사하는 막연한 표현은 노트로 번역하지 말고 'vibe_query'에 그대로 담으세요. (명확한 조건만 있으면 null)
+    7. "이거랑 비슷한 향수"처럼 특정 향수와 비슷한 것을 찾으면 'similar_to'에 그 향수 이름을 담으세요.
+    8. 특정 향수와 겹쳐 뿌릴(레이어링) 향수를 찾으면 'layering_with'에 그 향수 이름을 담으세요.
+    9. 지속력·확산력·잔향처럼 실제 사용 후기로 확인할 특성을 물으면 'review_keywords'에 한국어와 영어 키워드를 함께 담으세요. (예: ["지속력", "longevity"])
     
     응답(JSON):
     {{
         "filters": [ {{ "column": "accord", "value": "Citrus" }} ],
         "note_search_needed": true,
         "note_keywords": ["Lemon"], 
-        "entity_search_needed": false
+        "entity_search_needed": false,
+        "follow_up": false,
+        "need_new_items": false,
+        "vibe_query": null,
+        "similar_to": null,
+        "layering_with": null,
+        "review_keywords": []
     }}
     """
+    items = []
+    applied_filters = prior_filters
+    recom_type = "GENERAL"
+    result_note = None
     try:
-        msg = client.chat.completions.create(
+        msg = chat_completion(
+            "researcher",
             model="gpt-4o-mini", 
             messages=[{"role": "user", "content": prompt}], 
             response_format={"type": "json_object"}
@@ -266,18 +688,94 @@ def researcher(state: State) -> State:
             
         for f in plan.get("filters", []):
             final_filters.append(f)
-            
-        result = execute_search_with_fallback(final_filters)
+
+        is_follow_up = bool(plan.get("follow_up")) and bool(prior_filters or prior_items)
+
+        # 막연한 묘사는 향수 임베딩 ANN 한 번으로 처리 (노트 번역 + 정확 일치 조인 대신)
+        query_vector = get_embedding(plan["vibe_query"]) if plan.get("vibe_query") else None
+
+        # 특정 향수와 비슷한 향수: 미리 계산된 이웃 목록을 후보로 사용
+        candidate_ids = None
+        if plan.get("similar_to"):
+            base_id = find_perfume_id(plan["similar_to"])
+            if base_id:
+                candidate_ids = [p["id"] for p in get_similar_perfumes(base_id, 20)]
+                final_filters = [f for f in final_filters if f["column"] not in ("brand", "perfume_name")]
+                query_vector = None
+                print(f"   🔗 '{plan['similar_to']}'(#{base_id}) 유사 향수 후보 {len(candidate_ids)}개")
+
+        # 레이어링: LLM 추론 대신 미리 계산된 궁합 파트너 목록을 후보로 사용
+        if plan.get("layering_with"):
+            base_id = find_perfume_id(plan["layering_with"])
+            if base_id:
+                candidate_ids = [p["id"] for p in get_layering_partners(base_id, 20)]
+                final_filters = [f for f in final_filters if f["column"] not in ("brand", "perfume_name")]
+                query_vector = None
+                recom_type = "LAYERING"
+                result_note = f"'{plan['layering_with']}'와(과) 레이어링 궁합이 좋은 순서입니다. 어코드는 어울리고 노트는 서로 보완합니다."
+                print(f"   🧪 '{plan['layering_with']}'(#{base_id}) 레이어링 후보 {len(candidate_ids)}개")
+
+        # 리뷰 스니펫용 질문 임베딩: 키워드 전문 검색으로 답하지 않고 검색할 조건이 있을 때만,
+        # 아래 검색 쿼리들과 겹쳐서 미리 요청 (결과가 없으면 아직 시작 전인 요청은 취소)
+        keywords = " ".join(str(k) for k in plan.get("review_keywords") or [])
+        if not keywords and (final_filters or query_vector is not None or candidate_ids):
+            query_vector_future = _prefetch_executor.submit(contextvars.copy_context().run, get_embedding, query)
+
+        # 1) 좁히기 질문: 직전 결과 안에서 먼저 해결 (재검색 없음)
+        if is_follow_up and final_filters and prior_items and not plan.get("need_new_items"):
+            items = narrow_cached_items(prior_items, final_filters)
+            if items:
+                print(f"   ♻️ 세션 캐시 재사용: {len(prior_items)}개 → {len(items)}개")
+                applied_filters = final_filters + prior_filters
+
+        # 2) 재검색: 새 조건을 우선하고 이전 조건을 이어 붙임 (완화 시 이전 조건부터 제거), 본 향수는 제외
+        if not items:
+            if is_follow_up:
+                final_filters += [f for f in prior_filters if f not in final_filters]
+            if final_filters or query_vector is not None or candidate_ids:
+                search_filters = list(final_filters)
+                items = execute_search_with_fallback(
+                    search_filters,
+                    exclude_ids=shown_ids if is_follow_up else None,
+                    query_vector=query_vector,
+                    candidate_ids=candidate_ids,
+                    limit=PERSONALIZE_POOL if member_id else RESULT_LIMIT,
+                )
+                if items: applied_filters = search_filters
+
+        # 3) 회원 맞춤 재정렬: 보유/미관심 제외 + 선호 유사도 반영 후 상위 RESULT_LIMIT개
+        if member_id and items:
+            pool_size = len(items)
+            items = rerank(member_id, items, RESULT_LIMIT)
+            print(f"   👤 회원 #{member_id} 맞춤 재정렬: {pool_size}개 → {len(items)}개")
+
+        # 4) 리뷰 근거: 최종 향수들의 리뷰 스니펫 (인덱스 조회 1번)
+        if items:
+            if query_vector_future is None and not keywords:
+                query_vector_future = _prefetch_executor.submit(contextvars.copy_context().run, get_embedding, query)
+            attach_review_snippets(items, query_vector_future, keywords or None)
+        elif query_vector_future is not None:
+            query_vector_future.cancel()
+
+        if items or final_filters or query_vector is not None or candidate_ids:
+            result = format_research_result(items, result_note)
+        else:
+            result = "검색 조건을 추출하지 못했습니다."
     except Exception as e:
         result = f"오류 발생: {e}"
         
-    return {"research_result": result, "route": "writer"}
+    return {
+        "research_result": result, "research_items": items, "applied_filters": applied_filters,
+        "recom_type": recom_type, "route": "writer",
+    }
 
 def writer(state: State) -> State:
+    check_cancelled()
     print("\n✍️ [Writer] 답변 생성 중...")
     prompt = f"""
     당신은 전문 조향사입니다. 아래 [DB 검색 결과]를 바탕으로 추천 답변을 작성하세요.
     
+    [이전 대화]: {json.dumps((state.get('conversation_history') or [])[-3:], ensure_ascii=False)}
     [사용자 질문]: {state['user_query']}
     [DB 검색 결과]: 
     {state.get('research_result')}
@@ -286,17 +784,24 @@ def writer(state: State) -> State:
     1. **DB에서 찾은 정보(노트, 어코드, 분위기 등)를 상세히 인용하여 설명하세요.**
     2. 단순히 나열하지 말고, "이 향수는 ~한 노트가 어우러져 ~한 느낌을 줍니다" 처럼 스토리텔링 하세요.
     3. 검색된 향수가 없다면 솔직히 말하고 대안을 제시하세요.
+    4. '사용자 리뷰'가 있으면 실제 착용 후기로 짧게 인용해 근거로 삼으세요. (리뷰에 없는 내용은 지어내지 마세요)
     """
-    msg = client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}])
+    msg = chat_completion("writer", model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}])
     return {"final_response": msg.choices[0].message.content}
 
 def build_graph():
     graph = StateGraph(State)
+    graph.add_node("load_session", load_session_state)
     graph.add_node("supervisor", supervisor)
     graph.add_node("researcher", researcher)
     graph.add_node("writer", writer)
-    graph.add_edge(START, "supervisor")
+    graph.add_node("record_recom", record_recommendations)
+    graph.add_node("save_session", save_session_state)
+    graph.add_edge(START, "load_session")
+    graph.add_edge("load_session", "supervisor")
     graph.add_edge("supervisor", "researcher")
     graph.add_edge("researcher", "writer")
-    graph.add_edge("writer", END)
+    graph.add_edge("writer", "record_recom")
+    graph.add_edge("record_recom", "save_session")
+    graph.add_edge("save_session", END)
     return graph.compile()
\ No newline at end of file
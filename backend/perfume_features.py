@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+향수 특징 행렬 (유사 향수 / 레이어링 / 개인화 재정렬 공용)
+
+향수 1개 = 행 1개. 각 블록은 투표 비율(또는 노트 위치 가중치)로 채운 뒤
+블록별로 L2 정규화하고 블록 가중치를 곱해 이어 붙입니다.
+마지막에 행 단위로 다시 L2 정규화하므로 두 행의 내적 = 코사인 유사도입니다.
+"""
+import io
+from dataclasses import dataclass
+
+import numpy as np
+
+# 블록 가중치: 어코드/노트가 향의 정체성, 계절/상황은 보조 신호
+BLOCK_WEIGHTS = {"accord": 1.0, "note": 1.0, "season": 0.4, "occasion": 0.4}
+
+# 노트 위치 가중치 (잔향이 오래 남는 BASE가 가장 큼)
+NOTE_TYPE_WEIGHTS = {"TOP": 0.6, "MIDDLE": 0.8, "BASE": 1.0}
+
+# 2개 이상 향수에 등장한 노트만 사용 (희귀 노트는 유사도에 기여하지 못하고 차원만 늘림)
+MIN_NOTE_DF = 2
+
+# 어코드/노트는 사전 ID로 저장되어 있어 표시명은 사전 테이블에서 가져옴 (열 이름용)
+VOTE_TABLES = {
+    "accord": ("tb_perfume_accord_m JOIN tb_perfume_accord_vocab_m USING (accord_id)", "accord"),
+    "season": ("tb_perfume_season_m", "season"),
+    "occasion": ("tb_perfume_oca_m", "occasion"),
+}
+
+
+@dataclass
+class FeatureMatrix:
+    perfume_ids: np.ndarray           # (N,) int64
+    matrix: np.ndarray                # (N, D) float32, 행 L2 정규화
+    blocks: dict                      # 블록명 → (시작 열, 끝 열)
+    vocab: list                       # 열 이름 ("accord:Woody", "note:Rose", ...)
+
+    def __post_init__(self):
+        self._row_by_id = {int(pid): i for i, pid in enumerate(self.perfume_ids)}
+
+    def rows_for(self, perfume_ids) -> np.ndarray:
+        """향수ID 목록 → 행 인덱스 (없는 ID는 -1)"""
+        return np.array([self._row_by_id.get(int(pid), -1) for pid in perfume_ids], dtype=np.int64)
+
+    def block(self, name: str) -> np.ndarray:
+        start, end = self.blocks[name]
+        return self.matrix[:, start:end]
+
+
+def _fill_block(rows, row_by_id, vocab_index, n_perfumes) -> np.ndarray:
+    """(perfume_id, key, weight) 목록 → 행별 합이 1인 가중치 블록"""
+    block = np.zeros((n_perfumes, len(vocab_index)), dtype=np.float32)
+    for pid, key, weight in rows:
+        i, j = row_by_id.get(pid), vocab_index.get(key)
+        if i is not None and j is not None and weight:
+            block[i, j] += float(weight)
+    sums = block.sum(axis=1, keepdims=True)
+    np.divide(block, sums, out=block, where=sums > 0)
+    return block
+
+
+def _l2_normalize(block: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    np.divide(block, norms, out=block, where=norms > 0)
+    return block
+
+
+def load_feature_matrix(conn) -> FeatureMatrix:
+    """perfume_db에서 투표 가중 특징 행렬 생성"""
+    cur = conn.cursor()
+    cur.execute("SELECT perfume_id FROM tb_perfume_basic_m ORDER BY perfume_id")
+    perfume_ids = np.array([r[0] for r in cur.fetchall()], dtype=np.int64)
+    row_by_id = {int(pid): i for i, pid in enumerate(perfume_ids)}
+    n = len(perfume_ids)
+
+    blocks, vocab, parts = {}, [], []
+
+    def add_block(name, rows):
+        keys = sorted({key for _, key, _ in rows})
+        vocab_index = {key: j for j, key in enumerate(keys)}
+        block = _l2_normalize(_fill_block(rows, row_by_id, vocab_index, n)) * BLOCK_WEIGHTS[name]
+        start = sum(p.shape[1] for p in parts)
+        blocks[name] = (start, start + len(keys))
+        vocab.extend(f"{name}:{key}" for key in keys)
+        parts.append(block)
+
+    for name in ("accord", "season", "occasion"):
+        table, col = VOTE_TABLES[name]
+        cur.execute(f"SELECT perfume_id, {col}, COALESCE(vote, 0) FROM {table} WHERE vote > 0")
+        add_block(name, cur.fetchall())
+
+    cur.execute(f"""
+        SELECT n.perfume_id, v.note, n.type
+        FROM tb_perfume_notes_m n
+        JOIN tb_perfume_note_vocab_m v ON v.note_id = n.note_id
+        WHERE n.note_id IN (
+            SELECT note_id FROM tb_perfume_notes_m
+            GROUP BY note_id HAVING COUNT(DISTINCT perfume_id) >= {MIN_NOTE_DF}
+        )
+    """)
+    add_block("note", [(pid, note, NOTE_TYPE_WEIGHTS.get(t, 1.0)) for pid, note, t in cur.fetchall()])
+    cur.close()
+
+    matrix = _l2_normalize(np.hstack(parts).astype(np.float32, copy=False))
+    return FeatureMatrix(perfume_ids=perfume_ids, matrix=matrix, blocks=blocks, vocab=vocab)
+
+
+def blocked_top_k(left: np.ndarray, right: np.ndarray, k: int, score_fn=None,
+                  block_size: int = 512, exclude_self: bool = True):
+    """
+    left의 각 행에 대해 right에서 점수 상위 k개를 구합니다.
+    (block_size × N) 점수 타일만 메모리에 올리므로 전체 N × N 행렬을 만들지 않습니다.
+
+    score_fn(left_block, right, row_offset) → (B, N) 점수. 기본값은 내적(코사인).
+    반환: (indices (N, k) int64, scores (N, k) float32), 점수 내림차순
+    """
+    n = left.shape[0]
+    k = min(k, right.shape[0] - (1 if exclude_self else 0))
+    top_idx = np.empty((n, k), dtype=np.int64)
+    top_score = np.empty((n, k), dtype=np.float32)
+
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        if score_fn is None:
+            scores = left[start:end] @ right.T
+        else:
+            scores = score_fn(left[start:end], right, start)
+        if exclude_self:
+            rows = np.arange(end - start)
+            scores[rows, rows + start] = -np.inf
+
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        top_idx[start:end] = np.take_along_axis(part, order, axis=1)
+        top_score[start:end] = np.take_along_axis(part_scores, order, axis=1)
+
+    return top_idx, top_score
+
+
+def store_top_k(conn, table: str, partner_col: str, perfume_ids: np.ndarray,
+                top_idx: np.ndarray, top_score: np.ndarray) -> int:
+    """
+    (perfume_id, rank_no, partner, score) 이웃 테이블을 COPY로 통째 교체합니다.
+    한 트랜잭션 안에서 TRUNCATE + COPY 하므로 조회 측은 이전/새 목록 중 하나만 봅니다.
+    점수가 0 이하인 이웃은 저장하지 않습니다.
+    """
+    buf = io.StringIO()
+    for i, pid in enumerate(perfume_ids):
+        for rank, (j, score) in enumerate(zip(top_idx[i], top_score[i]), 1):
+            if score <= 0:
+                break
+            buf.write(f"{pid}\t{rank}\t{perfume_ids[j]}\t{score:.6f}\n")
+    buf.seek(0)
+
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    perfume_id      BIGINT    NOT NULL,
+                    rank_no         SMALLINT  NOT NULL,
+                    {partner_col}   BIGINT    NOT NULL,
+                    score           REAL      NOT NULL,
+                    load_dt         TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    CONSTRAINT pk_{table} PRIMARY KEY (perfume_id, rank_no)
+                );
+            """)
+            cur.execute(f"TRUNCATE {table}")
+            cur.copy_expert(f"COPY {table} (perfume_id, rank_no, {partner_col}, score) FROM STDIN", buf)
+            cur.execute(f"SELECT count(*) FROM {table}")
+            return cur.fetchone()[0]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+추천 결과 기록 (recom_db.TB_MEMBER_RECOM_RESULT_T) - write-behind
+
+채팅 경로에서는 큐에 넣기만 하고 바로 반환합니다.
+백그라운드 스레드가 FLUSH_SIZE건이 모이거나 FLUSH_INTERVAL_SEC가 지나면
+여러 행을 INSERT 1번(execute_values)으로 묶어 저장합니다. (write_behind.py 참고)
+"""
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+from personalize import RECOM_DB_URL
+from write_behind import WriteBehindQueue
+
+FLUSH_SIZE = 200             # 이만큼 모이면 바로 저장
+FLUSH_INTERVAL_SEC = 2.0     # 덜 모여도 이 주기마다 저장
+MAX_QUEUE = 20000            # 큐 상한 (DB 장애 시 메모리 보호, 넘치면 오래된 행부터 버림)
+MAX_REASON_CHARS = 500
+
+INSERT_SQL = """
+    INSERT INTO tb_member_recom_result_t
+        (member_id, perfume_id, perfume_name, recom_type, recom_reason, recom_dt)
+    VALUES %s
+    ON CONFLICT (member_id, perfume_id, recom_dt) DO NOTHING
+"""
+
+
+class RecomResultWriter(WriteBehindQueue):
+    name = "RecomWriter"
+
+    def __init__(self, dsn: str = RECOM_DB_URL, flush_size: int = FLUSH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL_SEC, max_queue: int = MAX_QUEUE):
+        super().__init__(dsn, flush_size, flush_interval, max_queue)
+
+    def enqueue(self, member_id: int, items: list[dict], recom_type: str = "GENERAL",
+                reason: str | None = None) -> None:
+        """추천 결과 행을 큐에 추가 (DB 접근 없음)"""
+        if not items:
+            return
+        now = datetime.now()
+        reason = reason[:MAX_REASON_CHARS] if reason else None
+        self._put([(member_id, item["id"], item["name"], recom_type, reason, now) for item in items])
+
+    def _write_batch(self, conn, batch: list[tuple]) -> None:
+        with conn.cursor() as cur:
+            execute_values(cur, INSERT_SQL, batch, page_size=len(batch))
+
+
+recom_writer = RecomResultWriter()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+그래프 실행 단위(run) 취소 제어
+
+- SSE 클라이언트가 끊기면 RunContext.cancel()로 실행 중인 그래프를 중단
+- 실행 중인 DB 쿼리는 connection.cancel()로, OpenAI 요청은 run 전용 클라이언트를 닫아서 중단
+- 노드/도구 코드는 check_cancelled()만 호출하면 됨 (ContextVar로 현재 run 전달)
+"""
+import threading
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class RunCancelled(BaseException):
+    """
+    클라이언트 이탈로 run이 취소됨.
+    asyncio.CancelledError처럼 BaseException을 상속해서
+    노드 내부의 `except Exception` 폴백에 삼켜지지 않도록 합니다.
+    """
+
+
+class RunContext:
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._connections = weakref.WeakSet()
+        self._resources = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise RunCancelled()
+
+    def register_connection(self, conn) -> None:
+        """취소 시 실행 중인 쿼리를 끊을 DB 커넥션 등록"""
+        with self._lock:
+            self._connections.add(conn)
+        if self.cancelled:
+            self._cancel_connection(conn)
+
+    def resource(self, name: str, factory, close):
+        """run 단위로 공유하는 자원(예: OpenAI 클라이언트). 취소/종료 시 close 호출"""
+        with self._lock:
+            if name not in self._resources:
+                self._resources[name] = (factory(), close)
+            return self._resources[name][0]
+
+    def cancel(self) -> None:
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            self._cancel_connection(conn)
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            resources, self._resources = list(self._resources.values()), {}
+        for obj, close in resources:
+            try:
+                close(obj)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _cancel_connection(conn) -> None:
+        try:
+            if not conn.closed:
+                conn.cancel()
+        except Exception:
+            pass
+
+    @contextmanager
+    def activate(self):
+        """현재 스레드(및 복사된 컨텍스트)에서 이 run을 활성화"""
+        token = _current_run.set(self)
+        try:
+            yield self
+        finally:
+            _current_run.reset(token)
+            self.close()
+
+
+_current_run: ContextVar[RunContext | None] = ContextVar("current_run", default=None)
+
+
+def current_run() -> RunContext | None:
+    return _current_run.get()
+
+
+def check_cancelled() -> None:
+    run = _current_run.get()
+    if run is not None:
+        run.check()
+
+
+def register_connection(conn):
+    run = _current_run.get()
+    if run is not None:
+        run.register_connection(conn)
+    return conn
+
+
+# ==========================================
+# 실행 통계
+# ==========================================
+_run_stats = {"started": 0, "completed": 0, "cancelled": 0, "failed": 0}
+_stats_lock = threading.Lock()
+
+
+def count_run(kind: str) -> None:
+    with _stats_lock:
+        _run_stats[kind] += 1
+
+
+def get_run_stats() -> dict:
+    with _stats_lock:
+        return dict(_run_stats)
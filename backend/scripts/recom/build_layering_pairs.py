@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+
+import numpy as np
+import psycopg2
+
+# backend/ 모듈(perfume_features) 사용
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(BACKEND_DIR)
+
+from perfume_features import blocked_top_k, load_feature_matrix, store_top_k  # noqa: E402
+
+# ==========================================
+# 1. DB 설정
+# ==========================================
+# DB 접속 설정 (로컬 실행 시 localhost:5433, 도커 내부 실행 시 db:5432)
+DB_CONFIG = {
+    "dbname": "perfume_db",
+    "user": "scentence",
+    "password": "scentence",
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5433")
+}
+
+TABLE_NAME = "tb_perfume_layering_m"
+TOP_K = 20            # 향수별 보관하는 레이어링 파트너 수
+BLOCK_SIZE = 256      # 타일 행 수 (메모리 상한: BLOCK_SIZE × N × 블록 수)
+
+# 레이어링 궁합 점수
+#   어코드 조화(accord_sim)  : 같은 계열이어야 섞였을 때 어울림
+#   노트 보완(1 - note_sim)  : 노트가 겹치지 않아야 서로에게 새로운 층을 더함
+#   계절 일치(season_sim)    : 같은 시기에 함께 뿌릴 수 있어야 함
+SEASON_BONUS = 0.2
+# 사실상 같은 향(리뉴얼/농도 차이)은 레이어링 의미가 없으므로 제외
+MAX_NOTE_OVERLAP = 0.8
+
+
+def _normalized(block: np.ndarray) -> np.ndarray:
+    block = block.astype(np.float32, copy=True)
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    np.divide(block, norms, out=block, where=norms > 0)
+    return block
+
+
+def make_layering_score(accords: np.ndarray, notes: np.ndarray, seasons: np.ndarray):
+    """blocked_top_k용 타일 점수 함수 (B × N)"""
+    def score(left_block, _, offset):
+        # 마지막 타일은 BLOCK_SIZE보다 짧을 수 있으므로 실제로 받은 행 수만큼 자름
+        rows = slice(offset, offset + left_block.shape[0])
+        accord_sim = accords[rows] @ accords.T
+        note_sim = notes[rows] @ notes.T
+        season_sim = seasons[rows] @ seasons.T
+
+        tile = accord_sim * (1.0 - note_sim) + SEASON_BONUS * season_sim
+        tile[note_sim > MAX_NOTE_OVERLAP] = -np.inf
+        return tile
+    return score
+
+
+def build_layering_pairs():
+    print("🚀 레이어링 궁합 목록 생성 시작")
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        started = time.time()
+        features = load_feature_matrix(conn)
+        accords = _normalized(features.block("accord"))
+        notes = _normalized(features.block("note"))
+        seasons = _normalized(features.block("season"))
+        n = len(features.perfume_ids)
+        print(f"📐 특징 행렬: {n}개 향수 ({time.time() - started:.1f}s)")
+
+        # 전체 N × N 쌍 공간을 BLOCK_SIZE 행 타일로 나눠 계산하고, 향수별 top-k만 유지
+        started = time.time()
+        top_idx, top_score = blocked_top_k(
+            accords, accords, TOP_K,
+            score_fn=make_layering_score(accords, notes, seasons),
+            block_size=BLOCK_SIZE,
+        )
+        print(f"🧮 {n}×{n} 쌍 점수 계산 완료 ({time.time() - started:.1f}s)")
+
+        count = store_top_k(conn, TABLE_NAME, "partner_perfume_id", features.perfume_ids, top_idx, top_score)
+        print(f"🎉 적재 완료: {count}건")
+    except Exception as e:
+        print(f"❌ 작업 중 오류 발생: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    build_layering_pairs()
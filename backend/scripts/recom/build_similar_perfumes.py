@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+import psycopg2
+
+# backend/ 모듈(perfume_features) 사용
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(BACKEND_DIR)
+
+from perfume_features import blocked_top_k, load_feature_matrix, store_top_k  # noqa: E402
+
+# ==========================================
+# 1. DB 설정
+# ==========================================
+# DB 접속 설정 (로컬 실행 시 localhost:5433, 도커 내부 실행 시 db:5432)
+DB_CONFIG = {
+    "dbname": "perfume_db",
+    "user": "scentence",
+    "password": "scentence",
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5433")
+}
+
+TABLE_NAME = "tb_perfume_similar_m"
+TOP_K = 20            # 향수별 보관하는 이웃 수
+BLOCK_SIZE = 512      # 한 번에 계산하는 행 수 (메모리 상한: BLOCK_SIZE × N)
+
+
+def build_similar_perfumes():
+    print("🚀 유사 향수 이웃 목록 생성 시작")
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        started = time.time()
+        features = load_feature_matrix(conn)
+        n, d = features.matrix.shape
+        print(f"📐 특징 행렬: {n}개 향수 × {d}차원 ({time.time() - started:.1f}s)")
+
+        # 블록 단위 행렬곱으로 전체 카탈로그의 top-k 이웃 계산
+        started = time.time()
+        top_idx, top_score = blocked_top_k(features.matrix, features.matrix, TOP_K, block_size=BLOCK_SIZE)
+        print(f"🧮 top-{TOP_K} 계산 완료 ({time.time() - started:.1f}s)")
+
+        count = store_top_k(conn, TABLE_NAME, "similar_perfume_id", features.perfume_ids, top_idx, top_score)
+        print(f"🎉 적재 완료: {count}건")
+    except Exception as e:
+        print(f"❌ 작업 중 오류 발생: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    build_similar_perfumes()
@@ -0,0 +1,102 @@
+"""
+카탈로그 스냅샷 생성 (perfume_db → backend/data/catalog/<version>/*.npy)
+
+특징 행렬, 패싯 비트맵, 노트/어코드 사전, 노트 임베딩을 버전별 바이너리 파일로 저장합니다.
+백엔드는 이를 memory-map 해서 시작 시 DB에서 다시 만들지 않습니다 (backend/catalog_snapshot.py).
+run_vector_etl.py 가 적재 스크립트 다음에 실행합니다. 내용이 바뀌지 않았으면 새 버전을 만들지 않습니다.
+
+사용법:
+    python build_catalog_snapshot.py [--out backend/data/catalog] [--verify]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import psycopg2
+
+# backend/ 모듈(catalog_snapshot, perfume_features) 사용
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(BACKEND_DIR)
+
+from catalog_snapshot import FACETS, SNAPSHOT_DIR, collect_catalog, load_snapshot, write_snapshot  # noqa: E402
+
+# ==========================================
+# 1. DB 설정
+# ==========================================
+# DB 접속 설정 (로컬 실행 시 localhost:5433, 도커 내부 실행 시 db:5432)
+DB_CONFIG = {
+    "dbname": "perfume_db",
+    "user": "scentence",
+    "password": "scentence",
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5433")
+}
+
+
+# ==========================================
+# 2. 검증
+# ==========================================
+class SnapshotMismatch(RuntimeError):
+    """스냅샷 내용이 DB와 다름 (python -O 에서도 검사하도록 assert 대신 사용)"""
+
+
+def expect(condition, message):
+    if not condition:
+        raise SnapshotMismatch(message)
+
+
+def verify(conn, root):
+    """스냅샷을 다시 열어 DB와 비교 (향수 수, 패싯 값별 향수 수, 특징 행렬 일치)"""
+    started = time.perf_counter()
+    snapshot = load_snapshot(root)
+    print(f"🔍 스냅샷 {snapshot.version} 열기 {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    cur = conn.cursor()
+    cur.execute("SELECT count(*) FROM tb_perfume_basic_m")
+    expect(cur.fetchone()[0] == len(snapshot.features.perfume_ids), "향수 수 불일치")
+
+    for facet, (source, col) in FACETS.items():
+        cur.execute(f"SELECT {col}, count(DISTINCT perfume_id) FROM {source} GROUP BY {col}")
+        expected = dict(cur.fetchall())
+        actual = {v: int(snapshot.facet_mask(facet, v).sum()) for v in snapshot.facet_values(facet)}
+        expect(actual == expected, f"{facet} 패싯 비트맵 불일치")
+        print(f"   ✅ {facet}: 값 {len(actual)}개 일치")
+
+    fresh = collect_catalog(conn)["arrays"]["features"]
+    expect(np.array_equal(fresh, snapshot.features.matrix), "특징 행렬 불일치")
+    print(f"   ✅ 특징 행렬 {snapshot.features.matrix.shape} 일치")
+    if snapshot.has_note_vectors:
+        print(f"   ✅ 노트 임베딩 {snapshot.arrays['note_vectors'].shape}")
+    cur.close()
+
+
+def build_catalog_snapshot(root=SNAPSHOT_DIR, check=False):
+    print("🚀 카탈로그 스냅샷 생성 시작")
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        started = time.time()
+        catalog = collect_catalog(conn)
+        collected = time.time() - started
+        version, created = write_snapshot(catalog, root)
+        size = sum(a.nbytes for a in catalog["arrays"].values())
+        if created:
+            print(f"🎉 스냅샷 {version} 생성 ({size / 1e6:.1f}MB, DB 조회 {collected:.1f}s, 전체 {time.time() - started:.1f}s)")
+        else:
+            print(f"✅ 변경 없음 (현재 스냅샷 {version} 유지)")
+        if check:
+            verify(conn, root)
+    except Exception as e:
+        print(f"❌ 스냅샷 생성 실패: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="카탈로그 스냅샷 생성")
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help="스냅샷 디렉터리 (CATALOG_SNAPSHOT_DIR)")
+    parser.add_argument("--verify", action="store_true", help="생성 후 DB와 비교")
+    args = parser.parse_args()
+    build_catalog_snapshot(args.out, args.verify)
@@ -0,0 +1,164 @@
+import os
+import psycopg2
+from psycopg2.extras import execute_values
+from openai import OpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ==========================================
+# 1. DB / 모델 설정
+# ==========================================
+# DB 접속 설정 (로컬 실행 시 localhost:5433, 도커 내부 실행 시 db:5432)
+DB_CONFIG = {
+    "dbname": "perfume_db",
+    "user": "scentence",
+    "password": "scentence",
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5433")
+}
+
+TABLE_NAME = "tb_perfume_embedding_m"
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+BATCH_SIZE = 256          # embeddings.create 1회에 보내는 문서 수
+TOP_ACCORDS = 6           # 문서에 넣는 어코드 수 (투표순)
+TOP_TAGS = 3              # 계절/상황/성별 태그 수 (투표순)
+
+# 향수 1개 = 문서 1개: 어코드(투표순) + 노트(TOP/MIDDLE/BASE) + 계절/상황/성별 태그
+# (원본 TSV의 tags 컬럼은 비어 있어서 투표 기반 태그를 대신 사용)
+DOCUMENT_SQL = f"""
+    SELECT
+        b.perfume_id,
+        b.perfume_brand,
+        b.perfume_name,
+        (SELECT STRING_AGG(accord, ', ' ORDER BY vote DESC NULLS LAST)
+           FROM (SELECT av.accord, ac.vote FROM tb_perfume_accord_m ac
+                  JOIN tb_perfume_accord_vocab_m av ON av.accord_id = ac.accord_id
+                  WHERE ac.perfume_id = b.perfume_id
+                  ORDER BY vote DESC NULLS LAST LIMIT {TOP_ACCORDS}) t) AS accords,
+        (SELECT STRING_AGG(nv.note, ', ') FROM tb_perfume_notes_m n
+           JOIN tb_perfume_note_vocab_m nv ON nv.note_id = n.note_id
+          WHERE n.perfume_id = b.perfume_id AND n.type = 'TOP') AS top_notes,
+        (SELECT STRING_AGG(nv.note, ', ') FROM tb_perfume_notes_m n
+           JOIN tb_perfume_note_vocab_m nv ON nv.note_id = n.note_id
+          WHERE n.perfume_id = b.perfume_id AND n.type = 'MIDDLE') AS middle_notes,
+        (SELECT STRING_AGG(nv.note, ', ') FROM tb_perfume_notes_m n
+           JOIN tb_perfume_note_vocab_m nv ON nv.note_id = n.note_id
+          WHERE n.perfume_id = b.perfume_id AND n.type = 'BASE') AS base_notes,
+        (SELECT STRING_AGG(season, ', ' ORDER BY vote DESC NULLS LAST)
+           FROM (SELECT season, vote FROM tb_perfume_season_m s
+                  WHERE s.perfume_id = b.perfume_id
+                  ORDER BY vote DESC NULLS LAST LIMIT {TOP_TAGS}) t) AS seasons,
+        (SELECT STRING_AGG(occasion, ', ' ORDER BY vote DESC NULLS LAST)
+           FROM (SELECT occasion, vote FROM tb_perfume_oca_m o
+                  WHERE o.perfume_id = b.perfume_id
+                  ORDER BY vote DESC NULLS LAST LIMIT {TOP_TAGS}) t) AS occasions,
+        (SELECT STRING_AGG(audience, ', ' ORDER BY vote DESC NULLS LAST)
+           FROM (SELECT audience, vote FROM tb_perfume_aud_m a
+                  WHERE a.perfume_id = b.perfume_id
+                  ORDER BY vote DESC NULLS LAST LIMIT {TOP_TAGS}) t) AS audiences
+    FROM tb_perfume_basic_m b
+    ORDER BY b.perfume_id
+"""
+
+
+def build_document(row):
+    """향수 1개의 임베딩용 문서 텍스트"""
+    perfume_id, brand, name, accords, top, middle, base, seasons, occasions, audiences = row
+    parts = [f"{name} by {brand}."]
+    if accords: parts.append(f"Accords: {accords}.")
+    if top: parts.append(f"Top notes: {top}.")
+    if middle: parts.append(f"Heart notes: {middle}.")
+    if base: parts.append(f"Base notes: {base}.")
+    if seasons: parts.append(f"Seasons: {seasons}.")
+    if occasions: parts.append(f"Occasions: {occasions}.")
+    if audiences: parts.append(f"Style: {audiences}.")
+    return " ".join(parts)
+
+
+def build_perfume_vectors():
+    print("🚀 향수 임베딩 생성 시작")
+
+    conn = None
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+        cur = conn.cursor()
+
+        # 1. 테이블 + ANN 인덱스 생성 (HNSW, 코사인 거리)
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+                perfume_id BIGINT PRIMARY KEY REFERENCES tb_perfume_basic_m (perfume_id),
+                document TEXT NOT NULL,
+                embedding vector({EMBEDDING_DIM}) NOT NULL,
+                model VARCHAR(100) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        cur.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_hnsw
+            ON {TABLE_NAME} USING hnsw (embedding vector_cosine_ops);
+        """)
+        conn.commit()
+        print("✅ 테이블/인덱스 생성/확인 완료")
+
+        # 2. 문서 생성 후 변경된 것만 추림 (문서와 모델이 같으면 재임베딩하지 않음)
+        cur.execute(DOCUMENT_SQL)
+        documents = {row[0]: build_document(row) for row in cur.fetchall()}
+        cur.execute(f"SELECT perfume_id, document, model FROM {TABLE_NAME}")
+        existing = {pid: (doc, model) for pid, doc, model in cur.fetchall()}
+        targets = [
+            (pid, doc) for pid, doc in documents.items()
+            if existing.get(pid) != (doc, EMBEDDING_MODEL)
+        ]
+        print(f"📂 문서 {len(documents)}개 중 임베딩 대상 {len(targets)}개")
+        if targets and not os.getenv("OPENAI_API_KEY"):
+            # run_vector_etl.py 기본 단계라 키가 없는 환경에서도 나머지 ETL은 진행 (기존 임베딩 유지)
+            print("⚠️ OPENAI_API_KEY 없음 → 임베딩 갱신 생략")
+            targets = []
+        client = OpenAI() if targets else None
+
+        # 3. 배치 임베딩 + 적재
+        upsert_sql = f"""
+            INSERT INTO {TABLE_NAME} (perfume_id, document, embedding, model)
+            VALUES %s
+            ON CONFLICT (perfume_id)
+            DO UPDATE SET
+                document = EXCLUDED.document,
+                embedding = EXCLUDED.embedding,
+                model = EXCLUDED.model,
+                created_at = CURRENT_TIMESTAMP;
+        """
+        for start in range(0, len(targets), BATCH_SIZE):
+            batch = targets[start:start + BATCH_SIZE]
+            resp = client.embeddings.create(input=[doc for _, doc in batch], model=EMBEDDING_MODEL)
+            vectors = sorted(resp.data, key=lambda d: d.index)
+            records = [
+                (pid, doc, str(v.embedding), EMBEDDING_MODEL)
+                for (pid, doc), v in zip(batch, vectors)
+            ]
+            execute_values(cur, upsert_sql, records, template="(%s, %s, %s::vector, %s)")
+            conn.commit()
+            print(f"   ✅ {start + len(batch)}/{len(targets)}")
+
+        # 4. 삭제된 향수 정리
+        cur.execute(
+            f"DELETE FROM {TABLE_NAME} WHERE perfume_id <> ALL(%s)", (list(documents.keys()),)
+        )
+        conn.commit()
+
+        cur.execute(f"SELECT count(*) FROM {TABLE_NAME};")
+        print(f"📊 현재 DB 저장된 개수: {cur.fetchone()[0]}개")
+
+    except Exception as e:
+        print(f"❌ 작업 중 오류 발생: {e}")
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    build_perfume_vectors()
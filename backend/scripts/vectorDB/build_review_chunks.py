@@ -0,0 +1,211 @@
+"""
+리뷰 청크 임베딩 (tb_perfume_review_m → tb_perfume_review_chunk_m)
+
+리뷰를 서버 측 커서로 스트리밍 → 문장 단위 청크 → BATCH_SIZE개씩 임베딩 → HNSW 인덱스 테이블에 저장.
+원문 해시와 모델이 같은 리뷰는 건너뛰므로 다시 실행하면 추가/변경된 리뷰만 처리합니다.
+챗봇 researcher 는 최종 후보 향수들의 리뷰 스니펫을 쿼리 1번으로 가져옵니다 (main_v3.get_review_snippets).
+
+run_vector_etl.py 기본 단계 (build_perfume_vectors.py 다음). OPENAI_API_KEY 가 없거나
+리뷰 테이블이 아직 없으면 기존 청크를 그대로 두고 건너뜁니다.
+
+사용법:
+    python build_review_chunks.py [--limit 1000]
+"""
+import argparse
+import hashlib
+import os
+import re
+import time
+
+import psycopg2
+from psycopg2.extras import execute_values
+from openai import OpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ==========================================
+# 1. DB / 모델 설정
+# ==========================================
+# DB 접속 설정 (로컬 실행 시 localhost:5433, 도커 내부 실행 시 db:5432)
+DB_CONFIG = {
+    "dbname": "perfume_db",
+    "user": "scentence",
+    "password": "scentence",
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5433")
+}
+
+TABLE_NAME = "tb_perfume_review_chunk_m"
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+BATCH_SIZE = 256          # embeddings.create 1회에 보내는 청크 수
+FETCH_SIZE = 2000         # 리뷰 스트리밍 시 한 번에 가져오는 행 수
+CHUNK_CHARS = 600         # 청크 최대 길이 (문장 단위로 채움)
+MIN_CHUNK_CHARS = 20      # 이보다 짧은 리뷰 조각은 버림 ("좋아요" 등)
+
+SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+# 리뷰 1개 = 청크 N개. review_hash 는 원문 MD5 (원문/모델이 같으면 재임베딩하지 않음)
+# tb_perfume_review_m 은 perfume_id 해시 파티션 테이블 (PK = review_id, perfume_id)
+CREATE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+        review_id BIGINT NOT NULL,
+        chunk_no SMALLINT NOT NULL,
+        perfume_id BIGINT NOT NULL,
+        content TEXT NOT NULL,
+        embedding vector({EMBEDDING_DIM}) NOT NULL,
+        review_hash CHAR(32) NOT NULL,
+        model VARCHAR(100) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (review_id, chunk_no),
+        FOREIGN KEY (review_id, perfume_id)
+            REFERENCES tb_perfume_review_m (review_id, perfume_id) ON DELETE CASCADE
+    );
+    -- 전체 리뷰 대상 ANN 검색용
+    CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_hnsw
+        ON {TABLE_NAME} USING hnsw (embedding vector_cosine_ops);
+    -- 챗봇: 후보 향수별 리뷰 스니펫 (main_v3.get_review_snippets)
+    CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_perfume
+        ON {TABLE_NAME} (perfume_id);
+"""
+
+
+# ==========================================
+# 2. 청크 분할
+# ==========================================
+def chunk_review(text, max_chars=CHUNK_CHARS):
+    """리뷰 원문 → 문장 경계 기준 max_chars 이하 청크 목록 (긴 문장은 강제로 자름)"""
+    chunks, current = [], ""
+    for sentence in SENTENCE_END.split(text or ""):
+        sentence = " ".join(sentence.split())
+        while len(sentence) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return [c for c in chunks if len(c) >= MIN_CHUNK_CHARS]
+
+
+def review_hash(text):
+    return hashlib.md5((text or "").encode("utf-8")).hexdigest()
+
+
+# ==========================================
+# 3. 스트리밍 + 배치 임베딩
+# ==========================================
+def iter_changed_reviews(read_conn, existing):
+    """리뷰를 FETCH_SIZE행씩 스트리밍하며 (원문, 모델)이 바뀐 리뷰만 반환"""
+    with read_conn.cursor(name="review_stream") as cur:
+        cur.itersize = FETCH_SIZE
+        cur.execute("SELECT review_id, perfume_id, content FROM tb_perfume_review_m ORDER BY review_id")
+        for review_id, perfume_id, content in cur:
+            h = review_hash(content)
+            if existing.get(review_id) != (h, EMBEDDING_MODEL):
+                yield review_id, perfume_id, content, h
+
+
+def flush(client, cur, pending):
+    """청크 묶음 임베딩 → 해당 리뷰의 기존 청크 교체"""
+    resp = client.embeddings.create(input=[c[3] for c in pending], model=EMBEDDING_MODEL)
+    vectors = sorted(resp.data, key=lambda d: d.index)
+    review_ids = list({c[0] for c in pending})
+    cur.execute(f"DELETE FROM {TABLE_NAME} WHERE review_id = ANY(%s)", (review_ids,))
+    execute_values(
+        cur,
+        f"""INSERT INTO {TABLE_NAME}
+            (review_id, chunk_no, perfume_id, content, embedding, review_hash, model) VALUES %s""",
+        [(*c, str(v.embedding), EMBEDDING_MODEL) for c, v in zip(pending, vectors)],
+        template="(%s, %s, %s, %s, %s::vector, %s, %s)",
+    )
+
+
+def build_review_chunks(limit=None):
+    print("🚀 리뷰 청크 임베딩 생성 시작")
+    if not os.getenv("OPENAI_API_KEY"):
+        # run_vector_etl.py 기본 단계라 키가 없는 환경에서도 나머지 ETL은 진행 (기존 청크 유지)
+        print("⚠️ OPENAI_API_KEY 없음 → 리뷰 청크 임베딩 생략")
+        return
+    client = OpenAI()
+    started = time.monotonic()
+
+    read_conn = write_conn = None
+    try:
+        read_conn = psycopg2.connect(**DB_CONFIG)
+        write_conn = psycopg2.connect(**DB_CONFIG)
+        cur = write_conn.cursor()
+
+        cur.execute("SELECT to_regclass('tb_perfume_review_m')")
+        if cur.fetchone()[0] is None:
+            print("⚠️ tb_perfume_review_m 없음 (리뷰 미적재) → 리뷰 청크 임베딩 생략")
+            return
+
+        # 1. 테이블 + 인덱스
+        cur.execute(CREATE_SQL)
+        write_conn.commit()
+        print("✅ 테이블/인덱스 생성/확인 완료")
+
+        # 2. 기존 상태 (리뷰별 원문 해시, 모델)
+        cur.execute(f"SELECT review_id, review_hash, model FROM {TABLE_NAME} WHERE chunk_no = 0")
+        existing = {rid: (h, model) for rid, h, model in cur.fetchall()}
+        print(f"📂 기존 임베딩 리뷰 {len(existing)}개")
+
+        # 3. 바뀐 리뷰만 청크 → BATCH_SIZE개씩 임베딩 (리뷰 단위로 끊어서 한 리뷰가 두 배치에 걸치지 않음)
+        reviews = chunks = 0
+        pending = []
+        for review_id, perfume_id, content, h in iter_changed_reviews(read_conn, existing):
+            parts = chunk_review(content)
+            if not parts:
+                # 내용이 너무 짧아진 리뷰는 기존 청크만 정리
+                if review_id in existing:
+                    cur.execute(f"DELETE FROM {TABLE_NAME} WHERE review_id = %s", (review_id,))
+                continue
+            if pending and len(pending) + len(parts) > BATCH_SIZE:
+                flush(client, cur, pending)
+                write_conn.commit()
+                chunks += len(pending)
+                pending = []
+                elapsed = time.monotonic() - started
+                print(f"   ✅ 리뷰 {reviews}개 / 청크 {chunks}개 ({chunks / elapsed:,.0f} chunks/s)")
+            # 한 리뷰의 청크가 BATCH_SIZE를 넘는 경우는 앞 BATCH_SIZE개만 사용
+            pending.extend((review_id, no, perfume_id, part, h) for no, part in enumerate(parts[:BATCH_SIZE]))
+            reviews += 1
+            if limit and reviews >= limit:
+                break
+        if pending:
+            flush(client, cur, pending)
+            chunks += len(pending)
+        write_conn.commit()
+
+        cur.execute(f"SELECT count(*), count(DISTINCT review_id) FROM {TABLE_NAME};")
+        total_chunks, total_reviews = cur.fetchone()
+        elapsed = time.monotonic() - started
+        print(f"🎉 리뷰 {reviews}개 / 청크 {chunks}개 임베딩 ({elapsed:.2f}s)")
+        print(f"📊 현재 DB 저장: 리뷰 {total_reviews}개, 청크 {total_chunks}개")
+
+    except Exception as e:
+        print(f"❌ 작업 중 오류 발생: {e}")
+        if write_conn:
+            write_conn.rollback()
+        raise
+    finally:
+        for conn in (read_conn, write_conn):
+            if conn:
+                conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="리뷰 청크 임베딩 생성 (변경분만)")
+    parser.add_argument("--limit", type=int, help="처리할 최대 리뷰 수 (시험용)")
+    args = parser.parse_args()
+    build_review_chunks(args.limit)
@@ -0,0 +1,92 @@
+"""
+로컬 테스트용 OpenAI 호환 임베딩 대역 서버 (POST /v1/embeddings)
+
+- 텍스트 해시로 만든 결정적 단위 벡터를 돌려줌 (같은 텍스트 → 같은 벡터, float / base64 형식)
+- --latency 로 응답 지연, --rate-limit-every N 으로 N번째 요청마다 429(retry-after) 재현
+- 표준 라이브러리 + numpy 만 사용 (openai 패키지 불필요)
+
+사용법:
+    python embedding_stub_server.py [--port 8089] [--dim 1536] [--latency 0.05] [--rate-limit-every 0]
+"""
+import argparse
+import base64
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+def fake_embedding(text, dim, encoding_format="float"):
+    seed = int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:8], "little")
+    vec = np.random.default_rng(seed).standard_normal(dim)
+    vec = (vec / np.linalg.norm(vec)).astype("<f4")
+    if encoding_format == "base64":
+        # SDK 기본값: little-endian float32 바이트를 base64로 (실제 API와 동일)
+        return base64.b64encode(vec.tobytes()).decode("ascii")
+    return vec.tolist()
+
+
+def make_handler(args):
+    counter = {"requests": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, headers=None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/embeddings":
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            with lock:
+                counter["requests"] += 1
+                n = counter["requests"]
+            if args.rate_limit_every and n % args.rate_limit_every == 0:
+                self._send(429, {"error": {"message": "rate limited", "type": "rate_limit_exceeded"}},
+                           {"retry-after-ms": str(int(args.retry_after * 1000))})
+                return
+
+            texts = payload["input"]
+            texts = [texts] if isinstance(texts, str) else texts
+            encoding_format = payload.get("encoding_format", "float")
+            time.sleep(args.latency)
+            self._send(200, {
+                "object": "list",
+                "model": payload.get("model"),
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": fake_embedding(t, args.dim, encoding_format)}
+                    for i, t in enumerate(texts)
+                ],
+                "usage": {
+                    "prompt_tokens": sum(len(t.split()) for t in texts),
+                    "total_tokens": sum(len(t.split()) for t in texts),
+                },
+            })
+
+        def log_message(self, *_):
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI 호환 임베딩 대역 서버")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--latency", type=float, default=0.05, help="요청당 지연(초)")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="N번째 요청마다 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="429 응답의 retry-after(초)")
+    args = parser.parse_args()
+    print(f"🧪 임베딩 대역 서버: http://localhost:{args.port}/v1")
+    ThreadingHTTPServer(("0.0.0.0", args.port), make_handler(args)).serve_forever()
@@ -0,0 +1,384 @@
+"""
+노트 임베딩 생성 (→ raw/notes_vector_db_ready.json, load_note_vectors.py 입력)
+
+1. 노트 목록(perfume_db 의 tb_perfume_note_vocab_m + 기존 설명, 또는 --notes-file)으로 임베딩할 텍스트 생성
+2. 체크포인트(raw/notes_embedding_checkpoint.jsonl)와 비교해 없는 것/오래된 것만 추림
+   (오래된 것 = 모델이 바뀌었거나 텍스트 해시가 다른 것)
+3. BATCH_SIZE개씩 embeddings 요청을 최대 CONCURRENCY개 동시에 보냄 (asyncio)
+   - 429: 응답의 retry-after 만큼 모든 요청을 함께 멈춘 뒤 재시도
+   - 연결 오류/5xx/타임아웃: 지터가 들어간 지수 백오프로 재시도
+   - --rpm 을 주면 분당 요청 수를 그 이하로 맞춤
+4. 배치가 끝날 때마다 결과를 체크포인트에 한 줄씩 추가 → 중단돼도 다시 실행하면 남은 것부터 이어서 처리
+5. 끝나면 체크포인트의 최신 결과로 notes_vector_db_ready.json 을 스트리밍으로 작성하고 처리량 출력
+
+로컬 테스트 (OpenAI 호환 대역 서버):
+    python embedding_stub_server.py --port 8089 &
+    python generate_note_embeddings.py --notes-file notes.txt --base-url http://localhost:8089/v1
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+
+from dotenv import load_dotenv
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+load_dotenv()
+
+# ==========================================
+# 1. 경로 / DB / 모델 설정
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_PATH = os.path.join(CURRENT_DIR, "raw", "notes_vector_db_ready.json")
+CHECKPOINT_PATH = os.path.join(CURRENT_DIR, "raw", "notes_embedding_checkpoint.jsonl")
+
+# DB 접속 설정 (로컬 실행 시 localhost:5433, 도커 내부 실행 시 db:5432)
+DB_CONFIG = {
+    "dbname": "perfume_db",
+    "user": "scentence",
+    "password": "scentence",
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5433")
+}
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+BATCH_SIZE = 128          # embeddings.create 1회에 보내는 텍스트 수
+CONCURRENCY = 4           # 동시에 진행하는 요청 수
+MAX_RETRIES = 6           # 요청 1개당 재시도 횟수
+BACKOFF_BASE = 0.5        # 백오프 기본값(초)
+BACKOFF_CAP = 20.0        # 백오프 상한(초)
+DEFAULT_RETRY_AFTER = 5.0 # 429 응답에 retry-after 가 없을 때 대기(초)
+
+# 향수에 쓰이는 노트(사전 표시명) + 기존 설명 (설명은 tb_note_embedding_m 에 있으면 그대로 유지)
+USED_NOTES_SQL = """
+    SELECT v.note FROM tb_perfume_note_vocab_m v
+    WHERE EXISTS (SELECT 1 FROM tb_perfume_notes_m n WHERE n.note_id = v.note_id)
+"""
+NOTES_SQL = f"""
+    SELECT n.note, MAX(e.description)
+    FROM ({USED_NOTES_SQL}) n
+    LEFT JOIN tb_note_embedding_m e ON e.note = n.note
+    GROUP BY n.note
+    ORDER BY n.note
+"""
+
+
+def build_text(note, description):
+    """노트 1개의 임베딩용 텍스트"""
+    return f"{note}: {description}" if description else note
+
+
+def text_hash(text):
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+# ==========================================
+# 2. 대상 선정 (체크포인트 기준)
+# ==========================================
+def load_sources(notes_file=None):
+    """[(note, description)] - --notes-file 이 있으면 파일(한 줄에 노트 1개, 탭 뒤는 설명)에서"""
+    if notes_file:
+        sources = []
+        with open(notes_file, encoding="utf-8") as f:
+            for line in f:
+                note, _, description = line.rstrip("\n").partition("\t")
+                if note.strip():
+                    sources.append((note.strip(), description.strip() or None))
+        return sources
+
+    import psycopg2
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('tb_note_embedding_m')")
+            if cur.fetchone()[0] is None:
+                cur.execute(f"SELECT note, NULL FROM ({USED_NOTES_SQL}) n ORDER BY note")
+            else:
+                cur.execute(NOTES_SQL)
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def iter_checkpoint(path):
+    """체크포인트 줄을 (오프셋, 레코드)로 반환. 중단으로 잘린 마지막 줄은 무시"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if record is not None:
+                yield offset, record
+            offset += len(line)
+
+
+def trim_partial_tail(path, chunk_size=65536):
+    """
+    중단으로 잘린 마지막 줄(줄바꿈 없음)을 잘라냄.
+    그대로 "a"로 이어 쓰면 새 첫 레코드가 잘린 줄 뒤에 붙어 두 줄 모두 읽을 수 없게 됨
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(chunk_size, pos)
+            f.seek(pos - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        if pos < end:
+            f.truncate(pos)
+            print(f"⚠️ 체크포인트 마지막 줄이 잘려 있어 {end - pos}B 제거")
+
+
+def select_targets(sources, model, checkpoint_path):
+    """체크포인트에 (같은 모델, 같은 텍스트)로 없는 노트만 반환: [(note, description, text)]"""
+    done = {}
+    for _, record in iter_checkpoint(checkpoint_path):
+        done[record["note"]] = (record["model"], record["text_hash"])
+
+    targets = []
+    for note, description in sources:
+        text = build_text(note, description)
+        if done.get(note) != (model, text_hash(text)):
+            targets.append((note, description, text))
+    return targets
+
+
+# ==========================================
+# 3. 요청 속도 제어
+# ==========================================
+class RateGate:
+    """
+    모든 요청이 보내기 전에 거치는 관문
+    - 429를 받으면 retry-after 동안 전체 요청을 멈춤 (한 워커만 재시도하는 것보다 429 연쇄가 적음)
+    - rpm 이 있으면 요청 간격을 60/rpm 초 이상으로 유지
+    """
+
+    def __init__(self, rpm=None):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self.resume_at = 0.0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            start = max(now, self.resume_at, self.next_slot)
+            self.next_slot = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+        # 기다리는 동안 다른 요청이 429를 받았으면 한 번 더 대기
+        while self.resume_at > time.monotonic():
+            await asyncio.sleep(self.resume_at - time.monotonic())
+
+    def pause(self, seconds):
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+def retry_after_seconds(error):
+    """429 응답 헤더의 retry-after-ms / retry-after (초)"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return DEFAULT_RETRY_AFTER
+
+
+def _backoff(retry):
+    # Full jitter: 0 ~ min(cap, base * 2^n)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** retry)))
+
+
+# ==========================================
+# 4. 임베딩 생성
+# ==========================================
+class EmbeddingPipeline:
+    def __init__(self, client, model, batch_size, concurrency, rpm, checkpoint_path):
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.gate = RateGate(rpm)
+        self.checkpoint_path = checkpoint_path
+        self.stats = {
+            "texts": 0, "requests": 0, "retries": 0, "rate_limited": 0,
+            "failed_batches": 0, "tokens": 0,
+        }
+
+    async def _embed(self, texts):
+        for retry in range(MAX_RETRIES + 1):
+            await self.gate.wait()
+            self.stats["requests"] += 1
+            try:
+                resp = await self.client.embeddings.create(input=texts, model=self.model)
+            except RateLimitError as e:
+                self.stats["rate_limited"] += 1
+                wait_for = retry_after_seconds(e)
+                self.gate.pause(wait_for)
+                print(f"   ⏳ 429 수신, {wait_for:.1f}s 동안 전체 요청 대기")
+            except (APIConnectionError, APITimeoutError, InternalServerError) as e:
+                wait_for = _backoff(retry)
+                print(f"   ⚠️ 요청 실패, {wait_for:.2f}s 후 재시도: {e}")
+                await asyncio.sleep(wait_for)
+            else:
+                usage = getattr(resp, "usage", None)
+                self.stats["tokens"] += getattr(usage, "total_tokens", 0) or 0
+                return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+            self.stats["retries"] += 1
+        raise RuntimeError(f"재시도 {MAX_RETRIES}회 초과")
+
+    async def _worker(self, queue, checkpoint, total, started):
+        while True:
+            batch = await queue.get()
+            try:
+                if batch is None:
+                    return
+                try:
+                    vectors = await self._embed([text for _, _, text in batch])
+                except Exception as e:
+                    # 이 배치는 체크포인트에 남지 않으므로 다음 실행에서 다시 대상이 됨
+                    self.stats["failed_batches"] += 1
+                    print(f"   ❌ 배치 실패 ({len(batch)}건): {e}")
+                    continue
+
+                lines = []
+                for (note, description, text), vector in zip(batch, vectors):
+                    if len(vector) != EMBEDDING_DIM:
+                        print(f"   ⚠️ {note}: 벡터 차원 {len(vector)} (기대 {EMBEDDING_DIM}), 건너뜁니다.")
+                        continue
+                    lines.append(json.dumps({
+                        "note": note, "description": description, "model": self.model,
+                        "text_hash": text_hash(text), "semantic_vector": vector,
+                    }, ensure_ascii=False))
+                if lines:
+                    checkpoint.write("\n".join(lines) + "\n")
+                    checkpoint.flush()
+                self.stats["texts"] += len(lines)
+
+                elapsed = time.monotonic() - started
+                print(f"   ✅ {self.stats['texts']}/{total} ({self.stats['texts'] / elapsed:,.1f} texts/s)")
+            finally:
+                queue.task_done()
+
+    async def run(self, targets):
+        started = time.monotonic()
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        trim_partial_tail(self.checkpoint_path)
+        with open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            workers = [
+                asyncio.create_task(self._worker(queue, checkpoint, len(targets), started))
+                for _ in range(self.concurrency)
+            ]
+            for start in range(0, len(targets), self.batch_size):
+                await queue.put(targets[start:start + self.batch_size])
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        return time.monotonic() - started
+
+
+# ==========================================
+# 5. 최종 파일 작성
+# ==========================================
+def write_output(sources, model, checkpoint_path, output_path):
+    """
+    현재 노트 목록 기준 최신 결과로 notes_vector_db_ready.json 작성 (벡터는 한 줄씩 스트리밍)
+    체크포인트도 최신 줄만 남기도록 압축합니다. 반환: 기록한 노트 수
+    """
+    wanted = {note: text_hash(build_text(note, description)) for note, description in sources}
+    latest = {}
+    for offset, record in iter_checkpoint(checkpoint_path):
+        if record["model"] == model and wanted.get(record["note"]) == record["text_hash"]:
+            latest[record["note"]] = offset
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_output, tmp_checkpoint = output_path + ".tmp", checkpoint_path + ".tmp"
+    with open(checkpoint_path, "rb") as src, \
+            open(tmp_output, "w", encoding="utf-8") as out, \
+            open(tmp_checkpoint, "wb") as compacted:
+        out.write("[\n")
+        # 노트 목록 순서대로 기록 (완료 순서와 무관하게 결과 파일이 결정적)
+        offsets = [latest[note] for note in dict.fromkeys(note for note, _ in sources) if note in latest]
+        for i, offset in enumerate(offsets):
+            src.seek(offset)
+            line = src.readline()
+            compacted.write(line)
+            record = json.loads(line)
+            out.write((",\n" if i else "") + json.dumps({
+                "note": record["note"],
+                "description": record["description"],
+                "semantic_vector": record["semantic_vector"],
+            }, ensure_ascii=False))
+        out.write("\n]\n")
+    os.replace(tmp_output, output_path)
+    os.replace(tmp_checkpoint, checkpoint_path)
+    return len(latest)
+
+
+def generate(notes_file=None, base_url=None, model=EMBEDDING_MODEL, batch_size=BATCH_SIZE,
+             concurrency=CONCURRENCY, rpm=None, checkpoint_path=CHECKPOINT_PATH,
+             output_path=OUTPUT_PATH):
+    print("🚀 노트 임베딩 생성 시작")
+    sources = load_sources(notes_file)
+    targets = select_targets(sources, model, checkpoint_path)
+    print(f"📂 노트 {len(sources)}개 중 임베딩 대상(없음/변경) {len(targets)}개")
+
+    pipeline = None
+    if targets:
+        # SDK 자체 재시도는 끄고 RateGate/백오프로 직접 제어
+        client = AsyncOpenAI(base_url=base_url, max_retries=0)
+        pipeline = EmbeddingPipeline(client, model, batch_size, concurrency, rpm, checkpoint_path)
+        elapsed = asyncio.run(pipeline.run(targets))
+        s = pipeline.stats
+        print(f"📊 {s['texts']}건 / {elapsed:.2f}s = {s['texts'] / max(elapsed, 1e-9):,.1f} texts/s, "
+              f"요청 {s['requests']}회 (재시도 {s['retries']}, 429 {s['rate_limited']}), "
+              f"토큰 {s['tokens']:,}, 실패 배치 {s['failed_batches']}")
+
+    if not os.path.exists(checkpoint_path):
+        print("⚠️ 생성된 임베딩이 없습니다.")
+        return
+
+    written = write_output(sources, model, checkpoint_path, output_path)
+    print(f"🎉 {output_path} 작성 완료: {written}/{len(sources)}개")
+    if pipeline and pipeline.stats["failed_batches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="노트 임베딩 생성 (재개 가능, 동시 요청)")
+    parser.add_argument("--notes-file", help="노트 목록 파일 (없으면 perfume_db 에서 조회)")
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL"),
+                        help="OpenAI 호환 API 주소 (로컬 대역 서버 등)")
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rpm", type=int, help="분당 최대 요청 수")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+    generate(args.notes_file, args.base_url, args.model, args.batch_size,
+             args.concurrency, args.rpm, args.checkpoint, args.output)
@@ -1,7 +1,26 @@
-import os
+"""
+노트 임베딩 적재 (notes_vector_db_ready.json → tb_note_embedding_m)
+
+파일 전체를 json.load 하지 않고 스트리밍으로 처리합니다.
+1. JSON 배열을 고정 크기 블록으로 읽으면서 레코드를 하나씩 raw_decode (메모리 = 레코드 1개 + 블록 1개)
+2. 벡터는 NumPy로 차원(1536)/유한값 검사 후 pgvector 바이너리 표현(big-endian float4)으로 인코딩
+3. COPY ... FROM STDIN (FORMAT binary) 1번으로 임시 스테이징 테이블에 스트리밍
+4. INSERT ... SELECT ... ON CONFLICT (note) 1번으로 반영 (같은 note는 파일의 마지막 레코드,
+   내용이 같은 행은 갱신하지 않음)
+
+사용법:
+    python load_note_vectors.py [--file 경로] [--dry-run]
+    --dry-run: DB 없이 파싱/검사/인코딩만 수행하고 건수와 처리량 출력
+"""
+import argparse
 import json
+import os
+import re
+import struct
+import time
+
+import numpy as np
 import psycopg2
-from psycopg2.extras import execute_batch
 
 # ==========================================
 # 1. 파일 경로 및 DB 설정
@@ -17,25 +36,134 @@ DB_CONFIG = {
     "user": "scentence",
     "password": "scentence",
     "host": os.getenv("DB_HOST", "localhost"),
-    "port": os.getenv("DB_PORT", "5433") 
+    "port": os.getenv("DB_PORT", "5433")
 }
 
 TABLE_NAME = "tb_note_embedding_m"
+STAGING_TABLE = "stg_note_embedding"
+EMBEDDING_DIM = 1536
+READ_BLOCK = 1 << 20  # JSON 읽기 블록 (1MB)
+SEPARATOR = re.compile(r"[\s,]*")  # 배열 원소 사이 공백/쉼표
+
+# COPY binary 형식 (https://www.postgresql.org/docs/current/sql-copy.html#id-1.9.3.55.9.4)
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_TRAILER = struct.pack("!h", -1)
+FIELD_COUNT = struct.pack("!h", 3)  # note, description, embedding
+VECTOR_HEADER = struct.pack("!hh", EMBEDDING_DIM, 0)  # pgvector vector_recv: dim, unused
+
+
+# ==========================================
+# 2. 스트리밍 파싱
+# ==========================================
+def iter_json_array(path, block_size=READ_BLOCK):
+    """최상위 JSON 배열의 원소를 하나씩 반환 (파일 전체를 메모리에 올리지 않음)"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(block_size).lstrip()
+        if not buf.startswith("["):
+            raise ValueError("JSON 최상위가 배열이 아닙니다")
+        pos, eof = 1, False
+
+        while True:
+            pos = SEPARATOR.match(buf, pos).end()
+            if buf.startswith("]", pos):
+                return
+            try:
+                item, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # 레코드가 블록 경계에서 잘린 경우 → 남은 부분에 다음 블록을 붙여서 다시 시도
+                if eof:
+                    raise
+                more = f.read(block_size)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield item
+
+
+def to_vector(values):
+    """벡터 → pgvector 바이너리 (dim, unused, float4 * dim). 차원/값이 잘못되면 None"""
+    if not isinstance(values, list) or len(values) != EMBEDDING_DIM:
+        return None
+    try:
+        vec = np.asarray(values, dtype=">f4")
+    except (TypeError, ValueError):
+        return None
+    if vec.shape != (EMBEDDING_DIM,) or not np.isfinite(vec).all():
+        return None
+    return VECTOR_HEADER + vec.tobytes()
+
+
+def _field(data):
+    if data is None:
+        return struct.pack("!i", -1)
+    return struct.pack("!i", len(data)) + data
+
+
+def _text(value):
+    return None if value is None else str(value).encode("utf-8")
+
+
+def iter_copy_rows(path, stats):
+    """JSON 레코드 → COPY binary 튜플 (note, description, embedding)"""
+    yield COPY_SIGNATURE
+    for item in iter_json_array(path):
+        stats["read"] += 1
+        note = item.get("note") if isinstance(item, dict) else None
+        vector = to_vector(item.get("semantic_vector")) if note else None
+        if vector is None:
+            stats["skipped"] += 1
+            print(f"⚠️ 경고: {note}의 벡터 차원이 {EMBEDDING_DIM}이 아니거나 값이 잘못되었습니다. 건너뜁니다.")
+            continue
+        stats["rows"] += 1
+        yield (FIELD_COUNT + _field(_text(note))
+               + _field(_text(item.get("description"))) + _field(vector))
+    yield COPY_TRAILER
 
-def load_vector_data():
+
+class CopyStream:
+    """bytes 조각 제너레이터 → copy_expert 가 read(size)로 당겨 가는 파일 객체"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.buffer = b""
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+# ==========================================
+# 3. 적재
+# ==========================================
+def load_vector_data(path=JSON_FILE_PATH, dry_run=False):
     print("🚀 노트 임베딩 데이터 적재 시작")
-    
-    # 1. JSON 파일 읽기
-    if not os.path.exists(JSON_FILE_PATH):
-        print(f"❌ 파일을 찾을 수 없습니다: {JSON_FILE_PATH}")
+
+    if not os.path.exists(path):
+        print(f"❌ 파일을 찾을 수 없습니다: {path}")
         return
 
-    try:
-        with open(JSON_FILE_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            print(f"📂 JSON 로드 완료: {len(data)}개 데이터")
-    except Exception as e:
-        print(f"❌ JSON 읽기 실패: {e}")
+    started = time.monotonic()
+    stats = {"read": 0, "rows": 0, "skipped": 0}
+    stream = CopyStream(iter_copy_rows(path, stats))
+
+    if dry_run:
+        size = 0
+        while True:
+            data = stream.read(READ_BLOCK)
+            if not data:
+                break
+            size += len(data)
+        elapsed = time.monotonic() - started
+        print(f"🧪 dry-run: {stats['rows']}건 인코딩 (건너뜀 {stats['skipped']}건), "
+              f"COPY {size / 1e6:.1f}MB, {elapsed:.2f}s ({stats['read'] / max(elapsed, 1e-9):,.0f} rec/s)")
         return
 
     conn = None
@@ -43,53 +171,55 @@ def load_vector_data():
         conn = psycopg2.connect(**DB_CONFIG)
         cur = conn.cursor()
 
-        # 2. 테이블 생성 (vector 컬럼 포함!)
+        # 테이블 생성 (vector 컬럼 포함!)
         # note 컬럼에 UNIQUE 제약조건을 걸어 중복 적재를 방지합니다.
-        create_table_sql = f"""
+        cur.execute(f"""
             CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
                 id SERIAL PRIMARY KEY,
                 note TEXT NOT NULL UNIQUE,
                 description TEXT,
-                embedding vector(1536),
+                embedding vector({EMBEDDING_DIM}),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
-        """
-        cur.execute(create_table_sql)
-        print("✅ 테이블 생성/확인 완료 (embedding vector(1536) 포함)")
 
-        # 3. 데이터 적재 (Batch Insert)
-        insert_sql = f"""
+            CREATE TEMP TABLE {STAGING_TABLE} (
+                note TEXT,
+                description TEXT,
+                embedding vector({EMBEDDING_DIM}),
+                row_no BIGSERIAL
+            ) ON COMMIT DROP;
+        """)
+
+        # 파싱 → 인코딩 → COPY 가 한 스트림으로 진행 (전체 벡터를 메모리에 모으지 않음)
+        cur.copy_expert(
+            f"COPY {STAGING_TABLE} (note, description, embedding) FROM STDIN WITH (FORMAT binary)",
+            stream,
+        )
+        print(f"📂 스트리밍 COPY 완료: {stats['rows']}건 (건너뜀 {stats['skipped']}건)")
+
+        if stats["rows"] == 0:
+            print("⚠️ 적재할 유효한 데이터가 없습니다.")
+            conn.rollback()
+            return
+
+        cur.execute(f"""
             INSERT INTO {TABLE_NAME} (note, description, embedding)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (note) 
+            SELECT DISTINCT ON (note) note, description, embedding
+            FROM {STAGING_TABLE}
+            ORDER BY note, row_no DESC
+            ON CONFLICT (note)
             DO UPDATE SET
                 description = EXCLUDED.description,
-                embedding = EXCLUDED.embedding;
-        """
-
-        # JSON 데이터를 튜플 리스트로 변환
-        records = []
-        for item in data:
-            # item['semantic_vector']가 리스트인지 확인
-            vector = item.get('semantic_vector')
-            if not vector or len(vector) != 1536:
-                print(f"⚠️ 경고: {item.get('note')}의 벡터 차원이 1536이 아닙니다. 건너뜁니다.")
-                continue
-                
-            records.append((
-                item.get('note'),
-                item.get('description'),
-                vector  # 리스트 그대로 넘기면 pgvector가 알아서 처리함
-            ))
-
-        if records:
-            execute_batch(cur, insert_sql, records)
-            conn.commit()
-            print(f"🎉 데이터 적재 완료: 총 {len(records)}건")
-        else:
-            print("⚠️ 적재할 유효한 데이터가 없습니다.")
+                embedding = EXCLUDED.embedding
+            WHERE ({TABLE_NAME}.description, {TABLE_NAME}.embedding)
+                  IS DISTINCT FROM (EXCLUDED.description, EXCLUDED.embedding);
+        """)
+        merged = cur.rowcount
+        conn.commit()
+        print(f"🎉 데이터 적재 완료: 총 {stats['rows']}건 (반영 {merged}건, "
+              f"{time.monotonic() - started:.2f}s)")
 
-        # 4. 확인 (Count)
+        # 확인 (Count)
         cur.execute(f"SELECT count(*) FROM {TABLE_NAME};")
         cnt = cur.fetchone()[0]
         print(f"📊 현재 DB 저장된 개수: {cnt}개")
@@ -102,5 +232,10 @@ def load_vector_data():
         if conn:
             conn.close()
 
+
 if __name__ == "__main__":
-    load_vector_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="노트 임베딩 스트리밍 적재 (binary COPY)")
+    parser.add_argument("--file", default=JSON_FILE_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="DB 없이 파싱/검사/인코딩만 수행")
+    args = parser.parse_args()
+    load_vector_data(args.file, args.dry_run)
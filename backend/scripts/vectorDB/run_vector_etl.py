@@ -18,6 +18,9 @@ def run_script(script_path):
         sys.exit(1)
 
 def main():
+    # --generate: 적재 전에 노트 임베딩 생성 단계(generate_note_embeddings.py, OpenAI 호출)부터 실행
+    generate = "--generate" in sys.argv[1:]
+
     if not os.path.exists(CURRENT_DIR):
         print(f"[Vector-ETL ERROR] 폴더를 찾을 수 없음: {CURRENT_DIR}", file=sys.stderr)
         sys.exit(1)
@@ -26,6 +29,22 @@ def main():
     scripts = [f for f in os.listdir(CURRENT_DIR) 
                if f.startswith("load_") and f.endswith(".py") and f != "run_vector_etl.py"]
     
+    if generate:
+        scripts.insert(0, "generate_note_embeddings.py")
+
+    # 향수 임베딩 (문서가 바뀐 향수만 재임베딩 → 변경이 없으면 API 호출 없음)
+    scripts.append("build_perfume_vectors.py")
+
+    # 리뷰 청크 임베딩 (원문이 바뀐 리뷰만 재임베딩, researcher 리뷰 스니펫용)
+    scripts.append("build_review_chunks.py")
+
+    # 미리 계산된 유사/레이어링 이웃 (증분 적재가 변경/삭제 향수의 이웃 행을 지우므로 매번 통째로 다시 계산)
+    scripts.append(os.path.join("..", "recom", "build_similar_perfumes.py"))
+    scripts.append(os.path.join("..", "recom", "build_layering_pairs.py"))
+
+    # 마지막: 백엔드가 memory-map 하는 카탈로그 스냅샷 (노트 임베딩 적재 후)
+    scripts.append("build_catalog_snapshot.py")
+
     # 발견된 스크립트 순차 실행
     for script in scripts:
         full_path = os.path.join(CURRENT_DIR, script)
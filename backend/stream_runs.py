@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+재연결 가능한 SSE 스트림
+
+- 그래프 실행(run)마다 run_id를 발급하고, 발생한 이벤트를 짧게 보관하는 버퍼에 id와 함께 저장
+- 재연결 시 Last-Event-ID 이후 이벤트만 재전송하고, 실행 중이면 그대로 이어서 수신
+- 구독자가 모두 떠난 뒤 유예 시간 안에 다시 붙지 않으면 run 취소
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import AsyncGenerator
+
+from run_control import RunContext, count_run
+
+EVENT_BUFFER_SIZE = 256      # run별 보관 이벤트 수 상한
+MAX_RUNS = 500               # 동시에 보관하는 run 버퍼 수 상한
+FINISHED_TTL_SEC = 300       # 완료된 run 버퍼 보관 시간
+RESUME_GRACE_SEC = 15        # 구독자가 모두 끊긴 뒤 취소까지 기다리는 시간
+KEEPALIVE_SEC = 15           # 이벤트가 없을 때 보내는 주석 프레임 주기
+DISCONNECT_POLL_SEC = 1.0    # 클라이언트 연결 끊김 확인 주기
+
+
+class EventGap(Exception):
+    """요청한 Last-Event-ID 이후 이벤트가 이미 버퍼에서 밀려남"""
+
+
+class RunBuffer:
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxlen: int = EVENT_BUFFER_SIZE):
+        self.run_id = uuid.uuid4().hex
+        self.run = RunContext()
+        self.done = False
+        self.finished_at: float | None = None
+        self.subscribers = 0
+        self._loop = loop
+        self._events = deque(maxlen=maxlen)  # (event_id, payload)
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._signal = asyncio.Event()
+        self._cancel_handle: asyncio.TimerHandle | None = None
+
+    # ---------- 생산자(워커 스레드) ----------
+    def publish(self, payload: dict) -> None:
+        with self._lock:
+            self._events.append((self._next_id, payload))
+            self._next_id += 1
+        self._loop.call_soon_threadsafe(self._notify)
+
+    def finish(self) -> None:
+        with self._lock:
+            self.done = True
+            self.finished_at = time.monotonic()
+        self._loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self) -> None:
+        # 구독자마다 놓치는 알림이 없도록 매번 새 Event로 교체
+        signal, self._signal = self._signal, asyncio.Event()
+        signal.set()
+
+    # ---------- 구독자(이벤트 루프) ----------
+    def events_after(self, last_id: int) -> tuple[list, bool]:
+        with self._lock:
+            if self._events and last_id < self._events[0][0] - 1:
+                raise EventGap(f"event {last_id + 1}~{self._events[0][0] - 1} 만료")
+            return [e for e in self._events if e[0] > last_id], self.done
+
+    @property
+    def signal(self) -> asyncio.Event:
+        """다음 publish/finish 때 set되는 Event (이벤트 조회 전에 받아둘 것)"""
+        return self._signal
+
+    def attach(self) -> None:
+        self.subscribers += 1
+        if self._cancel_handle is not None:
+            self._cancel_handle.cancel()
+            self._cancel_handle = None
+
+    def detach(self) -> None:
+        self.subscribers -= 1
+        if self.subscribers == 0 and not self.done:
+            self._cancel_handle = self._loop.call_later(RESUME_GRACE_SEC, self._cancel_if_abandoned)
+
+    def _cancel_if_abandoned(self) -> None:
+        self._cancel_handle = None
+        if self.subscribers == 0 and not self.done:
+            print(f"🛑 [Run] {self.run_id}: 재연결 없음 → 실행 취소")
+            self.run.cancel()
+            count_run("cancelled")
+
+
+class RunRegistry:
+    """run_id → RunBuffer. 완료 후 TTL이 지나거나 상한을 넘으면 오래된 것부터 제거"""
+
+    def __init__(self):
+        self._runs: OrderedDict[str, RunBuffer] = OrderedDict()
+
+    def create(self) -> RunBuffer:
+        self._evict()
+        buffer = RunBuffer(asyncio.get_running_loop())
+        self._runs[buffer.run_id] = buffer
+        return buffer
+
+    def get(self, run_id: str) -> RunBuffer | None:
+        self._evict()
+        return self._runs.get(run_id)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for run_id, buffer in list(self._runs.items()):
+            if buffer.done and now - buffer.finished_at > FINISHED_TTL_SEC:
+                del self._runs[run_id]
+        # 상한 초과 시 완료된 run부터 제거
+        for run_id, buffer in list(self._runs.items()):
+            if len(self._runs) < MAX_RUNS:
+                break
+            if buffer.done:
+                del self._runs[run_id]
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+
+def format_sse(event_id: int | None, payload: dict) -> str:
+    data = json.dumps(payload, ensure_ascii=False)
+    if event_id is None:
+        return f"data: {data}\n\n"  # id 없음 → 클라이언트의 Last-Event-ID 유지
+    return f"id: {event_id}\ndata: {data}\n\n"
+
+
+async def subscribe(buffer: RunBuffer, request=None, last_event_id: int = 0) -> AsyncGenerator[str, None]:
+    """
+    last_event_id 이후 이벤트를 재전송하고, run이 끝날 때까지 새 이벤트를 이어서 전송.
+    느린 구독자가 버퍼(EVENT_BUFFER_SIZE)보다 뒤처지면 gap 오류 이벤트를 보내고 종료
+    """
+    buffer.attach()
+    last_id = last_event_id
+    idle_since = time.monotonic()
+    try:
+        while True:
+            signal = buffer.signal
+            try:
+                events, done = buffer.events_after(last_id)
+            except EventGap as e:
+                print(f"⚠️ [Run] {buffer.run_id}: 구독자가 버퍼보다 뒤처짐 ({e})")
+                yield format_sse(None, {"type": "error", "code": "gap", "content": str(e)})
+                break
+            for event_id, payload in events:
+                yield format_sse(event_id, payload)
+                last_id = event_id
+            if events:
+                idle_since = time.monotonic()
+                continue
+            if done:
+                break
+
+            try:
+                await asyncio.wait_for(signal.wait(), timeout=DISCONNECT_POLL_SEC)
+            except asyncio.TimeoutError:
+                if request is not None and await request.is_disconnected():
+                    break
+                if time.monotonic() - idle_since >= KEEPALIVE_SEC:
+                    idle_since = time.monotonic()
+                    yield ": keepalive\n\n"
+    finally:
+        # 구독자가 모두 떠나면 유예 시간 뒤 run 취소 (그 사이 재연결하면 유지)
+        buffer.detach()
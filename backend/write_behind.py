@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+write-behind 큐 공용 구현 (추천 결과 기록 / 방문 이벤트 적재)
+
+요청 경로에서는 행을 큐에 넣기만 하고 바로 반환합니다.
+백그라운드 스레드가 flush_size건이 모이거나 flush_interval이 지나면
+서브클래스의 _write_batch()로 한 트랜잭션에 묶어 저장합니다.
+프로세스 종료 시 close()가 남은 행을 모두 저장합니다.
+
+- 연결 끊김 등 일시 오류: 저장하지 못한 행을 큐 앞에 되돌리고 다음 주기에 재시도
+- 행 자체가 잘못된 경우(무결성/형식 오류 등): 재시도해도 계속 실패하므로 배치를 반씩 나눠 저장하고,
+  끝까지 실패하는 행만 격리(quarantine)해서 나머지 행의 적재가 막히지 않게 함
+"""
+import threading
+import time
+from collections import deque
+
+import psycopg2
+
+# 재시도해도 같은 결과인 오류 (배치를 나눠서 문제 행만 격리)
+DATA_ERRORS = (psycopg2.IntegrityError, psycopg2.DataError)
+QUARANTINE_KEEP = 100        # 메모리에 보관하는 격리 행 수 (/metrics 확인용)
+CLOSE_RETRIES = 3            # 종료 시 마지막 저장 재시도 횟수
+CLOSE_RETRY_SEC = 1.0
+
+
+def _is_data_error(e: Exception) -> bool:
+    # psycopg2 오류 중 무결성/형식 오류, 또는 행 변환 중 난 파이썬 오류(TypeError 등)
+    return isinstance(e, DATA_ERRORS) or not isinstance(e, psycopg2.Error)
+
+
+class WriteBehindQueue:
+    name = "write-behind"
+
+    def __init__(self, dsn: str, flush_size: int, flush_interval: float, max_queue: int):
+        self.dsn = dsn
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._queue = deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._conn = None
+        self._quarantine = deque(maxlen=QUARANTINE_KEEP)
+        self.stats = {"enqueued": 0, "written": 0, "flushes": 0, "failed_flushes": 0,
+                      "dropped": 0, "quarantined": 0, "last_flush_ms": None}
+
+    def _write_batch(self, conn, batch: list[tuple]) -> None:
+        """batch를 저장 (트랜잭션 커밋/롤백은 호출 측에서 처리)"""
+        raise NotImplementedError
+
+    # ---------- 생산자(요청 경로) ----------
+    def _put(self, rows: list[tuple]) -> None:
+        """행을 큐에 추가 (DB 접근 없음). 큐 상한을 넘으면 오래된 행부터 버림"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} 큐가 이미 종료되었습니다.")
+            overflow = len(self._queue) + len(rows) - self._queue.maxlen
+            if overflow > 0:
+                self.stats["dropped"] += overflow
+            self._queue.extend(rows)
+            self.stats["enqueued"] += len(rows)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            if len(self._queue) >= self.flush_size:
+                self._cond.notify()
+
+    # ---------- 소비자(백그라운드 스레드) ----------
+    def _run(self) -> None:
+        failed = False
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                # 직전 저장이 실패했으면 큐가 차 있어도 한 주기 쉬고 재시도
+                while not self._closed and (failed or len(self._queue) < self.flush_size):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                closing = self._closed
+            if closing:
+                self._final_flush()
+                return
+            failed = not self._flush_queued()
+
+    def _final_flush(self) -> None:
+        """종료 시 남은 행 저장 (일시 오류면 CLOSE_RETRIES번까지 재시도)"""
+        for attempt in range(CLOSE_RETRIES + 1):
+            if attempt:
+                time.sleep(CLOSE_RETRY_SEC)
+            if self._flush_queued():
+                return
+
+    def _flush_queued(self) -> bool:
+        while True:
+            with self._cond:
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.flush_size))]
+            if not batch:
+                return True
+            retry = self._write(batch)
+            if retry:
+                # 저장하지 못한 행은 큐 앞에 되돌리고 다음 주기에 재시도
+                with self._cond:
+                    self._queue.extendleft(reversed(retry))
+                return False
+
+    def _commit(self, rows: list[tuple]) -> None:
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(self.dsn)
+        with self._conn:
+            self._write_batch(self._conn, rows)
+
+    def _write(self, batch: list[tuple]) -> list[tuple]:
+        """batch 저장. 일시 오류로 저장하지 못한 행(재시도 대상)을 반환"""
+        started = time.monotonic()
+        parts = [batch]  # 저장할 묶음 스택 (데이터 오류가 나면 반씩 나눔)
+        while parts:
+            part = parts.pop()
+            try:
+                self._commit(part)
+            except Exception as e:
+                if not _is_data_error(e):
+                    retry = part + [row for rest in reversed(parts) for row in rest]
+                    self.stats["failed_flushes"] += 1
+                    print(f"⚠️ [{self.name}] {len(retry)}건 저장 실패 (재시도 예정): {e}")
+                    if self._conn is not None and not self._conn.closed:
+                        self._conn.close()
+                    self._conn = None
+                    return retry
+                if len(part) == 1:
+                    self._quarantine_row(part[0], e)
+                else:
+                    mid = len(part) // 2
+                    parts += [part[mid:], part[:mid]]
+                continue
+            self.stats["written"] += len(part)
+        self.stats["flushes"] += 1
+        self.stats["last_flush_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return []
+
+    def _quarantine_row(self, row: tuple, error: Exception) -> None:
+        """재시도해도 저장할 수 없는 행: 버리고 최근 QUARANTINE_KEEP건만 보관"""
+        message = (str(error).strip().splitlines() or [type(error).__name__])[0]
+        self.stats["quarantined"] += 1
+        self._quarantine.append({"row": repr(row), "error": message})
+        print(f"🚫 [{self.name}] 저장 불가 행 격리: {row!r} ({message})")
+
+    # ---------- 종료 ----------
+    def close(self, timeout: float = 10.0) -> None:
+        """남은 행을 모두 저장하고 종료 (FastAPI shutdown / CLI 종료 시 호출)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        elif self._queue:
+            self._final_flush()
+        if self._queue:
+            print(f"⚠️ [{self.name}] 종료 시 저장하지 못한 행 {len(self._queue)}건")
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "queue_depth": len(self._queue), "recent_quarantined": list(self._quarantine)}
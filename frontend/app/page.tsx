@@ -4,10 +4,20 @@ import { FormEvent, useState, useEffect, useRef } from "react";
 import ReactMarkdown from "react-markdown";
 import remarkGfm from "remark-gfm";
 
+type PerfumeCard = {
+  id: number;
+  brand: string;
+  name: string;
+  img_link?: string | null;
+  accords: string[];
+  notes: string[];
+};
+
 type Message = {
   role: "user" | "assistant";
   text: string;
   isStreaming?: boolean; // 현재 타자 치는 중인지 여부
+  cards?: PerfumeCard[]; // Writer 답변 전에 먼저 도착하는 검색 결과
 };
 
 type ChatMeta = {
@@ -17,6 +27,7 @@ type ChatMeta = {
 };
 
 const API_URL = "http://localhost:8000/chat";
+const MAX_RESUME_ATTEMPTS = 3;
 
 // 타자 치는 효과를 위한 커스텀 훅
 function useTypewriter(text: string, speed = 10) {
@@ -65,6 +76,24 @@ const MessageItem = ({ message }: { message: Message }) => {
           {message.role === "user" ? "나" : "AI"}
         </p>
         
+        {message.cards && message.cards.length > 0 && (
+          <div className="mb-4 grid grid-cols-2 gap-3 sm:grid-cols-3">
+            {message.cards.map((card) => (
+              <div key={card.id} className="overflow-hidden rounded-xl border border-slate-700 bg-slate-900/60">
+                {card.img_link && (
+                  // eslint-disable-next-line @next/next/no-img-element
+                  <img src={card.img_link} alt={card.name} className="h-28 w-full object-cover" loading="lazy" />
+                )}
+                <div className="space-y-1 p-3">
+                  <p className="text-[0.65rem] uppercase tracking-widest text-slate-400">{card.brand}</p>
+                  <p className="font-semibold text-white">{card.name}</p>
+                  <p className="text-xs text-slate-400">{card.accords.slice(0, 3).join(" · ")}</p>
+                </div>
+              </div>
+            ))}
+          </div>
+        )}
+
         {message.role === "assistant" ? (
           <div className="prose prose-invert prose-sm max-w-none">
             <ReactMarkdown 
@@ -92,6 +121,8 @@ export default function Home() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const [meta, setMeta] = useState<ChatMeta | null>(null);
+  // 후속 질문이 이전 검색 결과/필터를 이어받도록 세션ID 유지
+  const sessionIdRef = useRef<string | null>(null);
 
   const handleSubmit = async (event: FormEvent<HTMLFormElement>) => {
     event.preventDefault();
@@ -109,21 +140,57 @@ export default function Home() {
     setLoading(true);
     setMeta(null);
 
-    try {
-      const response = await fetch(API_URL, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ user_query: trimmed }),
-      });
+    // SSE 프레임 처리: "id: N" 줄로 재연결 위치를 기억하고 "data: {...}" 줄을 파싱
+    let runId = "";
+    let lastEventId = 0;
 
-      if (!response.ok || !response.body) {
-        throw new Error("서버 연결 실패");
+    const handleFrame = (frame: string) => {
+      let dataLine = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("id: ")) lastEventId = Number(line.slice(4)) || lastEventId;
+        else if (line.startsWith("data: ")) dataLine = line.slice(6);
       }
+      if (!dataLine) return; // keepalive 등 주석 프레임
 
-      // 3. 봇 응답 Placeholder 추가 (빈 텍스트)
-      setMessages((prev) => [...prev, { role: "assistant", text: "", isStreaming: true }]);
+      try {
+        const data = JSON.parse(dataLine);
 
-      const reader = response.body.getReader();
+        if (data.type === "run") {
+          runId = data.run_id;
+          sessionIdRef.current = data.session_id;
+        } else if (data.type === "results") {
+          // 검색 결과 카드를 Writer 답변보다 먼저 표시
+          setMessages((prev) => {
+            const updated = [...prev];
+            const lastMsg = updated[updated.length - 1];
+            if (lastMsg.role === "assistant") {
+              lastMsg.cards = data.items;
+            }
+            return updated;
+          });
+        } else if (data.type === "answer") {
+          // 답변 도착! -> 메시지 업데이트
+          setMessages((prev) => {
+            const updated = [...prev];
+            const lastMsg = updated[updated.length - 1];
+            if (lastMsg.role === "assistant") {
+              lastMsg.text = data.content; 
+              // isStreaming은 유지하여 Typewriter 효과 발생
+            }
+            return updated;
+          });
+        } else if (data.type === "log") {
+          // 로그(조사 결과 등) 처리 로직 (필요시 구현)
+          console.log("Log:", data.content);
+        }
+        
+      } catch (e) {
+        console.error("Parsing Error:", e);
+      }
+    };
+
+    const readStream = async (response: Response) => {
+      const reader = response.body!.getReader();
       const decoder = new TextDecoder();
       let done = false;
       let buffer = "";
@@ -133,39 +200,43 @@ export default function Home() {
         done = readerDone;
 
         if (value) {
-          const chunk = decoder.decode(value, { stream: true });
-          buffer += chunk;
-          const lines = buffer.split("\n\n");
-          buffer = lines.pop() || "";
-
-          for (const line of lines) {
-            const trimmedLine = line.trim();
-            if (!trimmedLine.startsWith("data: ")) continue;
-
-            try {
-              const jsonStr = trimmedLine.replace("data: ", "");
-              const data = JSON.parse(jsonStr);
-
-              if (data.type === "answer") {
-                // 답변 도착! -> 메시지 업데이트
-                setMessages((prev) => {
-                  const updated = [...prev];
-                  const lastMsg = updated[updated.length - 1];
-                  if (lastMsg.role === "assistant") {
-                    lastMsg.text = data.content; 
-                    // isStreaming은 유지하여 Typewriter 효과 발생
-                  }
-                  return updated;
-                });
-              } else if (data.type === "log") {
-                // 로그(조사 결과 등) 처리 로직 (필요시 구현)
-                console.log("Log:", data.content);
-              }
-              
-            } catch (e) {
-              console.error("Parsing Error:", e);
-            }
-          }
+          buffer += decoder.decode(value, { stream: true });
+          const frames = buffer.split("\n\n");
+          buffer = frames.pop() || "";
+          frames.forEach((frame) => handleFrame(frame.trim()));
+        }
+      }
+    };
+
+    try {
+      const response = await fetch(API_URL, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ user_query: trimmed, session_id: sessionIdRef.current }),
+      });
+
+      if (!response.ok || !response.body) {
+        throw new Error("서버 연결 실패");
+      }
+
+      // 3. 봇 응답 Placeholder 추가 (빈 텍스트)
+      setMessages((prev) => [...prev, { role: "assistant", text: "", isStreaming: true }]);
+
+      // 4. 연결이 끊기면 같은 run에 재연결해서 놓친 이벤트만 다시 받음 (파이프라인 재실행 없음)
+      let attempts = 0;
+      let current: Response = response;
+      while (true) {
+        try {
+          await readStream(current);
+          break;
+        } catch (e) {
+          if (!runId || attempts >= MAX_RESUME_ATTEMPTS) throw e;
+          attempts += 1;
+          await new Promise((r) => setTimeout(r, 1000 * attempts));
+          current = await fetch(`${API_URL}/${runId}/stream`, {
+            headers: { "Last-Event-ID": String(lastEventId) },
+          });
+          if (!current.ok || !current.body) throw new Error("재연결 실패");
         }
       }
     } catch (e) {
@@ -19,36 +19,9 @@ echo "[ok] DB 연결 성공"
 # 작업 디렉토리 이동
 cd /app/scripts/perfume_db
 
-# 1) CSV 생성: tables/*.py 실행
-for f in tables/*.py; do
-  echo "[csv] $(basename "$f")"
-  python3 "$f"
-done
-
-# 2) DB 적재: load/*.py 실행
-
-# [중요 변경] 부모 테이블(BASIC)을 먼저 명시적으로 실행
-echo "[load] to_db_TB_PERFUME_BASIC_M.py (Priority)"
-f="load/to_db_TB_PERFUME_BASIC_M.py"
-sed \
-    -e "s/\"host\": \"localhost\"/\"host\": \"${DB_HOST}\"/" \
-    -e "s/\"port\": \"5433\"/\"port\": \"${DB_PORT}\"/" \
-    "$f" | python3
-
-# 나머지 테이블 실행 (BASIC은 제외하고 실행)
-for f in load/*.py; do
-  filename=$(basename "$f")
-  
-  # 위에서 이미 실행한 BASIC 파일은 건너뜀
-  if [ "$filename" == "to_db_TB_PERFUME_BASIC_M.py" ]; then
-    continue
-  fi
-
-  echo "[load] $filename"
-  sed \
-    -e "s/\"host\": \"localhost\"/\"host\": \"${DB_HOST}\"/" \
-    -e "s/\"port\": \"5433\"/\"port\": \"${DB_PORT}\"/" \
-    "$f" | python3
-done
+# Arrow 중간 파일 생성 → DB 적재를 의존 관계(DAG) 순서대로 병렬 실행 (run_etl.py)
+# 접속 정보는 환경변수로 전달, 동시 실행 수는 ETL_WORKERS (기본 CPU 수)
+export DB_HOST DB_PORT
+python3 run_etl.py --mode "${ETL_MODE:-delta}"
 
 echo "[done] perfume_db 데이터 적재 완료"
\ No newline at end of file
@@ -24,18 +24,26 @@ psql -U scentence -d member_db -f /app/create/member_db/tb_member_basic_m.sql
 psql -U scentence -d member_db -f /app/create/member_db/tb_member_profile_t.sql
 psql -U scentence -d member_db -f /app/create/member_db/tb_member_status_t.sql
 psql -U scentence -d member_db -f /app/create/member_db/tb_member_visit_t.sql
+psql -U scentence -d member_db -f /app/create/member_db/tb_member_pwd_err_t.sql
 
 # 4. PERFUME_DB 테이블 생성
 echo "PERFUME_DB 테이블 생성"
 psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_basic_m.sql
+psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_vocab_m.sql
 psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_accord_m.sql
 psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_aud_m.sql
 psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_notes_m.sql
 psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_oca_m.sql
 psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_review_m.sql
+psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_review_m_fts.sql
 psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_season_m.sql
+psql -U scentence -d perfume_db -f /app/create/perfume_db/tb_perfume_etl_hash_m.sql
 
-# 5. RECOM_DB 테이블 생성
+# 5. SCENTENCE_DB 테이블 생성
+echo "SCENTENCE_DB 테이블 생성"
+psql -U scentence -d scentence_db -f /app/create/scentence_db/tb_chat_session_t.sql
+
+# 6. RECOM_DB 테이블 생성
 echo "RECOM_DB 테이블 생성"
 psql -U scentence -d recom_db -f /app/create/recom_db/tb_member_my_perfume_t.sql
 psql -U scentence -d recom_db -f /app/create/recom_db/tb_member_recom_result_t.sql
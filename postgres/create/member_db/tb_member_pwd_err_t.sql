@@ -0,0 +1,19 @@
+-- MEMBER_DB / TB_MEMBER_PWD_ERR_T
+-- 회원별 연속 비밀번호 오류 횟수 (로그인 잠금 판단용, 모든 API 워커가 공유)
+-- 방문 이벤트(TB_MEMBER_VISIT_T)는 모아서 적재하므로, 잠금 판단은 이 행을 원자적으로 갱신해서 사용
+
+CREATE TABLE TB_MEMBER_PWD_ERR_T (
+    MEMBER_ID     BIGINT        NOT NULL,  -- 내부 식별자 (회원ID)
+    PWD_ERR_CNT   INTEGER       NOT NULL DEFAULT 0, -- 연속 비밀번호 오류 횟수 (LOGIN 성공 시 0)
+    ALTER_DT      TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 변경일시
+
+    CONSTRAINT PK_TB_MEMBER_PWD_ERR_T
+        PRIMARY KEY (MEMBER_ID),
+
+    CONSTRAINT FK_TB_MEMBER_PWD_ERR_T_MEMBER
+        FOREIGN KEY (MEMBER_ID)
+        REFERENCES TB_MEMBER_BASIC_M (MEMBER_ID),
+
+    CONSTRAINT CK_TB_MEMBER_PWD_ERR_T_PWD_ERR_CNT
+        CHECK (PWD_ERR_CNT >= 0)
+);
@@ -1,13 +1,22 @@
 CREATE TABLE TB_PERFUME_ACCORD_M (
     PERFUME_ID  BIGINT        NOT NULL,                 -- 향수ID
-    ACCORD      VARCHAR(100)  NOT NULL,                 -- 어코드명
+    ACCORD_ID   INTEGER       NOT NULL,                 -- 어코드ID (TB_PERFUME_ACCORD_VOCAB_M)
     VOTE        INTEGER,                                -- 투표수
     LOAD_DT     TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
     CONSTRAINT PK_TB_PERFUME_ACCORD_M
-        PRIMARY KEY (PERFUME_ID, ACCORD),
+        PRIMARY KEY (PERFUME_ID, ACCORD_ID),
 
     CONSTRAINT FK_TB_PERFUME_ACCORD_M_PERFUME
         FOREIGN KEY (PERFUME_ID)
-        REFERENCES TB_PERFUME_BASIC_M (PERFUME_ID)
+        REFERENCES TB_PERFUME_BASIC_M (PERFUME_ID),
+
+    CONSTRAINT FK_TB_PERFUME_ACCORD_M_ACCORD
+        FOREIGN KEY (ACCORD_ID)
+        REFERENCES TB_PERFUME_ACCORD_VOCAB_M (ACCORD_ID)
 );
+
+-- 어코드 필터 (ACCORD_ID = ANY(...)) 용
+CREATE INDEX IX_TB_PERFUME_ACCORD_M_ACCORD_ID
+    ON TB_PERFUME_ACCORD_M (ACCORD_ID);
+
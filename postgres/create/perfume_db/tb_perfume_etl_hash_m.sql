@@ -0,0 +1,12 @@
+-- PERFUME_DB / TB_PERFUME_ETL_HASH_M
+-- 증분 ETL용 향수별 원본 내용 해시 (load/load_perfume_delta.py)
+-- 해시가 바뀐 향수만 BASIC/NOTES/ACCORD/AUDIENCE/SEASON/OCCASION 을 다시 반영
+
+CREATE TABLE TB_PERFUME_ETL_HASH_M (
+    PERFUME_ID  BIGINT        NOT NULL,                 -- 향수ID
+    ROW_HASH    CHAR(32)      NOT NULL,                 -- 원본 행 MD5
+    LOAD_DT     TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 마지막 변경 반영 일시
+
+    CONSTRAINT PK_TB_PERFUME_ETL_HASH_M
+        PRIMARY KEY (PERFUME_ID)
+);
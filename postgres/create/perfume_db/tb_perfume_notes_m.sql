@@ -1,17 +1,25 @@
 -- DROP TABLE IF EXISTS TB_PERFUME_NOTES_M;
 CREATE TABLE TB_PERFUME_NOTES_M (
     PERFUME_ID  BIGINT        NOT NULL,
-    NOTE        VARCHAR(100)  NOT NULL,
+    NOTE_ID     INTEGER       NOT NULL,                 -- 노트ID (TB_PERFUME_NOTE_VOCAB_M)
     TYPE        VARCHAR(20)   NOT NULL,
     LOAD_DT     TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
     CONSTRAINT PK_TB_PERFUME_NOTES_M
-        PRIMARY KEY (PERFUME_ID, NOTE, TYPE),
+        PRIMARY KEY (PERFUME_ID, NOTE_ID, TYPE),
 
     CONSTRAINT CK_TB_PERFUME_NOTES_M_TYPE
         CHECK (TYPE IN ('TOP', 'MIDDLE', 'BASE')),
 
     CONSTRAINT FK_TB_PERFUME_NOTES_M_PERFUME
         FOREIGN KEY (PERFUME_ID)
-        REFERENCES TB_PERFUME_BASIC_M (PERFUME_ID)
-);
\ No newline at end of file
+        REFERENCES TB_PERFUME_BASIC_M (PERFUME_ID),
+
+    CONSTRAINT FK_TB_PERFUME_NOTES_M_NOTE
+        FOREIGN KEY (NOTE_ID)
+        REFERENCES TB_PERFUME_NOTE_VOCAB_M (NOTE_ID)
+);
+
+-- 노트 필터 (NOTE_ID = ANY(...)) 용
+CREATE INDEX IX_TB_PERFUME_NOTES_M_NOTE_ID
+    ON TB_PERFUME_NOTES_M (NOTE_ID);
@@ -1,4 +1,8 @@
 -- DROP TABLE IF EXISTS TB_PERFUME_REVIEW_M;
+-- PERFUME_ID 해시 파티션 (8개): 향수별 리뷰 조회는 파티션 1개만 읽음
+-- 파티션 키가 PK에 포함되어야 하므로 PK는 (REVIEW_ID, PERFUME_ID)
+-- 적재: scripts/perfume_db/load/load_reviews_partitioned.py (파티션별 병렬)
+-- 기존(파티션 전) 볼륨 변환: tb_perfume_review_m_partition_migrate.sql
 CREATE TABLE TB_PERFUME_REVIEW_M (
     REVIEW_ID   BIGINT        NOT NULL,          -- 리뷰 고유 ID
     PERFUME_ID  BIGINT        NOT NULL,          -- 향수 ID
@@ -6,9 +10,18 @@ CREATE TABLE TB_PERFUME_REVIEW_M (
     LOAD_DT     TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
     CONSTRAINT PK_TB_PERFUME_REVIEW_M
-        PRIMARY KEY (REVIEW_ID),
+        PRIMARY KEY (REVIEW_ID, PERFUME_ID),
 
     CONSTRAINT FK_TB_PERFUME_REVIEW_M_PERFUME
         FOREIGN KEY (PERFUME_ID)
         REFERENCES TB_PERFUME_BASIC_M (PERFUME_ID)
-);
\ No newline at end of file
+) PARTITION BY HASH (PERFUME_ID);
+
+CREATE TABLE TB_PERFUME_REVIEW_M_P0 PARTITION OF TB_PERFUME_REVIEW_M FOR VALUES WITH (MODULUS 8, REMAINDER 0);
+CREATE TABLE TB_PERFUME_REVIEW_M_P1 PARTITION OF TB_PERFUME_REVIEW_M FOR VALUES WITH (MODULUS 8, REMAINDER 1);
+CREATE TABLE TB_PERFUME_REVIEW_M_P2 PARTITION OF TB_PERFUME_REVIEW_M FOR VALUES WITH (MODULUS 8, REMAINDER 2);
+CREATE TABLE TB_PERFUME_REVIEW_M_P3 PARTITION OF TB_PERFUME_REVIEW_M FOR VALUES WITH (MODULUS 8, REMAINDER 3);
+CREATE TABLE TB_PERFUME_REVIEW_M_P4 PARTITION OF TB_PERFUME_REVIEW_M FOR VALUES WITH (MODULUS 8, REMAINDER 4);
+CREATE TABLE TB_PERFUME_REVIEW_M_P5 PARTITION OF TB_PERFUME_REVIEW_M FOR VALUES WITH (MODULUS 8, REMAINDER 5);
+CREATE TABLE TB_PERFUME_REVIEW_M_P6 PARTITION OF TB_PERFUME_REVIEW_M FOR VALUES WITH (MODULUS 8, REMAINDER 6);
+CREATE TABLE TB_PERFUME_REVIEW_M_P7 PARTITION OF TB_PERFUME_REVIEW_M FOR VALUES WITH (MODULUS 8, REMAINDER 7);
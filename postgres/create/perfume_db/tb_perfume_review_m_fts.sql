@@ -0,0 +1,72 @@
+-- PERFUME_DB / TB_PERFUME_REVIEW_M 전문 검색 (tsvector + GIN)
+-- 리뷰 키워드 검색 ("longevity", "지속력", "projection") 용. 기존 볼륨에도 그대로 다시 실행 가능 (멱등)
+--   docker exec -i pgvector-db psql -U scentence -d perfume_db < postgres/create/perfume_db/tb_perfume_review_m_fts.sql
+
+-- 1. 다국어 설정 PERFUME_MULTI
+--    영어(ASCII 단어) → english_stem (lasting/lasts → last, 불용어 제거)
+--    한글 등 그 외 단어 → simple (소문자화만). 한국어는 형태소 분석기가 없으므로
+--    검색어를 접두 일치(지속력:* → 지속력이/지속력은)로 만들어 조사 붙은 형태까지 찾음 (FN_REVIEW_TSQUERY)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'perfume_multi') THEN
+        CREATE TEXT SEARCH CONFIGURATION PERFUME_MULTI (COPY = english);
+        ALTER TEXT SEARCH CONFIGURATION PERFUME_MULTI
+            ALTER MAPPING FOR word, hword, hword_part WITH simple;
+    END IF;
+END $$;
+
+-- 2. 생성 컬럼 + 인덱스
+ALTER TABLE TB_PERFUME_REVIEW_M
+    ADD COLUMN IF NOT EXISTS CONTENT_TSV TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('perfume_multi'::regconfig, coalesce(CONTENT, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS IX_TB_PERFUME_REVIEW_M_TSV
+    ON TB_PERFUME_REVIEW_M USING GIN (CONTENT_TSV);
+
+-- 후보 향수로 좁히는 조건 (GIN 결과와 BitmapAnd)
+CREATE INDEX IF NOT EXISTS IX_TB_PERFUME_REVIEW_M_PERFUME_ID
+    ON TB_PERFUME_REVIEW_M (PERFUME_ID);
+
+-- 3. 검색어 → tsquery
+--    PERFUME_MULTI 로 정규화한 단어들을 OR 로 묶고, 한글이 들어간 단어는 접두 일치
+--    예) '지속력 longevity' → '지속력':* | 'longev'
+CREATE OR REPLACE FUNCTION FN_REVIEW_TSQUERY(P_QUERY TEXT)
+RETURNS TSQUERY
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT to_tsquery('simple', coalesce(string_agg(
+               quote_literal(lexeme) || CASE WHEN lexeme ~ '[가-힣]' THEN ':*' ELSE '' END,
+               ' | '), ''))
+    FROM unnest(tsvector_to_array(to_tsvector('perfume_multi'::regconfig, coalesce(P_QUERY, '')))) AS lexeme
+$$;
+
+-- 4. 후보 향수들의 리뷰 키워드 검색 (쿼리 1번)
+--    향수별 상위 P_PER_PERFUME개 리뷰를 ts_rank_cd 순으로, 일치 부분 위주 스니펫과 함께 반환
+--    결과 순서: P_PERFUME_IDS 순서 → 순위
+CREATE OR REPLACE FUNCTION FN_SEARCH_REVIEW_SNIPPETS(
+    P_QUERY        TEXT,
+    P_PERFUME_IDS  BIGINT[],
+    P_PER_PERFUME  INT DEFAULT 2
+)
+RETURNS TABLE (PERFUME_ID BIGINT, REVIEW_ID BIGINT, RANK REAL, SNIPPET TEXT)
+LANGUAGE sql STABLE PARALLEL SAFE AS $$
+    WITH q AS (
+        SELECT FN_REVIEW_TSQUERY(P_QUERY) AS query
+    ),
+    hits AS (
+        SELECT r.PERFUME_ID, r.REVIEW_ID, r.CONTENT,
+               ts_rank_cd(r.CONTENT_TSV, q.query) AS rank,
+               row_number() OVER (
+                   PARTITION BY r.PERFUME_ID
+                   ORDER BY ts_rank_cd(r.CONTENT_TSV, q.query) DESC, r.REVIEW_ID
+               ) AS rn
+        FROM TB_PERFUME_REVIEW_M r, q
+        WHERE r.PERFUME_ID = ANY(P_PERFUME_IDS)
+          AND r.CONTENT_TSV @@ q.query
+    )
+    SELECT h.PERFUME_ID, h.REVIEW_ID, h.rank,
+           ts_headline('perfume_multi'::regconfig, h.CONTENT, q.query,
+                       'MaxFragments=1, MinWords=8, MaxWords=30, StartSel=«, StopSel=»')
+    FROM hits h, q
+    WHERE h.rn <= P_PER_PERFUME
+    ORDER BY array_position(P_PERFUME_IDS, h.PERFUME_ID), h.rank DESC
+$$;
@@ -0,0 +1,29 @@
+-- PERFUME_DB / TB_PERFUME_REVIEW_M 해시 파티션 전환 (파티션 전 볼륨에서 1회 실행)
+--   docker exec -i pgvector-db psql -U scentence -d perfume_db -v ON_ERROR_STOP=1 < postgres/create/perfume_db/tb_perfume_review_m_partition_migrate.sql
+-- 기존 테이블 → 파티션 테이블로 복사 후 교체 (한 트랜잭션), 끝에 전문 검색 컬럼/인덱스 다시 생성
+-- 리뷰 청크 테이블(tb_perfume_review_chunk_m)이 있으면 FK를 (review_id, perfume_id) 로 바꿈
+
+BEGIN;
+
+ALTER TABLE IF EXISTS TB_PERFUME_REVIEW_CHUNK_M
+    DROP CONSTRAINT IF EXISTS TB_PERFUME_REVIEW_CHUNK_M_REVIEW_ID_FKEY;
+
+ALTER TABLE TB_PERFUME_REVIEW_M RENAME TO TB_PERFUME_REVIEW_M_OLD;
+ALTER TABLE TB_PERFUME_REVIEW_M_OLD RENAME CONSTRAINT PK_TB_PERFUME_REVIEW_M TO PK_TB_PERFUME_REVIEW_M_OLD;
+ALTER TABLE TB_PERFUME_REVIEW_M_OLD RENAME CONSTRAINT FK_TB_PERFUME_REVIEW_M_PERFUME TO FK_TB_PERFUME_REVIEW_M_OLD_PERFUME;
+
+\ir tb_perfume_review_m.sql
+
+INSERT INTO TB_PERFUME_REVIEW_M (REVIEW_ID, PERFUME_ID, CONTENT, LOAD_DT)
+SELECT REVIEW_ID, PERFUME_ID, CONTENT, LOAD_DT FROM TB_PERFUME_REVIEW_M_OLD;
+
+DROP TABLE TB_PERFUME_REVIEW_M_OLD;
+
+ALTER TABLE IF EXISTS TB_PERFUME_REVIEW_CHUNK_M
+    ADD CONSTRAINT TB_PERFUME_REVIEW_CHUNK_M_REVIEW_ID_PERFUME_ID_FKEY
+    FOREIGN KEY (REVIEW_ID, PERFUME_ID)
+    REFERENCES TB_PERFUME_REVIEW_M (REVIEW_ID, PERFUME_ID) ON DELETE CASCADE;
+
+COMMIT;
+
+\ir tb_perfume_review_m_fts.sql
@@ -0,0 +1,37 @@
+-- PERFUME_DB / 노트·어코드 사전 (TB_PERFUME_NOTE_VOCAB_M, TB_PERFUME_ACCORD_VOCAB_M)
+-- NOTES/ACCORD 테이블은 문자열 대신 사전 정수 ID(NOTE_ID / ACCORD_ID)를 저장
+-- ETL(load/copy_loader.py)이 원본 문자열 → 정규화 키 → ID로 매핑하고, 새 키는 사전에 추가
+-- 표기만 다른 값("Marine notes" / "marine  notes")은 같은 키 → 같은 ID
+
+-- 정규화 키: 앞뒤 공백 제거, 연속 공백 1칸, 소문자 (backend main_v3.vocab_key 와 동일 규칙)
+CREATE OR REPLACE FUNCTION FN_VOCAB_KEY(P_VALUE TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT lower(regexp_replace(btrim(P_VALUE), '\s+', ' ', 'g'))
+$$;
+
+CREATE TABLE TB_PERFUME_NOTE_VOCAB_M (
+    NOTE_ID     INTEGER       GENERATED BY DEFAULT AS IDENTITY,  -- 노트ID
+    NOTE_KEY    VARCHAR(100)  NOT NULL,                 -- 정규화 키 (FN_VOCAB_KEY)
+    NOTE        VARCHAR(100)  NOT NULL,                 -- 표시명 (처음 적재 시 가장 많이 쓰인 표기)
+    LOAD_DT     TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT PK_TB_PERFUME_NOTE_VOCAB_M
+        PRIMARY KEY (NOTE_ID),
+
+    CONSTRAINT UK_TB_PERFUME_NOTE_VOCAB_M_KEY
+        UNIQUE (NOTE_KEY)
+);
+
+CREATE TABLE TB_PERFUME_ACCORD_VOCAB_M (
+    ACCORD_ID   INTEGER       GENERATED BY DEFAULT AS IDENTITY,  -- 어코드ID
+    ACCORD_KEY  VARCHAR(100)  NOT NULL,                 -- 정규화 키 (FN_VOCAB_KEY)
+    ACCORD      VARCHAR(100)  NOT NULL,                 -- 표시명
+    LOAD_DT     TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT PK_TB_PERFUME_ACCORD_VOCAB_M
+        PRIMARY KEY (ACCORD_ID),
+
+    CONSTRAINT UK_TB_PERFUME_ACCORD_VOCAB_M_KEY
+        UNIQUE (ACCORD_KEY)
+);
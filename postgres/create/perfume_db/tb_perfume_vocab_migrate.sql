@@ -0,0 +1,62 @@
+-- PERFUME_DB / 노트·어코드 사전 ID 전환 (문자열 NOTE/ACCORD 컬럼 볼륨에서 1회 실행)
+--   docker exec -i pgvector-db psql -U scentence -d perfume_db -v ON_ERROR_STOP=1 < postgres/create/perfume_db/tb_perfume_vocab_migrate.sql
+-- 1. 사전 테이블 생성 + 기존 값으로 채움 (키별 표시명 = 가장 많이 쓰인 표기, 공백만 정리)
+-- 2. NOTES/ACCORD 를 ID 컬럼 테이블로 교체 (표기만 다른 중복 행은 1행으로 합침)
+
+BEGIN;
+
+\ir tb_perfume_vocab_m.sql
+
+INSERT INTO TB_PERFUME_NOTE_VOCAB_M (NOTE_KEY, NOTE)
+SELECT DISTINCT ON (NOTE_KEY) NOTE_KEY, NOTE
+FROM (
+    SELECT FN_VOCAB_KEY(NOTE) AS NOTE_KEY, regexp_replace(btrim(NOTE), '\s+', ' ', 'g') AS NOTE, count(*) AS CNT
+    FROM TB_PERFUME_NOTES_M
+    GROUP BY 1, 2
+) t
+ORDER BY NOTE_KEY, CNT DESC, NOTE;
+
+INSERT INTO TB_PERFUME_ACCORD_VOCAB_M (ACCORD_KEY, ACCORD)
+SELECT DISTINCT ON (ACCORD_KEY) ACCORD_KEY, ACCORD
+FROM (
+    SELECT FN_VOCAB_KEY(ACCORD) AS ACCORD_KEY, regexp_replace(btrim(ACCORD), '\s+', ' ', 'g') AS ACCORD, count(*) AS CNT
+    FROM TB_PERFUME_ACCORD_M
+    GROUP BY 1, 2
+) t
+ORDER BY ACCORD_KEY, CNT DESC, ACCORD;
+
+-- NOTES
+ALTER TABLE TB_PERFUME_NOTES_M RENAME TO TB_PERFUME_NOTES_M_OLD;
+ALTER TABLE TB_PERFUME_NOTES_M_OLD RENAME CONSTRAINT PK_TB_PERFUME_NOTES_M TO PK_TB_PERFUME_NOTES_M_OLD;
+ALTER TABLE TB_PERFUME_NOTES_M_OLD RENAME CONSTRAINT CK_TB_PERFUME_NOTES_M_TYPE TO CK_TB_PERFUME_NOTES_M_OLD_TYPE;
+ALTER TABLE TB_PERFUME_NOTES_M_OLD RENAME CONSTRAINT FK_TB_PERFUME_NOTES_M_PERFUME TO FK_TB_PERFUME_NOTES_M_OLD_PERFUME;
+
+\ir tb_perfume_notes_m.sql
+
+INSERT INTO TB_PERFUME_NOTES_M (PERFUME_ID, NOTE_ID, TYPE, LOAD_DT)
+SELECT DISTINCT ON (o.PERFUME_ID, v.NOTE_ID, o.TYPE) o.PERFUME_ID, v.NOTE_ID, o.TYPE, o.LOAD_DT
+FROM TB_PERFUME_NOTES_M_OLD o
+JOIN TB_PERFUME_NOTE_VOCAB_M v ON v.NOTE_KEY = FN_VOCAB_KEY(o.NOTE)
+ORDER BY o.PERFUME_ID, v.NOTE_ID, o.TYPE, o.LOAD_DT DESC;
+
+DROP TABLE TB_PERFUME_NOTES_M_OLD;
+
+-- ACCORD
+ALTER TABLE TB_PERFUME_ACCORD_M RENAME TO TB_PERFUME_ACCORD_M_OLD;
+ALTER TABLE TB_PERFUME_ACCORD_M_OLD RENAME CONSTRAINT PK_TB_PERFUME_ACCORD_M TO PK_TB_PERFUME_ACCORD_M_OLD;
+ALTER TABLE TB_PERFUME_ACCORD_M_OLD RENAME CONSTRAINT FK_TB_PERFUME_ACCORD_M_PERFUME TO FK_TB_PERFUME_ACCORD_M_OLD_PERFUME;
+
+\ir tb_perfume_accord_m.sql
+
+INSERT INTO TB_PERFUME_ACCORD_M (PERFUME_ID, ACCORD_ID, VOTE, LOAD_DT)
+SELECT DISTINCT ON (o.PERFUME_ID, v.ACCORD_ID) o.PERFUME_ID, v.ACCORD_ID, o.VOTE, o.LOAD_DT
+FROM TB_PERFUME_ACCORD_M_OLD o
+JOIN TB_PERFUME_ACCORD_VOCAB_M v ON v.ACCORD_KEY = FN_VOCAB_KEY(o.ACCORD)
+ORDER BY o.PERFUME_ID, v.ACCORD_ID, o.VOTE DESC NULLS LAST;
+
+DROP TABLE TB_PERFUME_ACCORD_M_OLD;
+
+COMMIT;
+
+ANALYZE TB_PERFUME_NOTES_M;
+ANALYZE TB_PERFUME_ACCORD_M;
@@ -0,0 +1,21 @@
+-- SCENTENCE_DB / TB_CHAT_SESSION_T
+-- 채팅 세션 상태(그래프 체크포인트) 테이블
+-- 후속 질문에서 재사용할 최소한의 상태(적용 필터, 노출 향수, 직전 결과, 대화 이력)만 JSONB로 저장
+
+CREATE TABLE TB_CHAT_SESSION_T (
+    SESSION_ID    VARCHAR(64)   NOT NULL,                 -- 세션ID
+    STATE         JSONB         NOT NULL,                 -- 압축된 그래프 상태
+    TURN_CNT      INTEGER       NOT NULL DEFAULT 0,       -- 대화 턴 수
+    CREATE_DT     TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 생성일시
+    ALTER_DT      TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 수정일시
+
+    CONSTRAINT PK_TB_CHAT_SESSION_T
+        PRIMARY KEY (SESSION_ID),
+
+    CONSTRAINT CK_TB_CHAT_SESSION_T_TURN_CNT
+        CHECK (TURN_CNT >= 0)
+);
+
+-- 만료 세션 정리용 인덱스
+CREATE INDEX IDX_CHAT_SESSION_ALTER_DT
+ON TB_CHAT_SESSION_T (ALTER_DT);
@@ -0,0 +1,230 @@
+"""
+리뷰 테이블 레이아웃 벤치마크: 단일 테이블(기존) vs PERFUME_ID 해시 파티션(현재)
+
+같은 리뷰 Arrow 파일로 벤치마크용 테이블 2개를 만들어 비교합니다 (운영 테이블은 건드리지 않음).
+  flat : PK (REVIEW_ID) + PERFUME_ID 인덱스, copy_loader.copy_merge (커넥션 1개)
+  part : PK (REVIEW_ID, PERFUME_ID) + 해시 파티션 N개, load_reviews_partitioned (워커 프로세스)
+
+1. 벌크 적재: 빈 테이블 적재 / 같은 파일 재적재(변경 없음) 시간과 rows/s
+2. 향수별 리뷰 조회: 무작위 향수 --queries 개를 PERFUME_ID = ? 로 조회한 지연 p50/p95
+   + 후보 향수 20개를 PERFUME_ID = ANY(?) 로 한 번에 조회 (챗봇 리뷰 스니펫과 같은 형태)
+3. EXPLAIN ANALYZE 로 조회 1건이 실제로 읽은 파티션 수
+
+사용법 (scripts/perfume_db 에서 실행):
+    python bench_review_partition.py [--file outputs/TB_PERFUME_REVIEW_M.arrow] [--synthetic 500000]
+                                     [--partitions 8] [--workers 4] [--queries 500] [--keep]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BASE_DIR, "load")]
+
+os.environ.setdefault("DB_HOST", os.getenv("POSTGRES_HOST", "localhost"))
+os.environ.setdefault("DB_PORT", os.getenv("POSTGRES_PORT", "5433"))
+
+import psycopg2  # noqa: E402
+import pyarrow as pa  # noqa: E402
+
+from copy_loader import DB_CONFIG, copy_merge  # noqa: E402
+from load_reviews_partitioned import DATA_PATH, LEGACY_KEY_COLUMNS, load_partitioned  # noqa: E402
+
+FLAT_TABLE = "TB_PERFUME_REVIEW_M_BENCH_FLAT"
+PART_TABLE = "TB_PERFUME_REVIEW_M_BENCH_PART"
+CANDIDATES = 20  # ANY(?) 조회 1번에 넣는 향수 수
+
+COLUMNS = """
+    REVIEW_ID   BIGINT     NOT NULL,
+    PERFUME_ID  BIGINT     NOT NULL,
+    CONTENT     TEXT       NOT NULL,
+    LOAD_DT     TIMESTAMP  NOT NULL DEFAULT CURRENT_TIMESTAMP,
+"""
+FETCH_SQL = "SELECT REVIEW_ID, CONTENT FROM {table} WHERE PERFUME_ID = %s"
+FETCH_ANY_SQL = "SELECT REVIEW_ID, PERFUME_ID, CONTENT FROM {table} WHERE PERFUME_ID = ANY(%s)"
+
+
+# ==========================================
+# 준비
+# ==========================================
+def create_tables(cur, partitions):
+    cur.execute(f"""
+        DROP TABLE IF EXISTS {FLAT_TABLE}, {PART_TABLE};
+        CREATE TABLE {FLAT_TABLE} ({COLUMNS}
+            PRIMARY KEY (REVIEW_ID),
+            FOREIGN KEY (PERFUME_ID) REFERENCES TB_PERFUME_BASIC_M (PERFUME_ID)
+        );
+        CREATE INDEX ON {FLAT_TABLE} (PERFUME_ID);
+        CREATE TABLE {PART_TABLE} ({COLUMNS}
+            PRIMARY KEY (REVIEW_ID, PERFUME_ID),
+            FOREIGN KEY (PERFUME_ID) REFERENCES TB_PERFUME_BASIC_M (PERFUME_ID)
+        ) PARTITION BY HASH (PERFUME_ID);
+        CREATE INDEX ON {PART_TABLE} (PERFUME_ID);
+    """)
+    for i in range(partitions):
+        cur.execute(f"""
+            CREATE TABLE {PART_TABLE}_P{i} PARTITION OF {PART_TABLE}
+            FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})
+        """)
+
+
+def write_synthetic(cur, rows, path):
+    """TB_PERFUME_BASIC_M 의 향수 ID로 리뷰 rows 개짜리 Arrow 파일 생성 (향수별 리뷰 수는 치우치게)"""
+    cur.execute("SELECT PERFUME_ID FROM TB_PERFUME_BASIC_M")
+    perfume_ids = [r[0] for r in cur.fetchall()]
+    if not perfume_ids:
+        raise RuntimeError("TB_PERFUME_BASIC_M 이 비어 있음 (run_etl.py 먼저 실행)")
+    weights = [1 / (rank + 1) for rank in range(len(perfume_ids))]
+    schema = pa.schema([
+        pa.field("REVIEW_ID", pa.int64(), nullable=False),
+        pa.field("PERFUME_ID", pa.int64(), nullable=False),
+        pa.field("CONTENT", pa.string()),
+        pa.field("LOAD_DT", pa.timestamp("s")),
+    ])
+    rng = random.Random(42)
+    load_dt = datetime.now().replace(microsecond=0)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for start in range(0, rows, 50000):
+            n = min(50000, rows - start)
+            writer.write_batch(pa.record_batch([
+                pa.array(range(start + 1, start + n + 1), pa.int64()),
+                pa.array(rng.choices(perfume_ids, weights, k=n), pa.int64()),
+                pa.array([f"synthetic review {start + i} " * 8 for i in range(n)]),
+                pa.array([load_dt] * n, pa.timestamp("s")),
+            ], schema=schema))
+
+
+# ==========================================
+# 측정
+# ==========================================
+def bench_load(path, workers):
+    results = {}
+    for label in ("빈 테이블", "재적재"):
+        started = time.monotonic()
+        rows = copy_merge(FLAT_TABLE, path, LEGACY_KEY_COLUMNS)
+        results[("flat", label)] = (rows, time.monotonic() - started)
+
+        started = time.monotonic()
+        rows = load_partitioned(path, workers, PART_TABLE)
+        results[("part", label)] = (rows, time.monotonic() - started)
+    return results
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def bench_fetch(cur, table, perfume_ids, candidate_sets):
+    cur.execute(FETCH_SQL.format(table=table), (perfume_ids[0],))  # 워밍업
+    cur.fetchall()
+    single = []
+    for pid in perfume_ids:
+        started = time.perf_counter()
+        cur.execute(FETCH_SQL.format(table=table), (pid,))
+        cur.fetchall()
+        single.append((time.perf_counter() - started) * 1000)
+    many = []
+    for ids in candidate_sets:
+        started = time.perf_counter()
+        cur.execute(FETCH_ANY_SQL.format(table=table), (ids,))
+        cur.fetchall()
+        many.append((time.perf_counter() - started) * 1000)
+    return single, many
+
+
+def relations_scanned(cur, sql, params):
+    """EXPLAIN ANALYZE 에서 실제로 실행된(loops > 0) 스캔 노드의 테이블 목록"""
+    cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0][0]["Plan"]
+    seen, stack = set(), [plan]
+    while stack:
+        node = stack.pop()
+        if node.get("Relation Name") and node.get("Actual Loops", 0) > 0:
+            seen.add(node["Relation Name"])
+        stack.extend(node.get("Plans", []))
+    return sorted(seen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 테이블 단일 vs 해시 파티션 벤치마크")
+    parser.add_argument("--file", default=DATA_PATH, help="리뷰 Arrow 파일")
+    parser.add_argument("--synthetic", type=int, help="N건짜리 합성 리뷰 파일로 측정 (--file 무시)")
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ETL_WORKERS", os.cpu_count() or 2)))
+    parser.add_argument("--queries", type=int, default=500, help="향수별 조회 횟수")
+    parser.add_argument("--keep", action="store_true", help="벤치마크 테이블을 지우지 않음")
+    args = parser.parse_args()
+
+    os.chdir(BASE_DIR)
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    tmpdir = tempfile.TemporaryDirectory()
+    try:
+        with conn.cursor() as cur:
+            path = args.file
+            if args.synthetic:
+                path = os.path.join(tmpdir.name, "reviews.arrow")
+                write_synthetic(cur, args.synthetic, path)
+            create_tables(cur, args.partitions)
+
+            # 1. 벌크 적재
+            print(f"[bench] file={path}, partitions={args.partitions}, workers={args.workers}")
+            loads = bench_load(path, args.workers)
+            cur.execute(f"ANALYZE {FLAT_TABLE}; ANALYZE {PART_TABLE};")
+
+            # 2. 조회 지연 (리뷰가 있는 향수 중 무작위)
+            cur.execute(f"SELECT DISTINCT PERFUME_ID FROM {FLAT_TABLE}")
+            reviewed = [r[0] for r in cur.fetchall()]
+            if not reviewed:
+                print("[SKIP] 리뷰가 없어 조회 벤치마크 생략")
+                return
+            rng = random.Random(7)
+            perfume_ids = [rng.choice(reviewed) for _ in range(args.queries)]
+            candidate_sets = [
+                rng.sample(reviewed, min(CANDIDATES, len(reviewed))) for _ in range(max(1, args.queries // 10))
+            ]
+            fetches = {
+                "flat": bench_fetch(cur, FLAT_TABLE, perfume_ids, candidate_sets),
+                "part": bench_fetch(cur, PART_TABLE, perfume_ids, candidate_sets),
+            }
+
+            # 3. 읽은 파티션 수
+            scanned = {
+                table: (
+                    relations_scanned(cur, FETCH_SQL.format(table=table), (perfume_ids[0],)),
+                    relations_scanned(cur, FETCH_ANY_SQL.format(table=table), (candidate_sets[0],)),
+                )
+                for table in (FLAT_TABLE, PART_TABLE)
+            }
+
+        print("\n========== 벌크 적재 ==========")
+        for (layout, label), (rows, elapsed) in loads.items():
+            rate = rows / elapsed if elapsed else 0
+            print(f"  {layout:<5} {label:<6} {rows:>9}행 {elapsed:>7.2f}s {rate:>11,.0f} rows/s")
+
+        print(f"\n========== 향수별 조회 (ms, {args.queries}회 / ANY {len(candidate_sets)}회) ==========")
+        print(f"  {'':<5} {'= p50':>8} {'= p95':>8} {'= mean':>8} {'ANY p50':>9} {'ANY p95':>9}")
+        for layout, (single, many) in fetches.items():
+            print(f"  {layout:<5} {percentile(single, 50):>8.3f} {percentile(single, 95):>8.3f} "
+                  f"{statistics.mean(single):>8.3f} {percentile(many, 50):>9.3f} {percentile(many, 95):>9.3f}")
+
+        print("\n========== 읽은 테이블/파티션 (EXPLAIN ANALYZE) ==========")
+        for table, (single, many) in scanned.items():
+            print(f"  {table}: PERFUME_ID = ? → {len(single)}개, ANY({CANDIDATES}개) → {len(many)}개")
+
+    finally:
+        if not args.keep:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {FLAT_TABLE}, {PART_TABLE}")
+        conn.close()
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
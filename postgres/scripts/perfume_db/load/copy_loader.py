@@ -0,0 +1,234 @@
+"""
+to_db_*.py 공용 적재기: COPY FROM STDIN → 스테이징 테이블 → 집합 기반 MERGE 1번
+
+1. 대상 테이블과 같은 모양의 임시(TEMP, WAL 미기록) 스테이징 테이블 생성
+2. 중간 파일을 COPY FROM STDIN으로 스트리밍 (DataFrame/dict 변환 없음)
+   - .arrow (Arrow IPC, tables/ 단계 출력): 파일을 memory-map 하고 레코드 배치 단위로
+     Arrow(C++) CSV 인코더를 거쳐 COPY로 흘려보냄 → 타입은 파일 스키마 그대로, 메모리는 배치 1개분
+   - .csv: 파일을 그대로 COPY
+   - 사전 컬럼(VOCAB_COLUMNS: NOTE/ACCORD 문자열)은 스테이징에서 사전 정수 ID로 매핑 (새 값은 사전에 추가)
+3. INSERT ... SELECT ... ON CONFLICT DO UPDATE 1번으로 대상 테이블에 반영
+   - 같은 키가 파일에 여러 번 나오면 마지막 행 기준 (기존 execute_batch 동작과 동일)
+   - LOAD_DT를 뺀 내용이 같은 행은 갱신하지 않음 (IS DISTINCT FROM) → 불필요한 WAL/VACUUM 없음
+
+접속 정보는 환경변수 DB_HOST / DB_PORT (기본 localhost:5433)
+"""
+import csv
+import os
+import time
+
+import psycopg2
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+DB_CONFIG = {
+    "dbname": "perfume_db",
+    "user": "scentence",
+    "password": "scentence",
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5433"),
+}
+
+STAGING_ROW_NO = "stg_row_no"  # 파일 내 순서 (중복 키는 마지막 행 사용)
+AUDIT_COLUMNS = ("LOAD_DT",)   # 내용 비교에서 제외하는 컬럼
+
+# 대상 테이블 → (파일의 문자열 컬럼, 대상의 ID 컬럼, 사전 테이블)
+# 사전 테이블 컬럼: <ID 컬럼>, <문자열 컬럼>_KEY (FN_VOCAB_KEY), <문자열 컬럼> (표시명)
+VOCAB_COLUMNS = {
+    "TB_PERFUME_NOTES_M": ("NOTE", "NOTE_ID", "TB_PERFUME_NOTE_VOCAB_M"),
+    "TB_PERFUME_ACCORD_M": ("ACCORD", "ACCORD_ID", "TB_PERFUME_ACCORD_VOCAB_M"),
+}
+
+
+def read_header(csv_path):
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+class ArrowCsvStream:
+    """
+    Arrow 레코드 배치들 → COPY용 CSV 바이트 스트림 (copy_expert 가 read(size)로 당겨 감)
+    배치를 하나씩 CSV로 인코딩하므로 메모리에는 배치 1개 분량만 올라갑니다.
+    null은 따옴표 없는 빈 값(→ NULL), 빈 문자열은 ""(→ '')로 나가 COPY csv 규칙과 맞습니다.
+    """
+
+    def __init__(self, batches):
+        self.batches = iter(batches)
+        self.buffer = memoryview(b"")
+        self.options = pa_csv.WriteOptions(include_header=False)
+
+    def _fill(self):
+        while not self.buffer:
+            batch = next(self.batches, None)
+            if batch is None:
+                return
+            sink = pa.BufferOutputStream()
+            pa_csv.write_csv(batch, sink, self.options)
+            self.buffer = memoryview(sink.getvalue())
+
+    def read(self, size=-1):
+        self._fill()
+        if size is None or size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk.tobytes()
+
+
+def iter_batches(reader, indexes=None):
+    """IPC 파일 리더의 레코드 배치 (indexes 를 주면 해당 배치만, memory-map 이라 복사 없음)"""
+    for i in range(reader.num_record_batches) if indexes is None else indexes:
+        yield reader.get_batch(i)
+
+
+def _create_staging(cur, table):
+    staging = f"stg_{table.lower()}"
+    cur.execute(f"""
+        CREATE TEMP TABLE {staging}
+        (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP;
+        ALTER TABLE {staging} ADD COLUMN {STAGING_ROW_NO} BIGSERIAL;
+    """)
+    if table in VOCAB_COLUMNS:
+        # 파일의 문자열 컬럼을 받고, ID는 COPY 후 map_vocab 이 채움
+        value_col, id_col, _ = VOCAB_COLUMNS[table]
+        cur.execute(f"""
+            ALTER TABLE {staging}
+                ADD COLUMN {value_col} TEXT,
+                ALTER COLUMN {id_col} DROP NOT NULL
+        """)
+    return staging
+
+
+def map_vocab(cur, table, staging, columns):
+    """
+    스테이징의 문자열 컬럼 → 사전 ID. 사전에 없는 키는 추가
+    (키별 표시명 = 파일에서 가장 많이 쓰인 표기, 공백만 정리)
+    반환: 문자열 컬럼을 ID 컬럼으로 바꾼 컬럼 목록
+    """
+    if table not in VOCAB_COLUMNS:
+        return columns
+    value_col, id_col, vocab = VOCAB_COLUMNS[table]
+    key_col = f"{value_col}_KEY"
+    cur.execute(f"""
+        INSERT INTO {vocab} ({key_col}, {value_col})
+        SELECT DISTINCT ON (k) k, v
+        FROM (
+            SELECT FN_VOCAB_KEY({value_col}) AS k,
+                   regexp_replace(btrim({value_col}), '\\s+', ' ', 'g') AS v,
+                   count(*) AS n
+            FROM {staging}
+            GROUP BY 1, 2
+        ) t
+        ORDER BY k, n DESC, v
+        ON CONFLICT ({key_col}) DO NOTHING;
+
+        UPDATE {staging} s
+        SET {id_col} = d.{id_col}
+        FROM {vocab} d
+        WHERE d.{key_col} = FN_VOCAB_KEY(s.{value_col});
+    """)
+    return [id_col if c == value_col else c for c in columns]
+
+
+def stage_csv(cur, table, csv_path):
+    """
+    CSV를 임시 스테이징 테이블(stg_<table>, 커밋 시 삭제)로 COPY.
+    반환: (스테이징 테이블명, 대상 컬럼 목록 (사전 컬럼은 ID 컬럼으로), 적재 행 수)
+    """
+    columns = read_header(csv_path)
+    staging = _create_staging(cur, table)
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        cur.copy_expert(
+            f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, HEADER true)", f
+        )
+        loaded = cur.rowcount
+    return staging, map_vocab(cur, table, staging, columns), loaded
+
+
+def stage_arrow(cur, table, arrow_path):
+    """
+    Arrow IPC 파일을 memory-map 해서 스테이징 테이블로 COPY (컬럼 = 파일 스키마).
+    반환: stage_csv 와 동일
+    """
+    with pa.memory_map(arrow_path) as source:
+        reader = pa.ipc.open_file(source)
+        columns = reader.schema.names
+        staging = _create_staging(cur, table)
+        cur.copy_expert(
+            f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            ArrowCsvStream(iter_batches(reader)),
+        )
+        loaded = cur.rowcount
+    return staging, map_vocab(cur, table, staging, columns), loaded
+
+
+def stage_file(cur, table, path):
+    """확장자에 따라 stage_arrow / stage_csv"""
+    if path.endswith(".arrow"):
+        return stage_arrow(cur, table, path)
+    return stage_csv(cur, table, path)
+
+
+def merge_sql(table, staging, columns, key_columns, update_columns, where=None):
+    """스테이징 → 대상 upsert. 비교 대상 컬럼 값이 그대로면 행을 건드리지 않음"""
+    cols = ", ".join(columns)
+    keys = ", ".join(key_columns)
+    compare = [c for c in update_columns if c.upper() not in AUDIT_COLUMNS]
+    if compare:
+        sets = ",\n            ".join(f"{c} = EXCLUDED.{c}" for c in update_columns)
+        target = ", ".join(f"{table}.{c}" for c in compare)
+        excluded = ", ".join(f"EXCLUDED.{c}" for c in compare)
+        conflict = (
+            f"DO UPDATE SET\n            {sets}\n"
+            f"        WHERE ROW({target}) IS DISTINCT FROM ROW({excluded})"
+        )
+    else:
+        # 키 외에 비교할 내용이 없으면 (예: NOTES) 새 행만 추가
+        conflict = "DO NOTHING"
+    return f"""
+        INSERT INTO {table} ({cols})
+        SELECT DISTINCT ON ({keys}) {cols}
+        FROM {staging}
+        {f"WHERE {where}" if where else ""}
+        ORDER BY {keys}, {STAGING_ROW_NO} DESC
+        ON CONFLICT ({keys})
+        {conflict}
+    """
+
+
+def copy_merge(table, path, key_columns, update_columns=None, conn=None):
+    """
+    중간 파일(.arrow 스키마 / .csv 헤더 = 대상 컬럼명)을 table에 upsert.
+    update_columns를 생략하면 키가 아닌 모든 컬럼을 갱신합니다.
+    반환: 파일 행 수
+    """
+    if not os.path.exists(path):
+        print(f"[SKIP] {path} 없음")
+        return 0
+
+    started = time.monotonic()
+    own_conn = conn is None
+    conn = conn or psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                staging, columns, loaded = stage_file(cur, table, path)
+                if loaded == 0:
+                    print(f"[SKIP] {path} 비었음")
+                    return 0
+
+                if update_columns is None:
+                    update_columns = [c for c in columns if c not in key_columns]
+                cur.execute(merge_sql(table, staging, columns, key_columns, update_columns))
+                merged = cur.rowcount
+
+        elapsed = time.monotonic() - started
+        print(f"[OK] {table} 적재 완료 ({loaded}건, 반영 {merged}건, {elapsed:.2f}s)")
+        return loaded
+
+    except Exception as e:
+        print(f"[FAIL] {table} 적재 실패: {e}")
+        raise
+
+    finally:
+        if own_conn:
+            conn.close()
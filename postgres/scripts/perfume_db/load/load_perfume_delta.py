@@ -0,0 +1,202 @@
+"""
+perfume_db 증분 적재 (향수별 내용 해시 기준)
+
+tables/normalize_perfume_tsv.py 가 만든 TB_PERFUME_ETL_HASH_M.arrow(향수별 원본 MD5)를
+저장된 해시와 비교해서 바뀐 것만 반영합니다. 전체 과정이 한 트랜잭션입니다.
+
+1. 해시 비교 → 추가/변경 향수(etl_changed), 원본에서 사라진 향수(etl_deleted)
+2. BASIC → 자식 테이블 순서로 변경 향수 행만 upsert (내용이 같은 행은 건드리지 않음)
+   자식 테이블에서 변경 향수의 행 중 새 출력 파일에 없는 행은 삭제
+3. 사라진 향수는 자식/참조 테이블부터 지우고 BASIC 삭제
+   미리 계산된 이웃 테이블(유사/레이어링, BASIC FK 없음)은 내용이 바뀌었거나 사라진 향수가 낀 행을 삭제
+4. 마지막에 해시 테이블 갱신 (중간에 실패하면 전체 롤백 → 다음 실행에서 다시 처리)
+
+사용법 (scripts/perfume_db 에서 실행):
+    python load/load_perfume_delta.py [--full]
+"""
+import argparse
+import os
+import time
+
+import psycopg2
+
+from copy_loader import DB_CONFIG, STAGING_ROW_NO, merge_sql, stage_arrow
+
+OUTPUT_DIR = "outputs"
+HASH_TABLE = "TB_PERFUME_ETL_HASH_M"
+BASIC_TABLE = ("TB_PERFUME_BASIC_M", ["PERFUME_ID"])
+
+# 자식 테이블 → 키 컬럼
+CHILD_TABLES = {
+    "TB_PERFUME_NOTES_M": ["PERFUME_ID", "NOTE_ID", "TYPE"],
+    "TB_PERFUME_ACCORD_M": ["PERFUME_ID", "ACCORD_ID"],
+    "TB_PERFUME_AUD_M": ["PERFUME_ID", "AUDIENCE"],
+    "TB_PERFUME_SEASON_M": ["PERFUME_ID", "SEASON"],
+    "TB_PERFUME_OCA_M": ["PERFUME_ID", "OCCASION"],
+}
+
+# 출력 파일명이 테이블명과 다른 테이블 (tables/normalize_perfume_tsv.py 출력 이름)
+OUTPUT_NAMES = {
+    "TB_PERFUME_AUD_M": "TB_PERFUME_AUDIENCE_M",
+    "TB_PERFUME_OCA_M": "TB_PERFUME_OCCASION_M",
+}
+
+# 해시 대상은 아니지만 BASIC을 참조하는 테이블 (향수 삭제 시 함께 삭제, 없으면 건너뜀)
+DEPENDENT_TABLES = ["TB_PERFUME_REVIEW_M", "TB_PERFUME_EMBEDDING_M"]
+
+# 미리 계산된 향수 이웃 (backend/scripts/recom/build_*.py) → 상대 향수 컬럼. BASIC FK가 없어 직접 정리
+# (이어서 실행되는 backend/scripts/vectorDB/run_vector_etl.py 가 통째로 다시 계산, 테이블이 없으면 건너뜀)
+NEIGHBOR_TABLES = {
+    "TB_PERFUME_SIMILAR_M": "SIMILAR_PERFUME_ID",
+    "TB_PERFUME_LAYERING_M": "PARTNER_PERFUME_ID",
+}
+
+CHANGED = "PERFUME_ID IN (SELECT PERFUME_ID FROM etl_changed)"
+DELETED = "PERFUME_ID IN (SELECT PERFUME_ID FROM etl_deleted)"
+
+
+def data_path(table):
+    return f"{OUTPUT_DIR}/{OUTPUT_NAMES.get(table, table)}.arrow"
+
+
+def diff_hashes(cur, full):
+    """새 해시를 스테이징하고 변경/삭제 향수 목록(임시 테이블)을 만듦"""
+    cur.execute("SELECT to_regclass(%s)", (HASH_TABLE.lower(),))
+    if cur.fetchone()[0] is None:
+        raise RuntimeError(
+            f"{HASH_TABLE} 테이블 없음 (postgres/create/perfume_db/tb_perfume_etl_hash_m.sql 먼저 실행)"
+        )
+    staging, _, total = stage_arrow(cur, HASH_TABLE, data_path(HASH_TABLE))
+    changed_filter = "" if full else "WHERE h.ROW_HASH IS DISTINCT FROM s.ROW_HASH"
+    cur.execute(f"""
+        CREATE TEMP TABLE etl_changed ON COMMIT DROP AS
+        SELECT DISTINCT s.PERFUME_ID
+        FROM {staging} s
+        LEFT JOIN {HASH_TABLE} h ON h.PERFUME_ID = s.PERFUME_ID
+        {changed_filter};
+
+        CREATE TEMP TABLE etl_deleted ON COMMIT DROP AS
+        SELECT PERFUME_ID FROM {HASH_TABLE}
+        EXCEPT
+        SELECT PERFUME_ID FROM {staging};
+
+        -- 이웃 목록이 낡은 향수: 해시가 실제로 바뀐 기존 향수 + 삭제 향수 (--full 이어도 내용이 같으면 제외)
+        CREATE TEMP TABLE etl_stale ON COMMIT DROP AS
+        SELECT h.PERFUME_ID
+        FROM {HASH_TABLE} h
+        JOIN {staging} s ON s.PERFUME_ID = h.PERFUME_ID
+        WHERE h.ROW_HASH IS DISTINCT FROM s.ROW_HASH
+        UNION
+        SELECT PERFUME_ID FROM etl_deleted;
+    """)
+    cur.execute("SELECT (SELECT count(*) FROM etl_changed), (SELECT count(*) FROM etl_deleted)")
+    changed, deleted = cur.fetchone()
+    return staging, total, changed, deleted
+
+
+def apply_table(cur, table, key_columns, is_child):
+    """변경 향수의 행만 upsert (+ 자식 테이블은 사라진 행 삭제)"""
+    staging, columns, _ = stage_arrow(cur, table, data_path(table))
+    update_columns = [c for c in columns if c not in key_columns]
+    cur.execute(merge_sql(table, staging, columns, key_columns, update_columns, where=CHANGED))
+    upserted = cur.rowcount
+
+    removed = 0
+    if is_child:
+        match = " AND ".join(f"s.{k} = t.{k}" for k in key_columns)
+        cur.execute(f"""
+            DELETE FROM {table} t
+            WHERE t.PERFUME_ID IN (SELECT PERFUME_ID FROM etl_changed)
+              AND NOT EXISTS (SELECT 1 FROM {staging} s WHERE {match})
+        """)
+        removed = cur.rowcount
+    print(f"   [{table}] upsert {upserted}건, 삭제 {removed}건")
+
+
+def delete_perfumes(cur):
+    """원본에서 사라진 향수: 참조 테이블 → 자식 테이블 → BASIC 순서로 삭제"""
+    for table in DEPENDENT_TABLES + list(CHILD_TABLES) + [BASIC_TABLE[0]]:
+        cur.execute("SELECT to_regclass(%s)", (table.lower(),))
+        if cur.fetchone()[0] is None:
+            continue
+        cur.execute(f"DELETE FROM {table} WHERE {DELETED}")
+        if cur.rowcount:
+            print(f"   [{table}] 향수 삭제로 {cur.rowcount}건 삭제")
+
+
+def delete_stale_neighbors(cur):
+    """etl_stale 향수가 기준이거나 상대인 이웃 행 삭제 (유사/레이어링 API가 낡은 목록을 내보내지 않도록)"""
+    for table, partner_col in NEIGHBOR_TABLES.items():
+        cur.execute("SELECT to_regclass(%s)", (table.lower(),))
+        if cur.fetchone()[0] is None:
+            continue
+        cur.execute(f"""
+            DELETE FROM {table}
+            WHERE PERFUME_ID IN (SELECT PERFUME_ID FROM etl_stale)
+               OR {partner_col} IN (SELECT PERFUME_ID FROM etl_stale)
+        """)
+        if cur.rowcount:
+            print(f"   [{table}] 변경/삭제 향수의 이웃 {cur.rowcount}건 삭제")
+
+
+def save_hashes(cur, staging):
+    cur.execute(f"""
+        INSERT INTO {HASH_TABLE} (PERFUME_ID, ROW_HASH)
+        SELECT DISTINCT ON (PERFUME_ID) PERFUME_ID, ROW_HASH
+        FROM {staging}
+        WHERE {CHANGED}
+        ORDER BY PERFUME_ID, {STAGING_ROW_NO} DESC
+        ON CONFLICT (PERFUME_ID)
+        DO UPDATE SET
+            ROW_HASH = EXCLUDED.ROW_HASH,
+            LOAD_DT  = CURRENT_TIMESTAMP;
+
+        DELETE FROM {HASH_TABLE} WHERE {DELETED};
+    """)
+
+
+def load_delta(full=False):
+    """반환: 반영한 향수 수 (추가/변경 + 삭제)"""
+    if not os.path.exists(data_path(HASH_TABLE)):
+        raise FileNotFoundError(f"{data_path(HASH_TABLE)} 없음 (tables/normalize_perfume_tsv.py 먼저 실행)")
+
+    started = time.monotonic()
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                hash_staging, total, changed, deleted = diff_hashes(cur, full)
+                print(f"[delta] 향수 {total}개 중 추가/변경 {changed}개, 삭제 {deleted}개")
+                if changed == 0 and deleted == 0:
+                    print("[done] 변경 없음")
+                    return 0
+
+                if changed:
+                    apply_table(cur, *BASIC_TABLE, is_child=False)
+                    for table, key_columns in CHILD_TABLES.items():
+                        apply_table(cur, table, key_columns, is_child=True)
+                if deleted:
+                    delete_perfumes(cur)
+                delete_stale_neighbors(cur)
+                save_hashes(cur, hash_staging)
+
+        print(f"[done] 증분 적재 완료 ({time.monotonic() - started:.2f}s)")
+        return changed + deleted
+
+    except Exception as e:
+        print(f"[FAIL] 증분 적재 실패 (전체 롤백): {e}")
+        raise
+
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="perfume_db 증분 적재 (내용 해시 기준)")
+    parser.add_argument("--full", action="store_true", help="해시 비교 없이 모든 향수를 다시 반영")
+    args = parser.parse_args()
+    load_delta(args.full)
+
+
+if __name__ == "__main__":
+    main()
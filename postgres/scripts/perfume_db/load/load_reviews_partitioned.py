@@ -0,0 +1,200 @@
+"""
+TB_PERFUME_REVIEW_M 파티션 병렬 적재 (PERFUME_ID 해시 파티션)
+
+대상 테이블의 파티션 경계(MODULUS/REMAINDER)를 그대로 복제한 스테이징 테이블을 만들고,
+두 단계를 워커 프로세스(커넥션 1개씩)로 나눠 실행합니다.
+
+1. COPY: Arrow 레코드 배치를 워커 수만큼 나눠 스테이징 테이블로 동시에 COPY
+   - 행은 PostgreSQL이 PERFUME_ID 해시로 스테이징 파티션에 분배 (대상 테이블과 같은 파티션 번호)
+   - 파일 내 순서(stg_row_no)는 배치 오프셋으로 미리 계산 → 동시 COPY 여도 "같은 키는 마지막 행" 유지
+2. MERGE: 스테이징 파티션 i → 대상 파티션 i 를 파티션별로 동시에 upsert (copy_loader.merge_sql)
+   - 파티션끼리 행이 겹치지 않으므로 락/인덱스 경합 없음
+   - 그 전에 다른 PERFUME_ID 로 옮겨진 리뷰(REVIEW_ID 같고 PERFUME_ID 다름)의 옛 행을 삭제
+
+스테이징은 UNLOGGED(WAL 미기록) 일반 테이블이라 적재가 끝나면(실패해도) 삭제합니다.
+MERGE는 파티션 단위로 커밋되므로 중간 실패 시 일부 파티션만 반영될 수 있지만, 다시 실행하면 같은 결과가 됩니다.
+파티션 전 테이블(마이그레이션 전 볼륨)이면 copy_loader.copy_merge 한 번으로 적재합니다.
+
+사용법 (scripts/perfume_db 에서 실행):
+    python load/load_reviews_partitioned.py [--workers 4]
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+import psycopg2
+import pyarrow as pa
+
+from copy_loader import DB_CONFIG, STAGING_ROW_NO, ArrowCsvStream, copy_merge, iter_batches, merge_sql
+
+DATA_PATH = "outputs/TB_PERFUME_REVIEW_M.arrow"
+TABLE_NAME = "TB_PERFUME_REVIEW_M"
+KEY_COLUMNS = ["REVIEW_ID", "PERFUME_ID"]
+LEGACY_KEY_COLUMNS = ["REVIEW_ID"]  # 파티션 전 테이블의 PK
+
+HASH_BOUND = re.compile(r"FOR VALUES WITH \(modulus (\d+), remainder (\d+)\)")
+
+
+# ==========================================
+# 파티션 정보
+# ==========================================
+def list_partitions(cur, table):
+    """해시 파티션 목록 [(파티션명, modulus, remainder)] (파티션 테이블이 아니면 빈 목록)"""
+    cur.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname
+    """, (table.lower(),))
+    partitions = []
+    for name, bound in cur.fetchall():
+        m = HASH_BOUND.search(bound)
+        if not m:
+            raise ValueError(f"{table}: 해시 파티션이 아님 ({name}: {bound})")
+        partitions.append((name, int(m.group(1)), int(m.group(2))))
+    return partitions
+
+
+def create_staging(cur, table, staging, partitions):
+    """대상과 같은 파티션 경계의 UNLOGGED 스테이징 테이블 (+ 파일 순서 컬럼)"""
+    cur.execute(f"""
+        DROP TABLE IF EXISTS {staging};
+        CREATE TABLE {staging}
+        (LIKE {table} INCLUDING DEFAULTS, {STAGING_ROW_NO} BIGINT NOT NULL)
+        PARTITION BY HASH (PERFUME_ID);
+    """)
+    for i, (_, modulus, remainder) in enumerate(partitions):
+        cur.execute(f"""
+            CREATE UNLOGGED TABLE {staging}_p{i} PARTITION OF {staging}
+            FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})
+        """)
+
+
+# ==========================================
+# 워커 (프로세스당 커넥션 1개)
+# ==========================================
+def copy_batches(path, staging, indexes, offsets):
+    """배치 indexes 를 stg_row_no(파일 순서)를 붙여 스테이징 테이블로 COPY. 반환: 행 수"""
+    def with_row_no(batches):
+        for offset, batch in zip(offsets, batches):
+            row_no = pa.array(range(offset, offset + batch.num_rows), pa.int64())
+            yield batch.append_column(STAGING_ROW_NO, row_no)
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn, conn.cursor() as cur, pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            columns = reader.schema.names + [STAGING_ROW_NO]
+            cur.copy_expert(
+                f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                ArrowCsvStream(with_row_no(iter_batches(reader, indexes))),
+            )
+            return cur.rowcount
+    finally:
+        conn.close()
+
+
+def delete_moved(cur, table, staging):
+    """파일에서 PERFUME_ID 가 바뀐 리뷰의 기존 행 삭제 (PK 앞 컬럼 REVIEW_ID 로 조회). 반환: 삭제 행 수"""
+    cur.execute(f"""
+        DELETE FROM {table} t
+        USING {staging} s
+        WHERE t.REVIEW_ID = s.REVIEW_ID
+          AND t.PERFUME_ID <> s.PERFUME_ID
+    """)
+    return cur.rowcount
+
+
+def merge_partition(partition, staging_partition, columns):
+    """스테이징 파티션 → 대상 파티션 upsert. 반환: 반영 행 수"""
+    update_columns = [c for c in columns if c not in KEY_COLUMNS]
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(merge_sql(partition, staging_partition, columns, KEY_COLUMNS, update_columns))
+            return cur.rowcount
+    finally:
+        conn.close()
+
+
+# ==========================================
+# 적재
+# ==========================================
+def load_partitioned(path=DATA_PATH, workers=None, table=TABLE_NAME):
+    """
+    리뷰 Arrow 파일을 파티션 병렬로 upsert (table: 같은 모양의 다른 테이블, 예: 벤치마크용).
+    반환: 파일 행 수
+    """
+    if not os.path.exists(path):
+        print(f"[SKIP] {path} 없음")
+        return 0
+
+    started = time.monotonic()
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    staging = f"stg_{table.lower()}_{os.getpid()}"
+    try:
+        with conn.cursor() as cur:
+            partitions = list_partitions(cur, table)
+        if not partitions:
+            print(f"[SKIP] {table} 파티션 없음 → 단일 COPY 적재 (tb_perfume_review_m_partition_migrate.sql 참고)")
+            return copy_merge(table, path, LEGACY_KEY_COLUMNS)
+
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            columns = reader.schema.names
+            sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+        if not sum(sizes):
+            print(f"[SKIP] {path} 비었음")
+            return 0
+        offsets = [0, *accumulate(sizes)][:-1]
+        workers = max(1, min(workers or os.cpu_count() or 2, len(partitions)))
+
+        with conn.cursor() as cur:
+            create_staging(cur, table, staging, partitions)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # 1. 배치를 워커별로 나눠 동시 COPY (배치 i → 워커 i % workers)
+            slices = [list(range(w, len(sizes), workers)) for w in range(workers)]
+            copies = [
+                pool.submit(copy_batches, path, staging, idx, [offsets[i] for i in idx])
+                for idx in slices if idx
+            ]
+            loaded = sum(f.result() for f in copies)
+            copied = time.monotonic() - started
+
+            # 2. 파티션별 동시 MERGE (옮겨진 리뷰의 옛 행부터 정리)
+            with conn.cursor() as cur:
+                moved = delete_moved(cur, table, staging)
+            merges = [
+                pool.submit(merge_partition, name, f"{staging}_p{i}", columns)
+                for i, (name, _, _) in enumerate(partitions)
+            ]
+            merged = sum(f.result() for f in merges)
+
+        elapsed = time.monotonic() - started
+        print(f"[OK] {table} 적재 완료 ({loaded}건, 반영 {merged}건, 이동 {moved}건, {elapsed:.2f}s "
+              f"= COPY {copied:.2f}s + MERGE {elapsed - copied:.2f}s, "
+              f"파티션 {len(partitions)}개, workers={workers})")
+        return loaded
+
+    except Exception as e:
+        print(f"[FAIL] {table} 적재 실패: {e}")
+        raise
+
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {staging}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TB_PERFUME_REVIEW_M 파티션 병렬 적재")
+    parser.add_argument("--file", default=DATA_PATH)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ETL_WORKERS", os.cpu_count() or 2)))
+    args = parser.parse_args()
+    load_partitioned(args.file, args.workers)
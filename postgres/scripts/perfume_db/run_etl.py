@@ -0,0 +1,160 @@
+"""
+perfume_db ETL 실행기 (의존 관계 DAG + 프로세스 풀)
+
+단계별 의존 관계를 따라 선행 단계가 끝난 단계부터 프로세스 풀에서 병렬 실행하고,
+단계별 소요 시간과 처리량(rows/s)을 출력합니다.
+extract_* 단계는 outputs/<테이블>.arrow (Arrow IPC)를 만들고, load_* 단계는 이를 memory-map 해서 COPY 합니다.
+load_review 는 PERFUME_ID 해시 파티션별로 다시 워커 프로세스를 띄워 병렬 적재합니다 (load/load_reviews_partitioned.py).
+
+  delta 모드 (기본, init-data.sh)
+    extract_perfume ──→ load_perfume_delta ──→ load_review
+    extract_review  ─────────────────────────↗
+
+  full 모드 (--mode full, 전체 재적재)
+    extract_perfume ──→ load_basic ──→ load_notes / load_accord / load_audience
+                                       load_season / load_occasion / load_review (병렬)
+    extract_review  ─────────────────────↗ (load_review)
+
+접속 정보: DB_HOST / DB_PORT (없으면 POSTGRES_HOST / POSTGRES_PORT, 기본 localhost:5433)
+동시 실행 수: --workers 또는 ETL_WORKERS (기본 CPU 수)
+
+사용법 (scripts/perfume_db 에서 실행):
+    python run_etl.py [--mode delta|full] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BASE_DIR, "tables"), os.path.join(BASE_DIR, "load")]
+
+# copy_loader가 import 시점에 읽으므로 먼저 설정 (docker-compose는 POSTGRES_* 로 전달)
+os.environ.setdefault("DB_HOST", os.getenv("POSTGRES_HOST", "localhost"))
+os.environ.setdefault("DB_PORT", os.getenv("POSTGRES_PORT", "5433"))
+
+from copy_loader import copy_merge  # noqa: E402
+from load_perfume_delta import BASIC_TABLE, CHILD_TABLES, OUTPUT_NAMES, data_path, load_delta  # noqa: E402
+from load_reviews_partitioned import load_partitioned  # noqa: E402
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: str                      # 아래 stage 함수 이름 (프로세스 간 전달용)
+    args: tuple = ()
+    deps: tuple = ()
+    result: dict = field(default_factory=dict)
+
+
+# ==========================================
+# 단계 함수 (워커 프로세스에서 실행, 처리 행 수 반환)
+# ==========================================
+def extract_perfume():
+    from normalize_perfume_tsv import normalize
+    return sum(normalize().values())
+
+
+def extract_review():
+    from to_arrow_TB_PERFUME_REVIEW_M import to_arrow
+    return to_arrow()
+
+
+def load_table(table, key_columns):
+    return copy_merge(table, data_path(table), key_columns)
+
+
+def load_perfume_delta(full):
+    return load_delta(full)
+
+
+def load_review(workers):
+    # PERFUME_ID 해시 파티션별 병렬 적재 (단계 안에서 다시 워커 프로세스 사용)
+    return load_partitioned(workers=workers)
+
+
+def run_stage(fn, args):
+    os.chdir(BASE_DIR)
+    started = time.monotonic()
+    rows = globals()[fn](*args) or 0
+    return rows, time.monotonic() - started
+
+
+# ==========================================
+# DAG
+# ==========================================
+def build_stages(mode, workers):
+    stages = [
+        Stage("extract_perfume", "extract_perfume"),
+        Stage("extract_review", "extract_review"),
+    ]
+    if mode == "delta":
+        stages += [
+            Stage("load_perfume_delta", "load_perfume_delta", (False,), ("extract_perfume",)),
+            Stage("load_review", "load_review", (workers,), ("extract_review", "load_perfume_delta")),
+        ]
+    else:
+        stages.append(Stage("load_basic", "load_table", BASIC_TABLE, ("extract_perfume",)))
+        for table, key_columns in CHILD_TABLES.items():
+            name = "load_" + OUTPUT_NAMES.get(table, table).removeprefix("TB_PERFUME_").removesuffix("_M").lower()
+            stages.append(Stage(name, "load_table", (table, key_columns), ("load_basic",)))
+        stages.append(Stage("load_review", "load_review", (workers,), ("extract_review", "load_basic")))
+    return {s.name: s for s in stages}
+
+
+def run(stages, workers):
+    done, failed = set(), None
+    running = {}
+    started = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while len(done) < len(stages) and failed is None:
+            for stage in stages.values():
+                ready = stage.name not in done and stage.name not in running.values()
+                if ready and all(d in done for d in stage.deps):
+                    print(f"[start] {stage.name}")
+                    running[pool.submit(run_stage, stage.fn, stage.args)] = stage.name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                try:
+                    rows, elapsed = fut.result()
+                except Exception as e:
+                    failed = name
+                    print(f"[FAIL] {name}: {e}")
+                    continue
+                stages[name].result = {"rows": rows, "elapsed": elapsed}
+                done.add(name)
+                print(f"[end] {name}: {rows}행, {elapsed:.2f}s")
+
+        for fut in running:
+            fut.cancel()
+
+    total = time.monotonic() - started
+    print("\n========== ETL 요약 ==========")
+    for stage in stages.values():
+        r = stage.result
+        if not r:
+            print(f"  {stage.name:<22} {'실패' if stage.name == failed else '미실행'}")
+            continue
+        rate = r["rows"] / r["elapsed"] if r["elapsed"] else 0
+        print(f"  {stage.name:<22} {r['rows']:>9}행 {r['elapsed']:>7.2f}s {rate:>11,.0f} rows/s")
+    busy = sum(s.result.get("elapsed", 0) for s in stages.values())
+    print(f"  {'전체(wall)':<22} {'':>10} {total:>7.2f}s  (단계 합계 {busy:.2f}s, workers={workers})")
+    return failed is None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="perfume_db ETL (DAG 병렬 실행)")
+    parser.add_argument("--mode", choices=["delta", "full"], default="delta")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ETL_WORKERS", os.cpu_count() or 2)))
+    args = parser.parse_args()
+    print(f"[etl] mode={args.mode}, workers={args.workers}, db={os.environ['DB_HOST']}:{os.environ['DB_PORT']}")
+    sys.exit(0 if run(build_stages(args.mode, args.workers), args.workers) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+perfume_info_updated.tsv → perfume_db 테이블 Arrow 파일 6종 (한 번 읽기)
+
+BASIC / NOTES / ACCORD / AUDIENCE / SEASON / OCCASION 과 향수별 내용 해시(ETL_HASH)를
+한 번의 스트리밍 패스로 생성합니다.
+- 출력은 outputs/<테이블>.arrow (Arrow IPC 파일, OUTPUT_SCHEMAS 타입 고정).
+  적재 단계(load/copy_loader.py)는 이 파일을 memory-map 해서 바로 COPY로 흘려보내므로
+  CSV 텍스트 재파싱/BOM 처리/타입 재추론(RELEASE_YEAR NaN 등)이 없습니다.
+- NOTE / ACCORD 는 원본 문자열 그대로 내보내고, 적재 단계에서 사전 정수 ID로 매핑합니다 (copy_loader.VOCAB_COLUMNS).
+- 원본을 CHUNK_ROWS행씩 읽고, 청크마다 모든 컬럼을 파싱해 출력 파일마다 레코드 배치 1개로 이어 씁니다.
+- 메모리에는 청크 1개 분량만 올라가므로 원본 크기와 무관하게 사용량이 일정합니다.
+- 정렬은 청크 안에서만 합니다. (원본이 PERFUME_ID 오름차순이라 전체 결과도 같은 순서)
+- --workers N 이면 청크를 프로세스 풀에서 병렬 파싱하고, 쓰기는 원래 청크 순서대로 합니다.
+  (대기 청크는 workers의 2배까지만 유지)
+리뷰(TB_PERFUME_REVIEW_M)는 원본 파일이 달라 to_arrow_TB_PERFUME_REVIEW_M.py가 담당합니다.
+
+사용법 (scripts/perfume_db 에서 실행):
+    python tables/normalize_perfume_tsv.py [--chunk-rows 5000] [--workers 4]
+"""
+import argparse
+import hashlib
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+from vote_dict import explode_vote_dicts
+
+INPUT_FILE = "raw/perfume_info_updated.tsv"
+OUTPUT_DIR = "outputs"
+CHUNK_ROWS = 5000
+
+# 투표 dict 컬럼 → (출력 테이블, 값 컬럼명)
+VOTE_COLUMNS = {
+    "accord": ("TB_PERFUME_ACCORD_M", "ACCORD"),
+    "audience": ("TB_PERFUME_AUDIENCE_M", "AUDIENCE"),
+    "season": ("TB_PERFUME_SEASON_M", "SEASON"),
+    "occasion": ("TB_PERFUME_OCCASION_M", "OCCASION"),
+}
+
+# 노트 컬럼 → TYPE
+NOTE_COLUMNS = {"top_note": "TOP", "middle_note": "MIDDLE", "base_note": "BASE"}
+
+# 원본 컬럼 → BASIC 컬럼 ("link"는 제품 링크로 제공되지 않아 제외)
+BASIC_MAPPING = {
+    "perfume": "PERFUME_NAME",
+    "brand": "PERFUME_BRAND",
+    "concentration": "CONCENTRATION",
+    "perfumer": "PERFUMER",
+    "img": "IMG_LINK",
+}
+
+# 출력 테이블 → Arrow 스키마 (컬럼 순서/타입 = DB 테이블)
+PERFUME_ID = pa.field("PERFUME_ID", pa.int64(), nullable=False)
+LOAD_DT = pa.field("LOAD_DT", pa.timestamp("s"), nullable=False)
+
+OUTPUT_SCHEMAS = {
+    "TB_PERFUME_BASIC_M": pa.schema([
+        PERFUME_ID,
+        ("PERFUME_NAME", pa.string()),
+        ("PERFUME_BRAND", pa.string()),
+        ("RELEASE_YEAR", pa.int32()),
+        ("CONCENTRATION", pa.string()),
+        ("PERFUMER", pa.string()),
+        ("IMG_LINK", pa.string()),
+        LOAD_DT,
+    ]),
+    "TB_PERFUME_NOTES_M": pa.schema([PERFUME_ID, ("NOTE", pa.string()), ("TYPE", pa.string()), LOAD_DT]),
+    **{
+        table: pa.schema([PERFUME_ID, (col, pa.string()), ("VOTE", pa.int32()), LOAD_DT])
+        for table, col in VOTE_COLUMNS.values()
+    },
+    "TB_PERFUME_ETL_HASH_M": pa.schema([PERFUME_ID, ("ROW_HASH", pa.string())]),
+}
+
+# 향수별 내용 해시에 들어가는 원본 컬럼 (위 6개 테이블을 만드는 컬럼 전부)
+HASH_COLUMNS = [
+    "perfume", "brand", "release_year", "concentration", "perfumer", "img",
+    *VOTE_COLUMNS, *NOTE_COLUMNS,
+]
+
+
+def parse_vote_column(ids, values, value_col, load_dt):
+    """"{'Woody': '3', ...}" 문자열 → (PERFUME_ID, 값, VOTE) 행, VOTE 내림차순 (vote_dict.py)"""
+    df = explode_vote_dicts(ids, values, value_col).assign(LOAD_DT=load_dt)
+    return df.sort_values(by=["PERFUME_ID", "VOTE"], ascending=[True, False], kind="stable")
+
+
+def parse_note_columns(chunk, load_dt):
+    """"Rose, Musk" 문자열 3컬럼(TOP/MIDDLE/BASE) → (PERFUME_ID, NOTE, TYPE) 행"""
+    parts = []
+    for col, note_type in NOTE_COLUMNS.items():
+        notes = chunk[["PERFUME_ID", col]].dropna(subset=[col])
+        notes = notes.assign(NOTE=notes[col].str.split(",")).explode("NOTE")
+        parts.append(pd.DataFrame({
+            "PERFUME_ID": notes["PERFUME_ID"],
+            "NOTE": notes["NOTE"].str.strip(),
+            "TYPE": note_type,
+            "LOAD_DT": load_dt,
+        }))
+    return pd.concat(parts, ignore_index=True).sort_values(by=["PERFUME_ID", "TYPE"], kind="stable")
+
+
+def hash_rows(chunk):
+    """향수별 원본 내용 MD5 (증분 적재 시 바뀐 향수만 골라내는 용도, load/load_perfume_delta.py)"""
+    first, *rest = [chunk[c].fillna("") for c in HASH_COLUMNS]
+    joined = first.str.cat(rest, sep="\x1f")
+    return pd.DataFrame({
+        "PERFUME_ID": chunk["PERFUME_ID"],
+        "ROW_HASH": [hashlib.md5(text.encode("utf-8")).hexdigest() for text in joined],
+    })
+
+
+def normalize_chunk(chunk, load_dt):
+    """원본 청크 1개 → {테이블명: DataFrame}"""
+    chunk = chunk.assign(
+        PERFUME_ID=chunk["perfume_id"].str.replace("P_", "", regex=False).astype(int)
+    )
+
+    basic = chunk.rename(columns=BASIC_MAPPING)
+    basic["RELEASE_YEAR"] = pd.to_numeric(chunk["release_year"], errors="coerce").astype("Int64")
+    basic["LOAD_DT"] = load_dt
+    tables = {
+        "TB_PERFUME_BASIC_M": basic,
+        "TB_PERFUME_NOTES_M": parse_note_columns(chunk, load_dt),
+        "TB_PERFUME_ETL_HASH_M": hash_rows(chunk),
+    }
+
+    for src_col, (table, value_col) in VOTE_COLUMNS.items():
+        tables[table] = parse_vote_column(chunk["PERFUME_ID"], chunk[src_col], value_col, load_dt)
+    return tables
+
+
+def _normalized_chunks(reader, load_dt, workers):
+    """청크별 정규화 결과를 원본 순서대로 반환 (workers > 1 이면 프로세스 풀 사용)"""
+    if workers <= 1:
+        for chunk in reader:
+            yield normalize_chunk(chunk, load_dt)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in reader:
+            pending.append(pool.submit(normalize_chunk, chunk, load_dt))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def to_record_batch(df, schema):
+    """DataFrame → 스키마 고정 레코드 배치 (타입이 안 맞으면 여기서 바로 실패)"""
+    return pa.RecordBatch.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+
+def normalize(input_file=INPUT_FILE, output_dir=OUTPUT_DIR, chunk_rows=CHUNK_ROWS, workers=1):
+    started = time.monotonic()
+    load_dt = pd.Timestamp(datetime.now().replace(microsecond=0))
+    outputs = {
+        table: pa.ipc.new_file(f"{output_dir}/{table}.arrow", schema)
+        for table, schema in OUTPUT_SCHEMAS.items()
+    }
+    counts = dict.fromkeys(OUTPUT_SCHEMAS, 0)
+    try:
+        reader = pd.read_csv(input_file, sep="\t", dtype=str, chunksize=chunk_rows, encoding="utf-8-sig")
+        for tables in _normalized_chunks(reader, load_dt, workers):
+            for table, df in tables.items():
+                outputs[table].write_batch(to_record_batch(df, OUTPUT_SCHEMAS[table]))
+                counts[table] += len(df)
+    finally:
+        for writer in outputs.values():
+            writer.close()
+
+    for table, n in counts.items():
+        print(f"[arrow] {table}: {n}건")
+    print(f"[done] {time.monotonic() - started:.2f}s")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="perfume_info TSV → 테이블 Arrow 파일 6종 + 해시 (단일 패스)")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1, help="청크 파싱 프로세스 수")
+    args = parser.parse_args()
+    normalize(args.input, args.output_dir, args.chunk_rows, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+input_file = "raw/cleaned_reviews.tsv"
+output_file = "outputs/TB_PERFUME_REVIEW_M.arrow"
+
+# Arrow 스키마 (컬럼 순서/타입 = TB_PERFUME_REVIEW_M)
+SCHEMA = pa.schema([
+    pa.field("REVIEW_ID", pa.int64(), nullable=False),
+    pa.field("PERFUME_ID", pa.int64(), nullable=False),
+    ("CONTENT", pa.string()),
+    pa.field("LOAD_DT", pa.timestamp("s"), nullable=False),
+])
+BATCH_ROWS = 50000
+
+
+def to_arrow():
+    if not os.path.exists(input_file):
+        print(f"[SKIP] {input_file} 없음")
+        return 0
+
+    # 데이터 로드
+    df = pd.read_csv(input_file, sep="\t")
+
+    # 식별자 전처리 (R_, P_ 제거 후 정수 변환)
+    df["REVIEW_ID"] = (
+        df["review_id"].astype(str).str.replace("R_", "", regex=False).astype(int)
+    )
+    df["PERFUME_ID"] = (
+        df["perfume_id"].astype(str).str.replace("P_", "", regex=False).astype(int)
+    )
+    df["LOAD_DT"] = pd.Timestamp(datetime.now().replace(microsecond=0))
+
+    column_mapping = {"content": "CONTENT"}
+    df.rename(columns=column_mapping, inplace=True)
+
+    # author 제외, 필요한 컬럼만 선택 (BATCH_ROWS행씩 레코드 배치로 기록)
+    table = pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+    with pa.ipc.new_file(output_file, SCHEMA) as writer:
+        writer.write_table(table, max_chunksize=BATCH_ROWS)
+    return table.num_rows
+
+
+if __name__ == "__main__":
+    to_arrow()
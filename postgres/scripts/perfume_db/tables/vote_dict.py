@@ -0,0 +1,151 @@
+"""
+투표 dict 컬럼 파서 ("{'Spicy': '3', 'Woody': '2'}" → (PERFUME_ID, KEY, VOTE) 행)
+
+행마다 ast.literal_eval(파이썬 파서 + 객체 생성) 대신 컴파일된 정규식 두 번으로 처리합니다.
+- 1단계: fullmatch 로 "문자열 키 : 정수(또는 정수 문자열)" 형태의 dict인지 검사
+- 2단계: 통과한 행은 findall 로 (키, 투표수)를 추출하고 numpy로 한 번에 펼침 (dict 순서 유지)
+- 형태가 다르거나 키가 중복된 행만 ast.literal_eval 로 처리 → 결과는 기존 방식과 동일
+- workers > 1 이면 컬럼을 나눠 프로세스 풀에서 병렬 처리 (아주 큰 입력용)
+
+기존 ast.literal_eval 방식과의 동일성 확인 (scripts/perfume_db 에서 실행):
+    python -m pytest -q tests                 # 경계 사례 (따옴표/중복 키/깨진 dict/NaN, 병렬)
+    python tables/vote_dict.py --verify       # 원본 TSV 전체
+"""
+import argparse
+import ast
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+_KEY = r"""(?:'(?P<sq>[^'\\\n]*)'|"(?P<dq>[^"\\\n]*)")"""
+_VOTE = r"""(?:'\s*(?P<qv>\d+)\s*'|(?P<v>\d+))"""
+PAIR_RE = rf"{_KEY}\s*:\s*{_VOTE}"
+
+_PAIR_PLAIN = r"""(?:'[^'\\\n]*'|"[^"\\\n]*")\s*:\s*(?:'\s*\d+\s*'|\d+)"""
+DICT_RE = rf"\{{\s*(?:{_PAIR_PLAIN}(?:\s*,\s*{_PAIR_PLAIN})*\s*,?\s*)?\}}"
+
+_PAIR = re.compile(PAIR_RE)
+_DICT = re.compile(DICT_RE)
+
+
+def _literal_eval_records(ids, values, rows):
+    """행마다 ast.literal_eval (기존 방식). (PERFUME_ID, 키, 투표수, 원본 행 번호) 목록"""
+    records = []
+    for r in rows:
+        text = values[r]
+        if not isinstance(text, str):
+            continue
+        try:
+            vote_dict = ast.literal_eval(text)
+            if isinstance(vote_dict, dict):
+                for name, vote in vote_dict.items():
+                    records.append((ids[r], name, int(vote), r))
+        except (ValueError, SyntaxError):
+            continue
+    return records
+
+
+def explode_vote_dicts_reference(ids, values, value_col):
+    """기존 방식 그대로의 결과 (--verify 기준)"""
+    ids, values = np.asarray(ids), pd.Series(values).reset_index(drop=True)
+    records = _literal_eval_records(ids, values, range(len(values)))
+    return pd.DataFrame([r[:3] for r in records], columns=["PERFUME_ID", value_col, "VOTE"])
+
+
+def _explode(ids, values, value_col):
+    ids = np.asarray(ids)
+    values = pd.Series(values).reset_index(drop=True)
+
+    # 형태 검사 + (키, 투표수) 추출을 컴파일된 정규식 1번씩으로 처리. 폴백 대상은 None
+    pairs = [
+        _PAIR.findall(text) if isinstance(text, str) and _DICT.fullmatch(text) else None
+        for text in values
+    ]
+    # 키가 중복된 dict는 마지막 값이 남는 literal_eval 의미를 따르도록 폴백
+    pairs = [p if p is None or len({sq or dq for sq, dq, _, _ in p}) == len(p) else None for p in pairs]
+
+    fast_rows = [r for r, p in enumerate(pairs) if p]
+    flat = [pair for r in fast_rows for pair in pairs[r]]
+    rows = np.repeat(np.array(fast_rows, dtype=np.int64), [len(pairs[r]) for r in fast_rows])
+    result = pd.DataFrame({
+        "PERFUME_ID": ids[rows],
+        value_col: [sq or dq for sq, dq, _, _ in flat],
+        "VOTE": np.array([int(qv or v) for _, _, qv, v in flat], dtype=np.int64),
+        "_row": rows,
+    })
+
+    slow = [r for r, p in enumerate(pairs) if p is None and isinstance(values[r], str)]
+    if slow:
+        fallback = pd.DataFrame(
+            _literal_eval_records(ids, values, slow),
+            columns=["PERFUME_ID", value_col, "VOTE", "_row"],
+        )
+        if result.empty:
+            # 빈 프레임과 concat 하면 키 컬럼이 object 로 바뀜 (pandas 3 의 str dtype 과 달라짐)
+            result = fallback
+        else:
+            result = pd.concat([result, fallback], ignore_index=True).sort_values("_row", kind="stable")
+
+    return result.drop(columns="_row").reset_index(drop=True)
+
+
+def explode_vote_dicts(ids, values, value_col, workers=1):
+    """
+    투표 dict 문자열 컬럼 → DataFrame[PERFUME_ID, value_col, VOTE] (원본 행 순서, dict 순서 유지)
+    workers > 1 이면 입력을 나눠 프로세스 풀에서 처리합니다.
+    """
+    ids = np.asarray(ids)
+    values = pd.Series(values).reset_index(drop=True)
+    if workers <= 1 or len(values) < workers * 1000:
+        return _explode(ids, values, value_col)
+
+    bounds = np.linspace(0, len(values), workers + 1, dtype=int)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(
+            _explode,
+            [ids[a:b] for a, b in zip(bounds, bounds[1:])],
+            [values.iloc[a:b] for a, b in zip(bounds, bounds[1:])],
+            [value_col] * workers,
+        )
+        return pd.concat(list(parts), ignore_index=True)
+
+
+def verify(input_file, columns, workers=1):
+    """원본 TSV의 투표 컬럼 전체를 두 방식으로 파싱해 결과가 같은지 확인"""
+    df = pd.read_csv(input_file, sep="\t", dtype=str, encoding="utf-8-sig")
+    ids = df["perfume_id"].str.replace("P_", "", regex=False).astype(int)
+    ok = True
+    for col in columns:
+        started = time.monotonic()
+        expected = explode_vote_dicts_reference(ids, df[col], col.upper())
+        t_ref = time.monotonic() - started
+
+        started = time.monotonic()
+        actual = explode_vote_dicts(ids, df[col], col.upper(), workers=workers)
+        t_new = time.monotonic() - started
+
+        same = expected.reset_index(drop=True).equals(actual.reset_index(drop=True))
+        ok &= same
+        print(f"[{'OK' if same else 'DIFF'}] {col}: {len(actual)}행, "
+              f"literal_eval {t_ref * 1000:.0f}ms → 정규식 {t_new * 1000:.0f}ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="투표 dict 파서 동일성 확인")
+    parser.add_argument("--verify", action="store_true", help="ast.literal_eval 결과와 비교")
+    parser.add_argument("--input", default="raw/perfume_info_updated.tsv")
+    parser.add_argument("--columns", nargs="+", default=["accord", "audience", "season", "occasion"])
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    if not args.verify:
+        parser.print_help()
+        return
+    raise SystemExit(0 if verify(args.input, args.columns, args.workers) else 1)
+
+
+if __name__ == "__main__":
+    main()
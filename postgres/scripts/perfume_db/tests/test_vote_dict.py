@@ -0,0 +1,62 @@
+"""
+tables/vote_dict.py: 정규식 파서(explode_vote_dicts)가 기존 ast.literal_eval 방식과 같은 결과를 내는지 확인
+
+실행 (scripts/perfume_db 에서):
+    python -m pytest -q tests
+"""
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tables"))
+
+from vote_dict import explode_vote_dicts, explode_vote_dicts_reference  # noqa: E402
+
+CASES = {
+    "quoted_votes": "{'Spicy': '3', 'Woody': '2'}",
+    "unquoted_votes": "{'Spicy': 3, 'Woody': 12}",
+    "double_quoted_keys": """{"Rose": '7', 'Oud': 1}""",
+    "spaced_votes": "{ 'Citrus' :' 5 ' , 'Musk':4 }",
+    "trailing_comma": "{'Amber': '1',}",
+    "empty_dict": "{}",
+    "duplicate_keys": "{'A': '1', 'B': '2', 'A': '3'}",
+    "apostrophe_in_key": """{"Lily-of-the-valley's": '2'}""",
+    "float_vote": "{'Vanilla': 1.5}",
+    "bad_vote_after_good": "{'Iris': '2', 'Leather': 'many'}",
+    "unterminated": "{'Iris': '2'",
+    "not_a_dict": "['Iris', 2]",
+    "plain_text": "Woody",
+    "empty_string": "",
+    "nan": np.nan,
+    "none": None,
+}
+
+
+def _assert_same(values, workers=1):
+    ids = list(range(100, 100 + len(values)))
+    expected = explode_vote_dicts_reference(ids, values, "ACCORD")
+    actual = explode_vote_dicts(ids, values, "ACCORD", workers=workers)
+    # 결과가 비면 기준 쪽은 컬럼 dtype 을 정할 값이 없어 object 이므로 값/컬럼만 비교
+    pd.testing.assert_frame_equal(
+        actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=not expected.empty
+    )
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_single_value_matches_literal_eval(name):
+    _assert_same([CASES[name]])
+
+
+def test_mixed_column_keeps_row_and_dict_order():
+    # 빠른 경로/폴백 행이 섞여도 원본 행 순서 → dict 순서 유지
+    _assert_same(list(CASES.values()) * 3)
+
+
+def test_parallel_workers_match_literal_eval():
+    rng = random.Random(0)
+    values = [rng.choice(list(CASES.values())) for _ in range(2500)]
+    _assert_same(values, workers=2)